@@ -0,0 +1,281 @@
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+import queue
+import time
+
+from agent_model import AgentConfig, AgentNetwork, NStepAccumulator, OntoraAgent
+from vector_env import SharedArray
+
+logger = logging.getLogger(__name__)
+
+class ThroughputCounter:
+    """
+    A process-shared event counter that reports totals and rates.
+
+    The clock starts at the first recorded event, so rates exclude process start-up.
+    """
+    def __init__(self, ctx):
+        self.value = ctx.Value('q', 0)
+        self.start_time = ctx.Value('d', 0.0, lock=False)
+
+    def add(self, count: int = 1):
+        with self.value.get_lock():
+            if self.start_time.value == 0.0:
+                self.start_time.value = time.time()
+            self.value.value += count
+
+    def total(self) -> int:
+        return self.value.value
+
+    def rate(self) -> float:
+        if self.start_time.value == 0.0:
+            return 0.0
+        elapsed = time.time() - self.start_time.value
+        return self.value.value / elapsed if elapsed > 0 else 0.0
+
+class TransitionChannel:
+    """
+    Fixed pool of shared-memory transition chunks passed from actors to the learner.
+
+    An actor takes a free slot index, writes up to ``chunk_size`` transitions into that
+    slot's region of the shared arrays and posts ``(slot, count)`` on the ready queue. The
+    learner copies the chunk into its replay memory and returns the slot to the free queue,
+    so only small integers ever travel through the queues.
+    """
+    def __init__(self, ctx, num_slots: int, chunk_size: int, state_dim: int):
+        self.num_slots = num_slots
+        self.chunk_size = chunk_size
+        self.state_dim = state_dim
+        self.buffers = {
+            'states': SharedArray((num_slots, chunk_size, state_dim), np.float32),
+            'actions': SharedArray((num_slots, chunk_size), np.int64),
+            'rewards': SharedArray((num_slots, chunk_size), np.float32),
+            'next_states': SharedArray((num_slots, chunk_size, state_dim), np.float32),
+            'dones': SharedArray((num_slots, chunk_size), np.float32),
+            'n_steps': SharedArray((num_slots, chunk_size), np.float32),
+        }
+        self.free_slots = ctx.Queue()
+        self.ready_slots = ctx.Queue()
+        for slot in range(num_slots):
+            self.free_slots.put(slot)
+
+    def specs(self) -> Dict[str, Tuple]:
+        return {key: buffer.spec() for key, buffer in self.buffers.items()}
+
+    def close(self):
+        for buffer in self.buffers.values():
+            buffer.close()
+
+class SharedWeights:
+    """
+    Policy weights held in shared-memory tensors with a version counter.
+
+    The learner copies its parameters in under the lock and bumps the version; actors
+    poll the version and copy the new weights into their local network when it changes.
+    """
+    def __init__(self, ctx, config: AgentConfig):
+        self.network = AgentNetwork(config.state_dim, config.action_dim, config.hidden_dim, dueling=config.dueling)
+        self.network.share_memory()
+        self.version = ctx.Value('q', 0)
+        self.lock = ctx.Lock()
+
+    def publish(self, network: torch.nn.Module):
+        with self.lock, torch.no_grad():
+            for shared, param in zip(self.network.parameters(), network.parameters()):
+                shared.copy_(param)
+            self.version.value += 1
+
+    def pull(self, network: torch.nn.Module) -> int:
+        with self.lock, torch.no_grad():
+            for param, shared in zip(network.parameters(), self.network.parameters()):
+                param.copy_(shared)
+            return self.version.value
+
+def actor_epsilons(num_actors: int, base_epsilon: float = 0.4, alpha: float = 7.0) -> List[float]:
+    """Per-actor exploration rates ``base_epsilon ** (1 + alpha * i / (N - 1))`` as in Ape-X."""
+    if num_actors == 1:
+        return [base_epsilon]
+    return [base_epsilon ** (1 + alpha * i / (num_actors - 1)) for i in range(num_actors)]
+
+def _actor_process(actor_id: int, config_dict: Dict, env_fn: Callable, epsilon: float,
+                   specs: Dict[str, Tuple], free_slots, ready_slots, weights: SharedWeights,
+                   frames: ThroughputCounter, stop_event, sync_every: int, pulled_versions):
+    """Run one actor: act epsilon-greedily with a local network copy and ship transitions in chunks."""
+    torch.set_num_threads(1)
+    config = AgentConfig(config_dict)
+    buffers = {key: SharedArray.attach(spec) for key, spec in specs.items()}
+    chunk_size = buffers['actions'].shape[1]
+    network = AgentNetwork(config.state_dim, config.action_dim, config.hidden_dim, dueling=config.dueling)
+    network.eval()
+    version = weights.pull(network)
+    n_step_buffer = NStepAccumulator(config.n_step, config.gamma, config.state_dim) if config.n_step > 1 else None
+    rng = np.random.default_rng(actor_id)
+    env = env_fn()
+    state = env.reset()
+    slot, count = None, 0
+    steps = 0
+    try:
+        while not stop_event.is_set():
+            if rng.random() < epsilon:
+                action = int(rng.integers(config.action_dim))
+            else:
+                with torch.no_grad():
+                    action = int(network(torch.as_tensor(state, dtype=torch.float32).unsqueeze(0)).argmax(1).item())
+            next_state, reward, done = env.step(action)
+
+            if n_step_buffer is None:
+                emitted = (np.asarray(state)[np.newaxis], np.array([action]), np.array([reward]),
+                           np.asarray(next_state)[np.newaxis], np.array([float(done)]), np.ones(1))
+            else:
+                emitted = n_step_buffer.append(np.array([0]), np.asarray(state)[np.newaxis], np.array([action]),
+                                               np.array([reward]), np.asarray(next_state)[np.newaxis],
+                                               np.array([done]))
+            for row in range(len(emitted[0])):
+                if slot is None:
+                    while slot is None and not stop_event.is_set():
+                        try:
+                            slot = free_slots.get(timeout=0.1)
+                        except queue.Empty:
+                            pass
+                    if slot is None:
+                        break
+                for key, values in zip(('states', 'actions', 'rewards', 'next_states', 'dones', 'n_steps'), emitted):
+                    buffers[key].array[slot, count] = values[row]
+                count += 1
+                if count == chunk_size:
+                    ready_slots.put((slot, count))
+                    slot, count = None, 0
+
+            frames.add(1)
+            steps += 1
+            state = env.reset() if done else next_state
+            if steps % sync_every == 0 and weights.version.value != version:
+                version = weights.pull(network)
+                pulled_versions[actor_id] = version
+    finally:
+        for buffer in buffers.values():
+            buffer.close()
+
+def _learner_process(config_dict: Dict, specs: Dict[str, Tuple], free_slots, ready_slots, weights: SharedWeights,
+                     updates: ThroughputCounter, ingested: ThroughputCounter, stop_event, publish_every: int,
+                     save_path: Optional[str]):
+    """Run the learner: drain actor chunks into central replay, optimize, and publish weights."""
+    config = AgentConfig(config_dict)
+    buffers = {key: SharedArray.attach(spec) for key, spec in specs.items()}
+    agent = OntoraAgent(config)
+    weights.pull(agent.policy_net)
+    agent.update_target_network()
+    try:
+        while not stop_event.is_set():
+            drained = 0
+            while True:
+                try:
+                    slot, count = ready_slots.get_nowait()
+                except queue.Empty:
+                    break
+                agent.memory.push_batch(*(buffers[key].array[slot, :count].copy() for key in
+                                          ('states', 'actions', 'rewards', 'next_states', 'dones', 'n_steps')))
+                free_slots.put(slot)
+                drained += count
+            if drained:
+                ingested.add(drained)
+                agent.frame_idx += drained
+
+            if len(agent.memory) < config.batch_size:
+                time.sleep(0.001)
+                continue
+            agent.optimize_model()
+            updates.add(1)
+            if updates.total() % publish_every == 0:
+                weights.publish(agent.policy_net)
+        if save_path:
+            agent.save_model(save_path)
+    finally:
+        for buffer in buffers.values():
+            buffer.close()
+
+class ApeXTrainer:
+    """
+    Local Ape-X style actor/learner split for OntoraAgent.
+
+    Several actor processes each run their own AgentNetwork copy with a fixed exploration
+    rate and stream transitions through a shared-memory ``TransitionChannel`` into the
+    replay memory of a single learner process. The learner runs ``optimize_model`` and
+    publishes new weights through ``SharedWeights`` every ``publish_every`` updates, so
+    inference on the actor side never waits for a gradient step. New transitions enter
+    the learner's replay with maximum priority rather than actor-computed priorities.
+    """
+    def __init__(self, config: AgentConfig, env_fn: Callable, num_actors: int = 4, chunk_size: int = 64,
+                 num_slots: Optional[int] = None, publish_every: int = 50, sync_every: int = 100,
+                 save_path: Optional[str] = None, context: Optional[str] = None):
+        self.config = config
+        self.env_fn = env_fn
+        self.num_actors = num_actors
+        self.publish_every = publish_every
+        self.sync_every = sync_every
+        self.save_path = save_path
+        self.ctx = mp.get_context(context)
+        self.channel = TransitionChannel(self.ctx, num_slots or 4 * num_actors, chunk_size, config.state_dim)
+        self.weights = SharedWeights(self.ctx, config)
+        self.actor_frames = [ThroughputCounter(self.ctx) for _ in range(num_actors)]
+        self.learner_updates = ThroughputCounter(self.ctx)
+        self.learner_ingested = ThroughputCounter(self.ctx)
+        self.actor_weight_versions = self.ctx.Array('q', num_actors)
+        self.stop_event = self.ctx.Event()
+        self.processes: List = []
+
+    def start(self):
+        """Spawn the learner and actor processes."""
+        config_dict = self.config.to_dict()
+        specs = self.channel.specs()
+        learner = self.ctx.Process(target=_learner_process, args=(
+            config_dict, specs, self.channel.free_slots, self.channel.ready_slots, self.weights,
+            self.learner_updates, self.learner_ingested, self.stop_event, self.publish_every, self.save_path))
+        learner.start()
+        self.processes.append(learner)
+        for actor_id, epsilon in enumerate(actor_epsilons(self.num_actors)):
+            actor = self.ctx.Process(target=_actor_process, args=(
+                actor_id, config_dict, self.env_fn, epsilon, specs, self.channel.free_slots,
+                self.channel.ready_slots, self.weights, self.actor_frames[actor_id], self.stop_event,
+                self.sync_every, self.actor_weight_versions), daemon=True)
+            actor.start()
+            self.processes.append(actor)
+        logger.info(f"Started Ape-X learner and {self.num_actors} actors")
+
+    def stats(self) -> Dict:
+        """Throughput counters for both sides of the split."""
+        return {
+            'actor_frames': [counter.total() for counter in self.actor_frames],
+            'actor_fps': [counter.rate() for counter in self.actor_frames],
+            'total_actor_fps': sum(counter.rate() for counter in self.actor_frames),
+            'learner_updates': self.learner_updates.total(),
+            'learner_updates_per_sec': self.learner_updates.rate(),
+            'learner_transitions': self.learner_ingested.total(),
+            'learner_transitions_per_sec': self.learner_ingested.rate(),
+            'weight_version': self.weights.version.value,
+            'actor_weight_versions': list(self.actor_weight_versions)
+        }
+
+    def stop(self):
+        """Signal all processes to stop and wait for them."""
+        self.stop_event.set()
+        for process in self.processes:
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+        self.channel.close()
+
+    def run(self, duration: float) -> Dict:
+        """Run the actor/learner system for ``duration`` seconds and return the final stats."""
+        self.start()
+        try:
+            time.sleep(duration)
+            stats = self.stats()
+        finally:
+            self.stop()
+        logger.info(f"Ape-X run finished: {stats}")
+        return stats
@@ -1,12 +1,14 @@
-import torch  SOCODE
+import torch
 import torch.nn as nn
 import torch.optim as optim
 import numpy as np
 from typing import Dict, List, Tuple, Optional
-from collections import deque
 import random
 import json
 import logging
+import os
+
+from checkpoint_store import CheckpointStore
 
 # Set up logging for debugging and monitoring
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -26,6 +28,15 @@ class AgentConfig:
         self.memory_size = config_dict.get('memory_size', 10000) if config_dict else 10000
         self.batch_size = config_dict.get('batch_size', 64) if config_dict else 64
         self.target_update_freq = config_dict.get('target_update_freq', 100) if config_dict else 100
+        self.replay_mode = config_dict.get('replay_mode', 'uniform') if config_dict else 'uniform'
+        self.priority_alpha = config_dict.get('priority_alpha', 0.6) if config_dict else 0.6
+        self.priority_beta_start = config_dict.get('priority_beta_start', 0.4) if config_dict else 0.4
+        self.priority_beta_frames = config_dict.get('priority_beta_frames', 100000) if config_dict else 100000
+        self.priority_eps = config_dict.get('priority_eps', 1e-6) if config_dict else 1e-6
+        self.double_dqn = config_dict.get('double_dqn', False) if config_dict else False
+        self.dueling = config_dict.get('dueling', False) if config_dict else False
+        self.tau = config_dict.get('tau', 0.0) if config_dict else 0.0
+        self.n_step = config_dict.get('n_step', 1) if config_dict else 1
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
     def to_dict(self) -> Dict:
@@ -41,102 +52,586 @@ class AgentConfig:
             'epsilon_decay': self.epsilon_decay,
             'memory_size': self.memory_size,
             'batch_size': self.batch_size,
-            'target_update_freq': self.target_update_freq
+            'target_update_freq': self.target_update_freq,
+            'replay_mode': self.replay_mode,
+            'priority_alpha': self.priority_alpha,
+            'priority_beta_start': self.priority_beta_start,
+            'priority_beta_frames': self.priority_beta_frames,
+            'priority_eps': self.priority_eps,
+            'double_dqn': self.double_dqn,
+            'dueling': self.dueling,
+            'tau': self.tau,
+            'n_step': self.n_step
         }
 
 class AgentNetwork(nn.Module):
-    """Neural network for the AI agent using a deep Q-network architecture."""
-    def __init__(self, state_dim: int, action_dim: int, hidden_dim: int):
+    """
+    Neural network for the AI agent using a deep Q-network architecture.
+
+    With ``dueling=True`` the last layer is split into a state-value head and an advantage
+    head that are recombined as ``V(s) + A(s, a) - mean_a A(s, a)``.
+    """
+    def __init__(self, state_dim: int, action_dim: int, hidden_dim: int, dueling: bool = False):
         super(AgentNetwork, self).__init__()
+        self.dueling = dueling
         self.layer1 = nn.Linear(state_dim, hidden_dim)
         self.layer2 = nn.Linear(hidden_dim, hidden_dim)
         self.layer3 = nn.Linear(hidden_dim, action_dim)
+        if dueling:
+            self.value = nn.Linear(hidden_dim, 1)
         self.relu = nn.ReLU()
 
     def forward(self, state: torch.Tensor) -> torch.Tensor:
         x = self.relu(self.layer1(state))
         x = self.relu(self.layer2(x))
+        if self.dueling:
+            advantage = self.layer3(x)
+            return self.value(x) + advantage - advantage.mean(dim=1, keepdim=True)
         x = self.layer3(x)
         return x
 
-class ReplayMemory:
-    """Experience replay buffer for storing and sampling transitions."""
-    def __init__(self, capacity: int):
-        self.memory = deque(maxlen=capacity)
-
-    def push(self, state: np.ndarray, action: int, reward: float, next_state: np.ndarray, done: bool):
-        """Add a transition to memory."""
-        self.memory.append((state, action, reward, next_state, done))
+class BatchStaging:
+    """
+    Reusable, preallocated batch tensors for gathering replay samples without allocation.
+
+    One set of host buffers is kept per batch size (page-locked when the target device is a
+    GPU) and rows are gathered into them in place with ``np.take(out=...)``. On a GPU the
+    host buffers are then copied asynchronously into matching preallocated device buffers.
+    The returned tensors are overwritten by the next ``gather`` with the same batch size.
+    """
+    def __init__(self, sources: List[np.ndarray], device: torch.device):
+        self.sources = sources
+        self.device = device
+        self.pin_memory = device.type == 'cuda'
+        self.host_buffers: Dict[int, List[torch.Tensor]] = {}
+        self.device_buffers: Dict[int, List[torch.Tensor]] = {}
+        self.copy_done: Dict[int, torch.cuda.Event] = {}
+
+    def buffers_for(self, batch_size: int) -> Tuple[List[torch.Tensor], List[torch.Tensor]]:
+        """Return (allocating on first use) the host and device buffers for a batch size."""
+        if batch_size not in self.host_buffers:
+            host = [torch.empty((batch_size,) + source.shape[1:], dtype=torch.from_numpy(source[:0]).dtype,
+                                pin_memory=self.pin_memory) for source in self.sources]
+            self.host_buffers[batch_size] = host
+            if self.pin_memory:
+                self.device_buffers[batch_size] = [torch.empty_like(h, device=self.device) for h in host]
+            else:
+                self.device_buffers[batch_size] = host
+        return self.host_buffers[batch_size], self.device_buffers[batch_size]
+
+    def gather(self, indices: np.ndarray) -> Tuple[torch.Tensor, ...]:
+        """Gather the rows at ``indices`` from every source array into the staged batch tensors."""
+        batch_size = len(indices)
+        host, device = self.buffers_for(batch_size)
+        if batch_size in self.copy_done:
+            # The previous asynchronous copy must finish reading the host buffers first.
+            self.copy_done[batch_size].synchronize()
+        for source, buffer in zip(self.sources, host):
+            np.take(source, indices, axis=0, out=buffer.numpy())
+        if device is not host:
+            for h, d in zip(host, device):
+                d.copy_(h, non_blocking=True)
+            event = self.copy_done.setdefault(batch_size, torch.cuda.Event())
+            event.record()
+        return tuple(device)
 
-    def sample(self, batch_size: int) -> List[Tuple]:
-        """Randomly sample a batch of transitions."""
-        return random.sample(self.memory, batch_size)
+class ReplayMemory:
+    """
+    Experience replay buffer backed by preallocated, contiguous ring-buffer arrays.
+
+    Transitions are written in place into fixed-size NumPy arrays instead of being kept
+    as Python tuples, and sampling gathers a whole batch with one vectorized index draw.
+    Each transition also records the exponent ``k`` of the discount ``gamma ** k`` that
+    applies to its bootstrap value (``k > 1`` for n-step transitions).
+
+    ``state_dim`` may be omitted, as with the deque-based buffer this replaces; the arrays
+    are then allocated on the first push, sized from that transition's state.
+    """
+    def __init__(self, capacity: int, state_dim: Optional[int] = None, device: Optional[torch.device] = None):
+        self.capacity = capacity
+        self.state_dim = state_dim
+        self.device = device or torch.device("cpu")
+        self.position = 0
+        self.size = 0
+        if state_dim is not None:
+            self._allocate(state_dim)
+
+    def _allocate(self, state_dim: int):
+        self.state_dim = state_dim
+        self.states = np.zeros((self.capacity, state_dim), dtype=np.float32)
+        self.next_states = np.zeros((self.capacity, state_dim), dtype=np.float32)
+        self.actions = np.zeros(self.capacity, dtype=np.int64)
+        self.rewards = np.zeros(self.capacity, dtype=np.float32)
+        self.dones = np.zeros(self.capacity, dtype=np.float32)
+        self.discount_exponents = np.ones(self.capacity, dtype=np.float32)
+        self.staging = BatchStaging([self.states, self.actions, self.rewards, self.next_states, self.dones,
+                                     self.discount_exponents], self.device)
+
+    def push(self, state: np.ndarray, action: int, reward: float, next_state: np.ndarray, done: bool,
+             n_step: int = 1):
+        """Add a transition to memory, overwriting the oldest one when full."""
+        if self.state_dim is None:
+            self._allocate(np.size(state))
+        idx = self.position
+        self.states[idx] = state
+        self.actions[idx] = action
+        self.rewards[idx] = reward
+        self.next_states[idx] = next_state
+        self.dones[idx] = done
+        self.discount_exponents[idx] = n_step
+        self.position = (idx + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def push_batch(self, states: np.ndarray, actions: np.ndarray, rewards: np.ndarray,
+                   next_states: np.ndarray, dones: np.ndarray, n_steps: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Add a batch of transitions with vectorized writes.
+
+        Returns:
+            np.ndarray: Buffer indices the transitions were written to.
+        """
+        count = len(states)
+        if self.state_dim is None:
+            self._allocate(np.shape(states)[1])
+        if n_steps is None:
+            n_steps = np.ones(count, dtype=np.float32)
+        if count > self.capacity:
+            # Only the newest `capacity` transitions would survive anyway.
+            skip = count - self.capacity
+            self.position = (self.position + skip) % self.capacity
+            states, actions, rewards = states[skip:], actions[skip:], rewards[skip:]
+            next_states, dones, n_steps = next_states[skip:], dones[skip:], n_steps[skip:]
+            count = self.capacity
+        indices = (self.position + np.arange(count)) % self.capacity
+        self.states[indices] = states
+        self.actions[indices] = actions
+        self.rewards[indices] = rewards
+        self.next_states[indices] = next_states
+        self.dones[indices] = dones
+        self.discount_exponents[indices] = n_steps
+        self.position = (self.position + count) % self.capacity
+        self.size = min(self.size + count, self.capacity)
+        return indices
+
+    def sample_indices(self, batch_size: int) -> np.ndarray:
+        """Draw distinct batch indices uniformly from the filled part of the buffer, like ``random.sample``."""
+        if batch_size > self.size:
+            raise ValueError(f"Cannot sample {batch_size} transitions from {self.size}")
+        if 4 * batch_size > self.size:
+            return np.random.choice(self.size, batch_size, replace=False)
+        # Duplicates are rare when the batch is much smaller than the buffer, so redraw just
+        # those instead of permuting the whole buffer.
+        indices = np.unique(np.random.randint(0, self.size, size=batch_size))
+        while len(indices) < batch_size:
+            extra = np.random.randint(0, self.size, size=batch_size - len(indices))
+            indices = np.unique(np.concatenate([indices, extra]))
+        return indices
+
+    def gather(self, indices: np.ndarray) -> Tuple[torch.Tensor, ...]:
+        """Gather the transitions at the given indices into the staged device tensors."""
+        return self.staging.gather(indices)
+
+    def sample(self, batch_size: int) -> Tuple[torch.Tensor, ...]:
+        """
+        Randomly sample a batch of transitions.
+
+        Returns:
+            Tuple of (state, action, reward, next_state, done, discount_exponent) batch tensors on
+            the buffer device. The tensors are reused by the next call with the same batch size.
+        """
+        return self.gather(self.sample_indices(batch_size))
 
     def __len__(self) -> int:
-        return len(self.memory)
+        return self.size
+
+class SegmentTree:
+    """
+    Array-backed binary segment tree over a fixed number of leaves.
+
+    Leaves live in the second half of ``tree``; every internal node holds ``operation``
+    applied to its two children. Updates and queries are vectorized over batches of
+    indices and cost O(batch * log n).
+    """
+    def __init__(self, capacity: int, operation, neutral_element: float):
+        self.tree_capacity = 2
+        while self.tree_capacity < capacity:
+            self.tree_capacity *= 2
+        self.operation = operation
+        self.tree = np.full(2 * self.tree_capacity, neutral_element, dtype=np.float64)
+
+    def update(self, indices: np.ndarray, values: np.ndarray):
+        """Set the leaves at ``indices`` to ``values`` and refresh their ancestors."""
+        nodes = np.asarray(indices) + self.tree_capacity
+        if len(nodes) == 0:
+            return
+        self.tree[nodes] = values
+        # All leaves sit at the same depth, so each pass refreshes exactly one level. Parents
+        # of a sorted index array stay sorted, so deduplicating only needs a neighbour compare.
+        nodes = np.unique(nodes // 2)
+        while True:
+            self.tree[nodes] = self.operation(self.tree[2 * nodes], self.tree[2 * nodes + 1])
+            if nodes[0] == 1:
+                break
+            nodes = nodes // 2
+            keep = np.empty(len(nodes), dtype=bool)
+            keep[0] = True
+            np.not_equal(nodes[1:], nodes[:-1], out=keep[1:])
+            nodes = nodes[keep]
+
+    def __getitem__(self, indices: np.ndarray) -> np.ndarray:
+        return self.tree[np.asarray(indices) + self.tree_capacity]
+
+class SumTree(SegmentTree):
+    """Segment tree of priority sums supporting prefix-sum lookups."""
+    def __init__(self, capacity: int):
+        super(SumTree, self).__init__(capacity, np.add, 0.0)
+
+    def total(self) -> float:
+        return float(self.tree[1])
+
+    def find_prefixsum_idx(self, prefixsums: np.ndarray) -> np.ndarray:
+        """Find, for each prefix sum, the highest leaf index whose cumulative sum does not exceed it."""
+        prefixsums = np.array(prefixsums, dtype=np.float64)
+        nodes = np.ones(len(prefixsums), dtype=np.int64)
+        while nodes[0] < self.tree_capacity:
+            left = 2 * nodes
+            left_sums = self.tree[left]
+            go_right = prefixsums >= left_sums
+            prefixsums = np.where(go_right, prefixsums - left_sums, prefixsums)
+            nodes = np.where(go_right, left + 1, left)
+        return nodes - self.tree_capacity
+
+class MinTree(SegmentTree):
+    """Segment tree of priority minima, used to normalize importance-sampling weights."""
+    def __init__(self, capacity: int):
+        super(MinTree, self).__init__(capacity, np.minimum, float('inf'))
+
+    def min(self) -> float:
+        return float(self.tree[1])
+
+class PrioritizedReplayMemory(ReplayMemory):
+    """
+    Prioritized experience replay (proportional variant) on top of the ring buffer.
+
+    Transitions are sampled with probability proportional to ``priority ** alpha`` using a
+    sum-tree, and the returned importance-sampling weights correct for the induced bias.
+    """
+    def __init__(self, capacity: int, state_dim: Optional[int] = None, device: Optional[torch.device] = None,
+                 alpha: float = 0.6, eps: float = 1e-6):
+        super(PrioritizedReplayMemory, self).__init__(capacity, state_dim, device)
+        self.alpha = alpha
+        self.eps = eps
+        self.max_priority = 1.0
+        self.sum_tree = SumTree(capacity)
+        self.min_tree = MinTree(capacity)
+
+    def push(self, state: np.ndarray, action: int, reward: float, next_state: np.ndarray, done: bool,
+             n_step: int = 1):
+        """Add a transition with the current maximum priority so it is replayed at least once."""
+        idx = self.position
+        super(PrioritizedReplayMemory, self).push(state, action, reward, next_state, done, n_step)
+        priority = np.array([self.max_priority ** self.alpha])
+        self.sum_tree.update(np.array([idx]), priority)
+        self.min_tree.update(np.array([idx]), priority)
+
+    def push_batch(self, states: np.ndarray, actions: np.ndarray, rewards: np.ndarray,
+                   next_states: np.ndarray, dones: np.ndarray, n_steps: Optional[np.ndarray] = None) -> np.ndarray:
+        """Add a batch of transitions, all with the current maximum priority."""
+        indices = super(PrioritizedReplayMemory, self).push_batch(states, actions, rewards, next_states, dones,
+                                                                  n_steps)
+        priorities = np.full(len(indices), self.max_priority ** self.alpha)
+        self.sum_tree.update(indices, priorities)
+        self.min_tree.update(indices, priorities)
+        return indices
+
+    def sample_indices(self, batch_size: int) -> np.ndarray:
+        """Draw one index per equal-mass segment of the priority distribution."""
+        segment = self.sum_tree.total() / batch_size
+        prefixsums = (np.arange(batch_size) + np.random.uniform(size=batch_size)) * segment
+        indices = self.sum_tree.find_prefixsum_idx(prefixsums)
+        return np.minimum(indices, self.size - 1)
+
+    def sample(self, batch_size: int, beta: float = 0.4) -> Tuple:
+        """
+        Sample a prioritized batch of transitions.
+
+        Args:
+            batch_size (int): Number of transitions to sample.
+            beta (float): Importance-sampling exponent; 1.0 fully corrects the sampling bias.
+
+        Returns:
+            Tuple of (state, action, reward, next_state, done, discount_exponent, weights) batch
+            tensors followed by the sampled buffer indices, to be passed back to ``update_priorities``.
+        """
+        indices = self.sample_indices(batch_size)
+        total = self.sum_tree.total()
+        max_weight = (self.min_tree.min() / total * self.size) ** (-beta)
+        weights = (self.sum_tree[indices] / total * self.size) ** (-beta) / max_weight
+        weights = torch.from_numpy(weights.astype(np.float32)).to(self.device)
+        return self.gather(indices) + (weights, indices)
+
+    def update_priorities(self, indices: np.ndarray, td_errors: np.ndarray):
+        """Update the priorities of sampled transitions from their absolute TD errors."""
+        priorities = np.abs(td_errors) + self.eps
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        priorities = priorities ** self.alpha
+        self.sum_tree.update(indices, priorities)
+        self.min_tree.update(indices, priorities)
+
+class NStepAccumulator:
+    """
+    Folds single-step transitions into n-step transitions per environment.
+
+    For every environment the last ``n`` (state, action, reward) entries are kept in fixed
+    arrays. Once an environment has ``n`` pending entries, the oldest is emitted with the
+    discounted reward sum ``r_t + gamma * r_t+1 + ... + gamma^(n-1) * r_t+n-1`` and the state
+    ``n`` steps later; when an episode ends, all pending entries are flushed with their
+    shorter horizons. The horizon ``k`` of each emitted transition is returned so that the
+    bootstrap term can be discounted by ``gamma ** k``.
+    """
+    def __init__(self, n_step: int, gamma: float, state_dim: int):
+        self.n_step = n_step
+        self.gamma = gamma
+        self.state_dim = state_dim
+        self.states = np.zeros((0, n_step, state_dim), dtype=np.float32)
+        self.actions = np.zeros((0, n_step), dtype=np.int64)
+        self.rewards = np.zeros((0, n_step), dtype=np.float32)
+        self.lengths = np.zeros(0, dtype=np.int64)
+
+    def _ensure_envs(self, num_envs: int):
+        if num_envs <= len(self.lengths):
+            return
+        extra = num_envs - len(self.lengths)
+        self.states = np.concatenate([self.states, np.zeros((extra, self.n_step, self.state_dim), np.float32)])
+        self.actions = np.concatenate([self.actions, np.zeros((extra, self.n_step), np.int64)])
+        self.rewards = np.concatenate([self.rewards, np.zeros((extra, self.n_step), np.float32)])
+        self.lengths = np.concatenate([self.lengths, np.zeros(extra, np.int64)])
+
+    def append(self, env_ids: np.ndarray, states: np.ndarray, actions: np.ndarray, rewards: np.ndarray,
+               next_states: np.ndarray, dones: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """
+        Add one step for each of the (distinct) environments in ``env_ids``.
+
+        Returns:
+            Tuple of (states, actions, rewards, next_states, dones, n_steps) arrays holding the
+            n-step transitions that became complete with this step.
+        """
+        env_ids = np.asarray(env_ids, dtype=np.int64)
+        dones = np.asarray(dones, dtype=bool)
+        self._ensure_envs(int(env_ids.max()) + 1)
+        slots = self.lengths[env_ids]
+        self.states[env_ids, slots] = states
+        self.actions[env_ids, slots] = actions
+        self.rewards[env_ids, slots] = rewards
+        self.lengths[env_ids] += 1
+
+        n = self.n_step
+        offsets = np.arange(n)
+        # discount[i, j] = gamma^(j - i) for j >= i: the return seen from pending entry i.
+        discount = np.triu(self.gamma ** np.maximum(offsets[None, :] - offsets[:, None], 0))
+        emitted = []
+
+        full = ~dones & (self.lengths[env_ids] == n)
+        if full.any():
+            ids = env_ids[full]
+            returns = self.rewards[ids] @ discount[0]
+            emitted.append((self.states[ids, 0], self.actions[ids, 0], returns, next_states[full],
+                            np.zeros(len(ids), np.float32), np.full(len(ids), n, np.float32)))
+            self.states[ids, :-1] = self.states[ids, 1:]
+            self.actions[ids, :-1] = self.actions[ids, 1:]
+            self.rewards[ids, :-1] = self.rewards[ids, 1:]
+            self.lengths[ids] -= 1
+
+        if dones.any():
+            ids = env_ids[dones]
+            lengths = self.lengths[ids]
+            pending = offsets[None, :] < lengths[:, None]
+            returns = (self.rewards[ids] * pending) @ discount.T
+            rows, cols = np.nonzero(pending)
+            emitted.append((self.states[ids[rows], cols], self.actions[ids[rows], cols], returns[rows, cols],
+                            next_states[dones][rows], np.ones(len(rows), np.float32),
+                            (lengths[rows] - cols).astype(np.float32)))
+            self.lengths[ids] = 0
+
+        if not emitted:
+            return (np.zeros((0, self.state_dim), np.float32), np.zeros(0, np.int64), np.zeros(0, np.float32),
+                    np.zeros((0, self.state_dim), np.float32), np.zeros(0, np.float32), np.zeros(0, np.float32))
+        return tuple(np.concatenate(parts) for parts in zip(*emitted))
 
 class OntoraAgent:
     """Core AI agent for decision-making and behavior prediction in Web3 context."""
     def __init__(self, config: AgentConfig, model_path: Optional[str] = None):
         self.config = config
-        self.policy_net = AgentNetwork(config.state_dim, config.action_dim, config.hidden_dim).to(config.device)
-        self.target_net = AgentNetwork(config.state_dim, config.action_dim, config.hidden_dim).to(config.device)
+        self.policy_net = AgentNetwork(config.state_dim, config.action_dim, config.hidden_dim,
+                                       dueling=config.dueling).to(config.device)
+        self.target_net = AgentNetwork(config.state_dim, config.action_dim, config.hidden_dim,
+                                       dueling=config.dueling).to(config.device)
         self.target_net.load_state_dict(self.policy_net.state_dict())
+        self.policy_params = list(self.policy_net.parameters())
+        self.target_params = list(self.target_net.parameters())
         self.optimizer = optim.Adam(self.policy_net.parameters(), lr=config.learning_rate)
-        self.memory = ReplayMemory(config.memory_size)
+        if config.replay_mode == 'prioritized':
+            self.memory = PrioritizedReplayMemory(config.memory_size, config.state_dim, config.device,
+                                                  alpha=config.priority_alpha, eps=config.priority_eps)
+        elif config.replay_mode == 'uniform':
+            self.memory = ReplayMemory(config.memory_size, config.state_dim, config.device)
+        else:
+            raise ValueError(f"Unsupported replay mode: {config.replay_mode}")
         self.frame_idx = 0
         self.epsilon = config.epsilon_start
+        self.env_frame_idx = np.zeros(0, dtype=np.int64)
+        self.n_step_buffer = NStepAccumulator(config.n_step, config.gamma, config.state_dim) \
+            if config.n_step > 1 else None
+        self.last_target_update = 0
         
         if model_path:
             self.load_model(model_path)
         logger.info(f"Agent initialized with device: {config.device}")
 
+    def epsilon_at(self, frames: np.ndarray) -> np.ndarray:
+        """Epsilon-greedy exploration rate after the given number of frames."""
+        return self.config.epsilon_end + (self.config.epsilon_start - self.config.epsilon_end) * \
+               np.exp(-1. * frames / self.config.epsilon_decay)
+
     def select_action(self, state: np.ndarray) -> int:
         """Select an action using epsilon-greedy policy."""
-        state_tensor = torch.FloatTensor(state).unsqueeze(0).to(self.config.device)
-        self.epsilon = self.config.epsilon_end + (self.config.epsilon_start - self.config.epsilon_end) * \
-                       np.exp(-1. * self.frame_idx / self.config.epsilon_decay)
+        self.epsilon = float(self.epsilon_at(self.frame_idx))
         self.frame_idx += 1
 
         if random.random() < self.epsilon:
             return random.randrange(self.config.action_dim)
         else:
+            state_tensor = torch.as_tensor(state, dtype=torch.float32, device=self.config.device).unsqueeze(0)
             with torch.no_grad():
                 q_values = self.policy_net(state_tensor)
                 return q_values.max(1)[1].item()
 
-    def store_transition(self, state: np.ndarray, action: int, reward: float, next_state: np.ndarray, done: bool):
-        """Store a transition in memory for experience replay."""
-        self.memory.push(state, action, reward, next_state, done)
+    def select_actions(self, states: np.ndarray, env_ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Select actions for a batch of environments with one forward pass.
+
+        Each environment keeps its own frame counter, so the epsilon-greedy schedule decays
+        per environment exactly as ``select_action`` does for a single one.
+
+        Args:
+            states (np.ndarray): Batch of states with shape (N, state_dim).
+            env_ids (Optional[np.ndarray]): Environment index of each row. Defaults to 0..N-1.
+
+        Returns:
+            np.ndarray: Selected action per environment, shape (N,).
+        """
+        states = np.asarray(states, dtype=np.float32)
+        num_envs = len(states)
+        env_ids = np.arange(num_envs) if env_ids is None else np.asarray(env_ids)
+        if num_envs == 0:
+            return np.zeros(0, dtype=np.int64)
+        if env_ids.max() >= len(self.env_frame_idx):
+            grown = np.zeros(env_ids.max() + 1, dtype=np.int64)
+            grown[:len(self.env_frame_idx)] = self.env_frame_idx
+            self.env_frame_idx = grown
+
+        epsilons = self.epsilon_at(self.env_frame_idx[env_ids])
+        np.add.at(self.env_frame_idx, env_ids, 1)
+        self.frame_idx += num_envs
+        self.epsilon = float(epsilons.mean())
+
+        actions = np.random.randint(self.config.action_dim, size=num_envs)
+        exploit = np.random.random(num_envs) >= epsilons
+        if exploit.any():
+            state_tensor = torch.from_numpy(states[exploit]).to(self.config.device)
+            with torch.no_grad():
+                actions[exploit] = self.policy_net(state_tensor).argmax(1).cpu().numpy()
+        return actions
+
+    def store_transition(self, state: np.ndarray, action: int, reward: float, next_state: np.ndarray, done: bool,
+                         env_id: int = 0):
+        """
+        Store a transition in memory for experience replay.
+
+        With ``n_step > 1`` the transition is first folded into the n-step return of its
+        environment, and only completed n-step transitions reach the replay memory.
+        """
+        if self.n_step_buffer is None:
+            self.memory.push(state, action, reward, next_state, done)
+            return
+        self.memory.push_batch(*self.n_step_buffer.append(
+            np.array([env_id]), np.asarray(state)[np.newaxis], np.array([action]), np.array([reward]),
+            np.asarray(next_state)[np.newaxis], np.array([done])))
+
+    def store_transitions(self, states: np.ndarray, actions: np.ndarray, rewards: np.ndarray,
+                          next_states: np.ndarray, dones: np.ndarray, env_ids: Optional[np.ndarray] = None):
+        """Store a batch of transitions (e.g. one step of a vectorized environment) in one write."""
+        if self.n_step_buffer is None:
+            self.memory.push_batch(states, actions, rewards, next_states, dones)
+            return
+        env_ids = np.arange(len(states)) if env_ids is None else env_ids
+        self.memory.push_batch(*self.n_step_buffer.append(env_ids, states, actions, rewards, next_states, dones))
 
     def optimize_model(self):
         """Optimize the model using experience replay and DQN loss."""
         if len(self.memory) < self.config.batch_size:
             return
 
-        transitions = self.memory.sample(self.config.batch_size)
-        batch_state, batch_action, batch_reward, batch_next_state, batch_done = zip(*transitions)
-
-        state_batch = torch.FloatTensor(batch_state).to(self.config.device)
-        action_batch = torch.LongTensor(batch_action).to(self.config.device)
-        reward_batch = torch.FloatTensor(batch_reward).to(self.config.device)
-        next_state_batch = torch.FloatTensor(batch_next_state).to(self.config.device)
-        done_batch = torch.FloatTensor(batch_done).to(self.config.device)
-
-        current_q_values = self.policy_net(state_batch).gather(1, action_batch.unsqueeze(1))
-        next_q_values = self.target_net(next_state_batch).max(1)[0].detach()
-        target_q_values = reward_batch + self.config.gamma * next_q_values * (1 - done_batch)
-
-        loss = nn.MSELoss()(current_q_values.squeeze(), target_q_values)
+        prioritized = isinstance(self.memory, PrioritizedReplayMemory)
+        if prioritized:
+            beta = min(1.0, self.config.priority_beta_start + self.frame_idx *
+                       (1.0 - self.config.priority_beta_start) / self.config.priority_beta_frames)
+            state_batch, action_batch, reward_batch, next_state_batch, done_batch, exponent_batch, \
+                weights, indices = self.memory.sample(self.config.batch_size, beta)
+        else:
+            state_batch, action_batch, reward_batch, next_state_batch, done_batch, exponent_batch = \
+                self.memory.sample(self.config.batch_size)
+
+        if self.config.double_dqn:
+            # One online forward over [state; next_state] yields both Q(s, .) and the greedy
+            # next actions; the target network only evaluates the actions it picked.
+            online_q_values = self.policy_net(torch.cat([state_batch, next_state_batch]))
+            state_q_values, next_online_q_values = online_q_values.split(len(state_batch))
+            current_q_values = state_q_values.gather(1, action_batch.unsqueeze(1)).squeeze(1)
+            next_actions = next_online_q_values.argmax(1, keepdim=True).detach()
+            with torch.no_grad():
+                next_q_values = self.target_net(next_state_batch).gather(1, next_actions).squeeze(1)
+        else:
+            current_q_values = self.policy_net(state_batch).gather(1, action_batch.unsqueeze(1)).squeeze(1)
+            with torch.no_grad():
+                next_q_values = self.target_net(next_state_batch).max(1)[0]
+        discounts = torch.pow(self.config.gamma, exponent_batch)
+        target_q_values = reward_batch + discounts * next_q_values * (1 - done_batch)
+
+        if prioritized:
+            td_errors = current_q_values - target_q_values
+            loss = (weights * td_errors.pow(2)).mean()
+            self.memory.update_priorities(indices, td_errors.detach().cpu().numpy())
+        else:
+            loss = nn.MSELoss()(current_q_values, target_q_values)
 
         self.optimizer.zero_grad()
         loss.backward()
         self.optimizer.step()
 
-        if self.frame_idx % self.config.target_update_freq == 0:
-            self.target_net.load_state_dict(self.policy_net.state_dict())
+        if self.config.tau > 0:
+            self.update_target_network(self.config.tau)
+        # Batched action selection advances frame_idx by more than one, so compare against the
+        # last sync instead of testing for an exact multiple of target_update_freq.
+        elif self.frame_idx - self.last_target_update >= self.config.target_update_freq:
+            self.last_target_update = self.frame_idx
+            self.update_target_network()
             logger.info(f"Target network updated at frame {self.frame_idx}")
 
+    def update_target_network(self, tau: float = 1.0):
+        """
+        Move the target network towards the policy network in place.
+
+        ``tau=1.0`` is a hard copy; smaller values apply a Polyak (soft) update
+        ``target = target + tau * (policy - target)``. Both run as fused foreach kernels over
+        the parameter lists without building a state dict or allocating new tensors.
+        """
+        with torch.no_grad():
+            if tau >= 1.0:
+                torch._foreach_copy_(self.target_params, self.policy_params)
+            else:
+                torch._foreach_lerp_(self.target_params, self.policy_params, tau)
+
     def evolve(self, user_feedback: float, custom_params: Optional[Dict] = None):
         """Evolve the agent's behavior based on user feedback or custom parameters."""
         if custom_params:
@@ -159,35 +654,91 @@ class OntoraAgent:
             self.config.learning_rate = new_lr
             logger.info(f"Increased learning rate to {new_lr} due to positive feedback")
 
-    def save_model(self, path: str):
-        """Save the agent's model and configuration."""
-        torch.save({
-            'policy_net_state_dict': self.policy_net.state_dict(),
-            'target_net_state_dict': self.target_net.state_dict(),
-            'optimizer_state_dict': self.optimizer.state_dict(),
+    def save_model(self, path: str, incremental: bool = False):
+        """
+        Save the agent's model and configuration.
+
+        Args:
+            path (str): Checkpoint file path.
+            incremental (bool): Write a manifest into a content-addressed CheckpointStore rooted at
+                the directory of ``path`` instead of a full torch.save archive. Tensor chunks already
+                in the store (unchanged weights, the target net after a sync, weights shared by other
+                agents) are not written again.
+        """
+        if not incremental:
+            torch.save({
+                'policy_net_state_dict': self.policy_net.state_dict(),
+                'target_net_state_dict': self.target_net.state_dict(),
+                'optimizer_state_dict': self.optimizer.state_dict(),
+                'config': self.config.to_dict(),
+                'frame_idx': self.frame_idx,
+                'epsilon': self.epsilon,
+                'env_frame_idx': self.env_frame_idx.tolist()
+            }, path)
+            logger.info(f"Model saved to {path}")
+            return
+
+        optimizer_state = self.optimizer.state_dict()
+        tensors = {f"policy_net.{key}": value for key, value in self.policy_net.state_dict().items()}
+        tensors.update({f"target_net.{key}": value for key, value in self.target_net.state_dict().items()})
+        for param_id, param_state in optimizer_state['state'].items():
+            for key, value in param_state.items():
+                tensors[f"optimizer.{param_id}.{key}"] = torch.as_tensor(value)
+        store = CheckpointStore(os.path.dirname(os.path.abspath(path)))
+        store.save(os.path.basename(path), tensors, metadata={
+            'optimizer_param_groups': optimizer_state['param_groups'],
             'config': self.config.to_dict(),
             'frame_idx': self.frame_idx,
-            'epsilon': self.epsilon
-        }, path)
-        logger.info(f"Model saved to {path}")
+            'epsilon': self.epsilon,
+            'env_frame_idx': self.env_frame_idx.tolist()
+        })
+        logger.info(f"Model saved incrementally to {path}")
 
     def load_model(self, path: str):
-        """Load the agent's model and configuration."""
-        checkpoint = torch.load(path, map_location=self.config.device)
+        """Load the agent's model and configuration from a torch.save archive or a checkpoint manifest."""
+        if CheckpointStore.is_manifest(path):
+            # Tensors are opened one at a time as load_state_dict copies them; single-chunk ones are memory-mapped.
+            store = CheckpointStore(os.path.dirname(os.path.abspath(path)))
+            tensors, checkpoint = store.load(os.path.basename(path))
+            optimizer_state: Dict[int, Dict] = {}
+            for key in tensors:
+                if key.startswith('optimizer.'):
+                    _, param_id, name = key.split('.', 2)
+                    optimizer_state.setdefault(int(param_id), {})[name] = tensors[key]
+            checkpoint['policy_net_state_dict'] = tensors.subset('policy_net.')
+            checkpoint['target_net_state_dict'] = tensors.subset('target_net.')
+            checkpoint['optimizer_state_dict'] = {'state': optimizer_state,
+                                                  'param_groups': checkpoint['optimizer_param_groups']}
+        else:
+            checkpoint = torch.load(path, map_location=self.config.device)
         self.policy_net.load_state_dict(checkpoint['policy_net_state_dict'])
         self.target_net.load_state_dict(checkpoint['target_net_state_dict'])
         self.optimizer.load_state_dict(checkpoint['optimizer_state_dict'])
         self.config = AgentConfig(checkpoint['config'])
         self.frame_idx = checkpoint['frame_idx']
         self.epsilon = checkpoint['epsilon']
+        self.env_frame_idx = np.asarray(checkpoint.get('env_frame_idx', []), dtype=np.int64)
+        self.last_target_update = self.frame_idx
         logger.info(f"Model loaded from {path}")
 
     def predict_behavior(self, state: np.ndarray) -> Dict[str, float]:
         """Predict behavior probabilities for a given state."""
-        state_tensor = torch.FloatTensor(state).unsqueeze(0).to(self.config.device)
+        probs = self.predict_behaviors(np.asarray(state)[np.newaxis])[0]
+        return {f"action_{i}": float(prob) for i, prob in enumerate(probs)}
+
+    def predict_behaviors(self, states: np.ndarray) -> np.ndarray:
+        """
+        Predict behavior probabilities for a batch of states in one forward pass.
+
+        Args:
+            states (np.ndarray): Batch of states with shape (N, state_dim).
+
+        Returns:
+            np.ndarray: Action probabilities with shape (N, action_dim).
+        """
+        state_tensor = torch.as_tensor(states, dtype=torch.float32, device=self.config.device)
         with torch.no_grad():
-            q_values = self.policy_net(state_tensor).softmax(dim=1).squeeze().cpu().numpy()
-        return {f"action_{i}": float(prob) for i, prob in enumerate(q_values)}
+            return self.policy_net(state_tensor).softmax(dim=1).cpu().numpy()
 
 def create_agent_from_config(config_path: str) -> OntoraAgent:
     """Create an agent from a JSON configuration file."""
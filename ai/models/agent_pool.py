@@ -0,0 +1,148 @@
+import numpy as np
+import torch
+from typing import Dict, List, Optional, Sequence
+import logging
+
+from agent_model import AgentConfig, AgentNetwork
+
+logger = logging.getLogger(__name__)
+
+class AgentPool:
+    """
+    Multi-tenant pool of lightweight user agents on top of one shared network.
+
+    All tenants share the first two layers of a single ``AgentNetwork`` (the trunk). Each
+    tenant only owns a last-layer Q head plus its exploration counter, stored as rows of
+    packed tensors/arrays, so a tenant costs ``(hidden_dim + 1) * action_dim`` floats
+    instead of two full networks and an Adam optimizer. Action selection for a batch of
+    requests from different tenants runs one trunk forward pass followed by one grouped
+    head product over the gathered per-tenant weights.
+    """
+    def __init__(self, config: AgentConfig, base_network: Optional[AgentNetwork] = None,
+                 initial_capacity: int = 1024, head_learning_rate: Optional[float] = None):
+        if config.dueling:
+            raise ValueError("AgentPool heads replace the plain Q layer; dueling networks are not supported")
+        self.config = config
+        self.device = config.device
+        self.base = (base_network or AgentNetwork(config.state_dim, config.action_dim, config.hidden_dim))
+        self.base = self.base.to(self.device).eval()
+        for param in self.base.parameters():
+            param.requires_grad_(False)
+        self.head_learning_rate = head_learning_rate or config.learning_rate
+
+        capacity = max(initial_capacity, 1)
+        self.head_weights = torch.empty((capacity, config.action_dim, config.hidden_dim), device=self.device)
+        self.head_biases = torch.empty((capacity, config.action_dim), device=self.device)
+        self.frame_idx = np.zeros(capacity, dtype=np.int64)
+        self.tenant_index: Dict[str, int] = {}
+        self.tenants: List[str] = []
+
+    @property
+    def capacity(self) -> int:
+        return len(self.frame_idx)
+
+    def __len__(self) -> int:
+        return len(self.tenants)
+
+    def _grow(self, capacity: int):
+        weights = torch.empty((capacity,) + tuple(self.head_weights.shape[1:]), device=self.device)
+        biases = torch.empty((capacity, self.head_biases.shape[1]), device=self.device)
+        weights[:len(self)] = self.head_weights[:len(self)]
+        biases[:len(self)] = self.head_biases[:len(self)]
+        self.head_weights, self.head_biases = weights, biases
+        frame_idx = np.zeros(capacity, dtype=np.int64)
+        frame_idx[:len(self)] = self.frame_idx[:len(self)]
+        self.frame_idx = frame_idx
+
+    def add_tenant(self, user_id: str) -> int:
+        """Register a tenant, initializing its head from the shared network's output layer."""
+        if user_id in self.tenant_index:
+            return self.tenant_index[user_id]
+        slot = len(self.tenants)
+        if slot == self.capacity:
+            self._grow(2 * self.capacity)
+        with torch.no_grad():
+            self.head_weights[slot] = self.base.layer3.weight
+            self.head_biases[slot] = self.base.layer3.bias
+        self.frame_idx[slot] = 0
+        self.tenant_index[user_id] = slot
+        self.tenants.append(user_id)
+        return slot
+
+    def slots(self, user_ids: Sequence[str]) -> np.ndarray:
+        """Map user ids to their slots, registering unknown users on the fly."""
+        return np.fromiter((self.add_tenant(user_id) for user_id in user_ids), dtype=np.int64, count=len(user_ids))
+
+    def features(self, states: torch.Tensor) -> torch.Tensor:
+        """Shared trunk forward pass."""
+        x = self.base.relu(self.base.layer1(states))
+        return self.base.relu(self.base.layer2(x))
+
+    def q_values(self, slots: np.ndarray, states: np.ndarray) -> torch.Tensor:
+        """Q-values for each (tenant, state) row: one trunk pass plus one grouped head product."""
+        state_tensor = torch.as_tensor(states, dtype=torch.float32, device=self.device)
+        slot_tensor = torch.as_tensor(slots, device=self.device)
+        with torch.no_grad():
+            features = self.features(state_tensor)
+            return torch.bmm(self.head_weights[slot_tensor], features.unsqueeze(2)).squeeze(2) + \
+                self.head_biases[slot_tensor]
+
+    def epsilons(self, slots: np.ndarray) -> np.ndarray:
+        return self.config.epsilon_end + (self.config.epsilon_start - self.config.epsilon_end) * \
+               np.exp(-1. * self.frame_idx[slots] / self.config.epsilon_decay)
+
+    def select_actions(self, user_ids: Sequence[str], states: np.ndarray) -> np.ndarray:
+        """
+        Select epsilon-greedy actions for requests from many tenants in one batched pass.
+
+        Args:
+            user_ids (Sequence[str]): Tenant of each request.
+            states (np.ndarray): Batch of states with shape (N, state_dim).
+
+        Returns:
+            np.ndarray: Selected action per request, shape (N,).
+        """
+        slots = self.slots(user_ids)
+        epsilons = self.epsilons(slots)
+        np.add.at(self.frame_idx, slots, 1)
+        actions = np.random.randint(self.config.action_dim, size=len(slots))
+        exploit = np.random.random(len(slots)) >= epsilons
+        if exploit.any():
+            actions[exploit] = self.q_values(slots[exploit], np.asarray(states)[exploit]).argmax(1).cpu().numpy()
+        return actions
+
+    def optimize(self, user_ids: Sequence[str], states: np.ndarray, actions: np.ndarray, rewards: np.ndarray,
+                 next_states: np.ndarray, dones: np.ndarray) -> float:
+        """
+        One semi-gradient TD(0) step on the tenants' heads for a batch of transitions.
+
+        The head update is written out explicitly and scattered into the packed weights, so no
+        per-tenant optimizer state or dense gradient over all tenants is ever materialized.
+
+        Returns:
+            float: Mean squared TD error of the batch before the update.
+        """
+        slots = torch.as_tensor(self.slots(user_ids), device=self.device)
+        actions = torch.as_tensor(actions, dtype=torch.int64, device=self.device)
+        rewards = torch.as_tensor(rewards, dtype=torch.float32, device=self.device)
+        dones = torch.as_tensor(dones, dtype=torch.float32, device=self.device)
+        with torch.no_grad():
+            features = self.features(torch.as_tensor(states, dtype=torch.float32, device=self.device))
+            next_features = self.features(torch.as_tensor(next_states, dtype=torch.float32, device=self.device))
+            weights, biases = self.head_weights[slots], self.head_biases[slots]
+            next_q = torch.bmm(weights, next_features.unsqueeze(2)).squeeze(2) + biases
+            targets = rewards + self.config.gamma * next_q.max(1)[0] * (1 - dones)
+            rows = torch.arange(len(slots), device=self.device)
+            current_q = (weights[rows, actions] * features).sum(1) + biases[rows, actions]
+            td_errors = current_q - targets
+            step = self.head_learning_rate * td_errors
+            self.head_weights.index_put_((slots, actions), -step.unsqueeze(1) * features, accumulate=True)
+            self.head_biases.index_put_((slots, actions), -step, accumulate=True)
+        return float(td_errors.pow(2).mean())
+
+    def bytes_per_tenant(self) -> float:
+        """Memory held per tenant slot by the packed per-tenant state."""
+        per_slot = (self.head_weights[0].numel() * self.head_weights.element_size() +
+                    self.head_biases[0].numel() * self.head_biases.element_size() +
+                    self.frame_idx.itemsize)
+        return float(per_slot)
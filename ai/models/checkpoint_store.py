@@ -0,0 +1,170 @@
+import numpy as np
+import torch
+from collections.abc import Mapping
+from typing import Dict, Iterator, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+class CheckpointStore:
+    """
+    Content-addressed, incremental tensor checkpoint store.
+
+    Every tensor is split into fixed-size byte chunks, and each chunk is stored once under
+    its BLAKE2b hash in ``<root>/objects``. A checkpoint is a small JSON manifest (the
+    safetensors-style header: dtype, shape and chunk hashes per tensor, plus free-form
+    metadata) next to that object directory. Saving only writes chunks whose content is
+    not already present, so unchanged parameters, identical tensors (e.g. a target network
+    right after a sync) and weights shared across many agents cost nothing after the first
+    write. Chunks are raw little-endian buffers. On load, tensors that fit in one chunk are
+    memory-mapped; larger tensors are read chunk by chunk into a single buffer, since their
+    chunks are not contiguous on disk. ``collect_garbage`` removes chunks that no manifest in
+    the store references any more.
+    """
+    FORMAT = 'ontora-ckpt-v1'
+
+    def __init__(self, root: str, chunk_bytes: int = 1 << 20):
+        self.root = root
+        self.chunk_bytes = chunk_bytes
+        self.objects_dir = os.path.join(root, 'objects')
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+    def object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _write_tensor(self, tensor: torch.Tensor, stats: Dict[str, int]) -> Dict:
+        tensor = tensor.detach().cpu().contiguous()
+        raw = tensor.reshape(-1).view(torch.uint8).numpy() if tensor.numel() else np.zeros(0, np.uint8)
+        chunks = []
+        for start in range(0, max(len(raw), 1), self.chunk_bytes):
+            chunk = raw[start:start + self.chunk_bytes]
+            digest = hashlib.blake2b(chunk, digest_size=20).hexdigest()
+            path = self.object_path(digest)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                chunk.tofile(tmp_path)
+                os.replace(tmp_path, path)
+                stats['bytes_written'] += len(chunk)
+            chunks.append(digest)
+            stats['bytes_total'] += len(chunk)
+        return {'dtype': str(tensor.dtype).replace('torch.', ''), 'shape': list(tensor.shape), 'chunks': chunks}
+
+    def save(self, name: str, tensors: Dict[str, torch.Tensor], metadata: Optional[Dict] = None) -> Dict[str, int]:
+        """
+        Write a checkpoint manifest, storing only chunks that are not already in the store.
+
+        Args:
+            name (str): Manifest file name, relative to the store root.
+            tensors (Dict[str, torch.Tensor]): Flat mapping of tensor names to tensors.
+            metadata (Optional[Dict]): JSON-serializable data saved alongside the tensors.
+
+        Returns:
+            Dict[str, int]: Bytes newly written and total tensor bytes referenced.
+        """
+        stats = {'bytes_written': 0, 'bytes_total': 0}
+        manifest = {
+            'format': self.FORMAT,
+            'tensors': {key: self._write_tensor(tensor, stats) for key, tensor in tensors.items()},
+            'metadata': metadata or {}
+        }
+        path = os.path.join(self.root, name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+        logger.info(f"Checkpoint {path}: wrote {stats['bytes_written']} of {stats['bytes_total']} tensor bytes")
+        return stats
+
+    def load(self, name: str) -> Tuple['LazyTensorDict', Dict]:
+        """
+        Open a checkpoint without reading any tensor data.
+
+        Returns:
+            Tuple of a lazily memory-mapped tensor mapping and the checkpoint metadata.
+        """
+        with open(os.path.join(self.root, name), 'r') as f:
+            manifest = json.load(f)
+        if manifest.get('format') != self.FORMAT:
+            raise ValueError(f"Unsupported checkpoint format: {manifest.get('format')}")
+        return LazyTensorDict(self, manifest['tensors']), manifest['metadata']
+
+    def collect_garbage(self) -> Dict[str, int]:
+        """
+        Delete chunks not referenced by any checkpoint manifest in the store root.
+
+        Returns:
+            Dict[str, int]: Number of chunk files removed and the bytes they held.
+        """
+        referenced = set()
+        for entry in os.scandir(self.root):
+            if not entry.is_file() or entry.name.endswith('.tmp') or not self.is_manifest(entry.path):
+                continue
+            try:
+                with open(entry.path, 'r') as f:
+                    manifest = json.load(f)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if isinstance(manifest, dict) and manifest.get('format') == self.FORMAT:
+                for tensor in manifest['tensors'].values():
+                    referenced.update(tensor['chunks'])
+        stats = {'chunks_removed': 0, 'bytes_freed': 0}
+        for prefix in os.scandir(self.objects_dir):
+            if not prefix.is_dir():
+                continue
+            for chunk in os.scandir(prefix.path):
+                # In-flight writes (.tmp) belong to a save that has not published its manifest yet.
+                if chunk.name in referenced or chunk.name.endswith('.tmp'):
+                    continue
+                stats['bytes_freed'] += chunk.stat().st_size
+                os.remove(chunk.path)
+                stats['chunks_removed'] += 1
+        logger.info(f"Checkpoint store {self.root}: removed {stats['chunks_removed']} unreferenced chunks "
+                    f"({stats['bytes_freed']} bytes)")
+        return stats
+
+    @staticmethod
+    def is_manifest(path: str) -> bool:
+        """Whether ``path`` is a checkpoint manifest (JSON) rather than a torch.save archive."""
+        with open(path, 'rb') as f:
+            return f.read(1) == b'{'
+
+class LazyTensorDict(Mapping):
+    """Read-only tensor mapping that opens each tensor on first access."""
+    def __init__(self, store: CheckpointStore, entries: Dict[str, Dict]):
+        self.store = store
+        self.entries = entries
+
+    def __getitem__(self, key: str) -> torch.Tensor:
+        entry = self.entries[key]
+        dtype = getattr(torch, entry['dtype'])
+        if 0 in entry['shape']:
+            return torch.empty(entry['shape'], dtype=dtype)
+        if len(entry['chunks']) == 1:
+            # Copy-on-write maps keep the pages lazy while giving torch a writable buffer.
+            raw = np.memmap(self.store.object_path(entry['chunks'][0]), dtype=np.uint8, mode='c')
+            return torch.from_numpy(raw).view(dtype).reshape(entry['shape'])
+        tensor = torch.empty(entry['shape'], dtype=dtype)
+        raw = tensor.reshape(-1).view(torch.uint8).numpy()
+        offset = 0
+        for digest in entry['chunks']:
+            with open(self.store.object_path(digest), 'rb') as f:
+                while True:
+                    read = f.readinto(memoryview(raw[offset:]))
+                    if not read:
+                        break
+                    offset += read
+        return tensor
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def subset(self, prefix: str) -> Dict[str, torch.Tensor]:
+        """Tensors under ``prefix``, with the prefix stripped (e.g. one module's state dict)."""
+        return {key[len(prefix):]: self[key] for key in self.entries if key.startswith(prefix)}
@@ -2,39 +2,496 @@ import pandas as pd
 import numpy as np
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.impute import SimpleImputer
-from typing import Dict, List, Tuple, Optional, Union
+from typing import Any, Dict, Iterator, List, Tuple, Optional, Union
+import hashlib
+import json
 import logging
+import multiprocessing as mp
+from multiprocessing import shared_memory
 import os
 from pathlib import Path
 
+from transform_spec import TransformSpec, factorize
+
+COLUMNAR_FILE_TYPES = ('parquet', 'feather', 'arrow', 'ipc')
+
+def _import_pyarrow():
+    """pyarrow is only needed for the columnar formats, so it is imported on first use."""
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("pyarrow is required for Parquet/Feather/Arrow files (pip install pyarrow)") from e
+    return pa, ds, pq
+
+def _filter_mask(data: pd.DataFrame, filters: List[Tuple[str, str, Any]]) -> np.ndarray:
+    """Row mask for conjunctive pyarrow-style filters ``[(column, op, value), ...]``."""
+    mask = np.ones(len(data), dtype=bool)
+    for column, op, value in filters:
+        values = data[column]
+        if op in ('=', '=='):
+            matches = values == value
+        elif op == '!=':
+            matches = values != value
+        elif op == '<':
+            matches = values < value
+        elif op == '<=':
+            matches = values <= value
+        elif op == '>':
+            matches = values > value
+        elif op == '>=':
+            matches = values >= value
+        elif op == 'in':
+            matches = values.isin(value)
+        elif op == 'not in':
+            matches = ~values.isin(value)
+        else:
+            raise ValueError(f"Unsupported filter operator: {op}")
+        mask &= np.asarray(matches, dtype=bool)
+    return mask
+
+def _read_columns(columns: Optional[List[str]], filters: Optional[List[Tuple[str, str, Any]]]) -> Optional[List[str]]:
+    """Columns to read so that filters can be evaluated on a projected read."""
+    if columns is None:
+        return None
+    return list(columns) + [column for column, _, _ in filters or [] if column not in columns]
+
+def _project_and_filter(data: pd.DataFrame, columns: Optional[List[str]],
+                        filters: Optional[List[Tuple[str, str, Any]]]) -> pd.DataFrame:
+    if filters:
+        data = data[_filter_mask(data, filters)]
+    if columns is not None and list(data.columns) != list(columns):
+        data = data[list(columns)]
+    return data.reset_index(drop=True) if filters else data
+
+def _stable_categories(chunks: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """
+    Give categorical columns one append-only category list across chunks.
+
+    Each chunk parsed as ``category`` gets its own categories; here new values are appended to
+    the categories seen so far, so a value keeps the same code in every chunk and each chunk's
+    categories are a prefix of the next chunk's.
+    """
+    categories: Dict[str, pd.Index] = {}
+    for chunk in chunks:
+        for col in chunk.columns:
+            if isinstance(chunk[col].dtype, pd.CategoricalDtype):
+                known = categories.get(col)
+                observed = chunk[col].cat.categories
+                known = observed if known is None else known.append(observed.difference(known, sort=False))
+                categories[col] = known
+                chunk[col] = chunk[col].cat.set_categories(known)
+        yield chunk
+
+def hll_precision(error: float) -> int:
+    """HyperLogLog register-count exponent for a target relative standard error, clipped to [11, 18]."""
+    return int(np.clip(np.ceil(np.log2((1.04 / error) ** 2)), 11, 18))
+
+def estimate_distinct(values: Union[pd.Series, np.ndarray], error: float = 0.01) -> float:
+    """
+    HyperLogLog estimate of the number of distinct non-missing values.
+    
+    Args:
+        values (Union[pd.Series, np.ndarray]): Column values.
+        error (float): Target relative standard error; 1.04 / sqrt(registers) for HyperLogLog,
+            so 0.01 uses 2^14 registers (between 2^11 and 2^18).
+            
+    Returns:
+        float: Estimated distinct count.
+    """
+    values = pd.Series(values).dropna().to_numpy()
+    precision = hll_precision(error)
+    registers = np.zeros(1 << precision, dtype=np.uint8)
+    hashes = pd.util.hash_array(values)
+    tail_bits = 64 - precision
+    # The tail has at most 53 bits, so it converts to float exactly and frexp's exponent is its
+    # bit length; the register rank is the position of its leading one bit.
+    ranks = tail_bits + 1 - np.frexp((hashes & np.uint64((1 << tail_bits) - 1)).astype(np.float64))[1]
+    np.maximum.at(registers, (hashes >> np.uint64(tail_bits)).astype(np.int64), ranks.astype(np.uint8))
+    m = len(registers)
+    estimate = 0.7213 / (1 + 1.079 / m) * m * m / np.sum(np.exp2(-registers.astype(np.float64)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and zeros:
+        # Linear counting is more accurate while many registers are still empty.
+        estimate = m * np.log(m / zeros)
+    return float(estimate)
+
+def numerical_columns(data: pd.DataFrame, threshold: float = 0.5, cardinality: str = 'exact',
+                      error: float = 0.01) -> List[str]:
+    """
+    Numeric columns whose distinct-value ratio is at least ``threshold``; numeric columns below
+    it are treated as categorical. ``cardinality`` is 'exact' (``nunique``) or 'hll'
+    (``estimate_distinct`` with relative error ``error``).
+    """
+    if cardinality not in ('exact', 'hll'):
+        raise ValueError(f"Unsupported cardinality method: {cardinality}")
+    rows = max(len(data), 1)
+    numerical = []
+    for col in data.select_dtypes(include=[np.number]).columns:
+        distinct = data[col].nunique() if cardinality == 'exact' else estimate_distinct(data[col], error)
+        if distinct / rows >= threshold:
+            numerical.append(col)
+    return numerical
+
+def schema_fingerprint(data: pd.DataFrame, threshold: float, cardinality: str = 'exact',
+                       error: float = 0.01) -> str:
+    """
+    Hash of the column names, dtypes, role threshold and cardinality settings (method, error and
+    HyperLogLog precision), used to key cached column roles.
+    """
+    schema = [[str(col), str(dtype)] for col, dtype in data.dtypes.items()] + \
+        [threshold, cardinality, error, hll_precision(error)]
+    return hashlib.blake2b(json.dumps(schema).encode('utf-8'), digest_size=16).hexdigest()
+
+class RunningColumnStats:
+    """
+    Statistics for the preprocessing transforms, accumulated chunk by chunk in one pass.
+
+    Numeric columns keep a non-missing count, mean and sum of squared deviations, merged
+    across chunks with Chan et al.'s parallel update. Categorical columns keep value counts,
+    which give both the most frequent value (for imputation) and the vocabulary (for label
+    encoding). Object columns are counted by the ``str`` form of their values, the key they are
+    encoded by, so mixed values such as ``1`` and ``'1'`` are one category. The results match fitting the in-memory imputers, scaler and encoders on the
+    concatenated data.
+    """
+    def __init__(self, numerical_cols: List[str], categorical_cols: List[str]):
+        self.numerical_cols = list(numerical_cols)
+        self.categorical_cols = list(categorical_cols)
+        self.rows = 0
+        self.count = np.zeros(len(self.numerical_cols))
+        self.mean = np.zeros(len(self.numerical_cols))
+        self.m2 = np.zeros(len(self.numerical_cols))
+        self.category_counts: Dict[str, Dict[Any, int]] = {col: {} for col in self.categorical_cols}
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        self.rows += len(chunk)
+        if self.numerical_cols:
+            values = chunk[self.numerical_cols].to_numpy(dtype=np.float64)
+            present = ~np.isnan(values)
+            count = present.sum(axis=0)
+            chunk_mean = np.where(present, values, 0.0).sum(axis=0) / np.maximum(count, 1)
+            chunk_m2 = np.where(present, values - chunk_mean, 0.0) ** 2
+            total = self.count + count
+            delta = chunk_mean - self.mean
+            safe_total = np.maximum(total, 1)
+            self.mean = self.mean + delta * count / safe_total
+            self.m2 = self.m2 + chunk_m2.sum(axis=0) + delta ** 2 * self.count * count / safe_total
+            self.count = total
+        for col in self.categorical_cols:
+            counts = self.category_counts[col]
+            value_counts = chunk[col].value_counts(dropna=True)
+            if chunk[col].dtype == object:
+                value_counts = value_counts.groupby(value_counts.index.map(str)).sum()
+            for value, count in value_counts.items():
+                if count:
+                    counts[value] = counts.get(value, 0) + int(count)
+
+    def scales(self) -> np.ndarray:
+        """Standard deviations after mean imputation (imputed rows add no deviation)."""
+        variance = self.m2 / max(self.rows, 1)
+        scale = np.sqrt(variance)
+        return np.where(scale > 0, scale, 1.0)
+
+    def most_frequent(self, col: str) -> Any:
+        counts = self.category_counts[col]
+        if not counts:
+            return 'missing'
+        top = max(counts.values())
+        ties = [value for value, count in counts.items() if count == top]
+        try:
+            return min(ties)
+        except TypeError:
+            return min(ties, key=str)
+
+    def to_spec(self, columns: List[str]) -> TransformSpec:
+        """Freeze the accumulated statistics into a serializable ``TransformSpec``."""
+        vocabularies, fill_values = {}, {}
+        for col in self.categorical_cols:
+            fill_values[col] = str(self.most_frequent(col))
+            vocabularies[col] = sorted({str(value) for value in self.category_counts[col]} | {fill_values[col]})
+        return TransformSpec(columns, self.numerical_cols, self.mean, self.scales(), self.categorical_cols,
+                             vocabularies, fill_values)
+
+class _ChunkWriter:
+    """Appends transformed chunks to a CSV, JSON lines or Parquet file."""
+    def __init__(self, output_path: Path, file_type: str):
+        self.output_path = output_path
+        self.file_type = file_type.lower()
+        self.parquet_writer = None
+        self.chunks = 0
+        if self.file_type not in ('csv', 'jsonl', 'parquet'):
+            raise ValueError(f"Unsupported file type for streamed output: {file_type}")
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if output_path.exists():
+            output_path.unlink()
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        if self.file_type == 'csv':
+            chunk.to_csv(self.output_path, mode='a', header=self.chunks == 0, index=False)
+        elif self.file_type == 'jsonl':
+            with open(self.output_path, 'a') as f:
+                chunk.to_json(f, orient='records', lines=True)
+        else:
+            pa, ds, pq = _import_pyarrow()
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self.parquet_writer is None:
+                self.parquet_writer = pq.ParquetWriter(str(self.output_path), table.schema)
+            self.parquet_writer.write_table(table)
+        self.chunks += 1
+
+    def close(self) -> None:
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+
+def _column_blocks(data: pd.DataFrame, num_blocks: int) -> List[List[str]]:
+    """Partition the columns into at most ``num_blocks`` blocks of similar cost, largest first."""
+    numeric = set(data.select_dtypes(include=[np.number]).columns)
+    # Hashing strings costs several times more per row than arithmetic on numbers.
+    costs = {col: data[col].memory_usage(index=False) * (1 if col in numeric else 4) for col in data.columns}
+    blocks: List[List[str]] = [[] for _ in range(min(num_blocks, len(costs)))]
+    loads = np.zeros(len(blocks))
+    for col in sorted(costs, key=costs.get, reverse=True):
+        block = int(np.argmin(loads))
+        blocks[block].append(col)
+        loads[block] += costs[col]
+    order = {col: i for i, col in enumerate(data.columns)}
+    return [sorted(block, key=order.get) for block in blocks if block]
+
+def _create_shared(shape: Tuple[int, ...], dtype) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    dtype = np.dtype(dtype)
+    shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+def _arrow_column(pa, values: pd.Series):
+    if values.dtype == object:
+        # Object columns may mix types (e.g. 'x', 1, 2.5), which Arrow cannot type. They are
+        # counted and encoded by their string forms anyway, so share those; missing values
+        # stay missing.
+        values = values.astype(str).where(values.notna(), None)
+    return pa.array(values, from_pandas=True)
+
+def _share_table(data: pd.DataFrame) -> Tuple[shared_memory.SharedMemory, Tuple[str, int]]:
+    """Write ``data`` as an Arrow IPC stream into a new shared-memory block."""
+    pa, ds, pq = _import_pyarrow()
+    table = pa.Table.from_arrays([_arrow_column(pa, data[col]) for col in data.columns],
+                                 names=[str(col) for col in data.columns])
+    sink = pa.MockOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    shm = shared_memory.SharedMemory(create=True, size=max(sink.size(), 1))
+    buffer = pa.py_buffer(shm.buf)
+    with pa.ipc.new_stream(pa.FixedSizeBufferWriter(buffer), table.schema) as writer:
+        writer.write_table(table)
+    # Arrow must drop its view of the block before it can be closed.
+    del buffer, writer
+    return shm, (shm.name, sink.size())
+
+def _attach_frame(spec: Tuple[str, int], columns: List[str]) -> Tuple[shared_memory.SharedMemory, pd.DataFrame]:
+    """Read ``columns`` of a table shared by ``_share_table``; fixed-width columns are not copied."""
+    pa, ds, pq = _import_pyarrow()
+    name, size = spec
+    shm = shared_memory.SharedMemory(name=name)
+    table = pa.ipc.open_stream(pa.py_buffer(shm.buf)[:size]).read_all()
+    return shm, table.select(columns).to_pandas()
+
+def _fit_block(columns: List[str], table_spec: Tuple[str, int], numerical: Optional[List[str]] = None,
+               threshold: float = 0.5, cardinality: str = 'exact', error: float = 0.01) -> TransformSpec:
+    """
+    Fit statistics for one block of columns, as ``DataPreprocessor.fit`` does. Column roles are
+    identified within the block (see ``numerical_columns``) unless its ``numerical`` columns are given.
+    """
+    shm, frame = _attach_frame(table_spec, columns)
+    try:
+        if numerical is None:
+            numerical = numerical_columns(frame, threshold, cardinality, error)
+        stats = RunningColumnStats(numerical, [col for col in columns if col not in numerical])
+        stats.update(frame)
+        return stats.to_spec(columns)
+    finally:
+        del frame
+        shm.close()
+
+def _transform_block(spec: TransformSpec, table_spec: Tuple[str, int],
+                     outputs: Dict[str, Tuple[str, Tuple[int, int], str]], rows: Dict[str, Tuple[str, int]]) -> None:
+    """
+    Transform one block of columns, writing each column into its row of the shared output
+    arrays; ``rows`` maps a column to its output ('numerical' or 'categorical') and row.
+    """
+    shm, frame = _attach_frame(table_spec, spec.columns)
+    handles, targets = [shm], {}
+    try:
+        for kind, (name, shape, dtype) in outputs.items():
+            handles.append(shared_memory.SharedMemory(name=name))
+            targets[kind] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=handles[-1].buf)
+        for col, values in spec.transform_columns(frame).items():
+            kind, row = rows[col]
+            targets[kind][row] = values
+    finally:
+        del frame, targets
+        for handle in handles:
+            handle.close()
+
+class CategoricalEncoder:
+    """
+    Vectorized encoder for one categorical column.
+
+    Fitting factorizes the raw values with pandas' hash table and only converts the distinct
+    values to strings, so cost is dominated by one hashing pass instead of a per-row ``str``
+    cast and sort. Methods:
+
+    * ``'label'``: codes identical to ``LabelEncoder().fit_transform(values.astype(str))``.
+    * ``'hash'``: ``hash(value) % hash_buckets``; needs no fitting and never sees unseen values.
+    * ``'frequency'``: share of training rows holding the category.
+    * ``'target'``: smoothed mean of the target per category,
+      ``(sum + smoothing * prior) / (count + smoothing)``.
+
+    Unseen categories at transform time map to ``unseen_value`` for label codes, 0 for
+    frequencies and the global target mean for target encoding.
+    """
+    METHODS = ('label', 'hash', 'frequency', 'target')
+
+    def __init__(self, method: str = 'label', dtype=np.int64, unseen_value: int = -1,
+                 hash_buckets: int = 1 << 20, smoothing: float = 10.0):
+        if method not in self.METHODS:
+            raise ValueError(f"Unsupported encoding method: {method}")
+        self.method = method
+        self.dtype = np.dtype(dtype)
+        self.unseen_value = unseen_value
+        self.hash_buckets = hash_buckets
+        self.smoothing = smoothing
+        self.categories: Optional[pd.Index] = None
+        self.category_codes: Optional[np.ndarray] = None
+        self.classes_: Optional[np.ndarray] = None
+        self.table: Optional[np.ndarray] = None
+        self.prior = 0.0
+
+    def fit(self, values: Union[pd.Series, np.ndarray], target: Optional[np.ndarray] = None) -> 'CategoricalEncoder':
+        if self.method != 'hash':
+            self._fit(values, target)
+        return self
+
+    def _fit(self, values: Union[pd.Series, np.ndarray], target: Optional[np.ndarray]) -> np.ndarray:
+        """Fit on ``values`` and return their class codes, so fit_transform needs no second lookup."""
+        codes, uniques, keys = factorize(values)
+        missing = codes < 0
+        if missing.any():
+            # Missing values keep their Series.astype(str) form as their class; they stay out
+            # of ``categories`` and are resolved by the string fallback in class_codes.
+            missing_keys = self._string_keys(np.asarray(values, dtype=object)[missing])
+            extra_keys, extra_codes = np.unique(missing_keys, return_inverse=True)
+            codes = codes.copy()
+            codes[missing] = len(keys) + extra_codes
+            keys = np.append(keys, extra_keys)
+        # Distinct raw values with the same string form (e.g. 3 and '3') share one class.
+        self.classes_, key_codes = np.unique(keys, return_inverse=True)
+        self.categories = uniques
+        self.category_codes = key_codes[:len(uniques)]
+        class_codes = key_codes[codes]
+        counts = np.bincount(class_codes, minlength=len(self.classes_))
+        if self.method == 'frequency':
+            self.table = counts / max(len(class_codes), 1)
+        elif self.method == 'target':
+            if target is None:
+                raise ValueError("Target encoding needs a target")
+            target = np.asarray(target, dtype=np.float64)
+            self.prior = float(target.mean()) if len(target) else 0.0
+            sums = np.bincount(class_codes, weights=target, minlength=len(self.classes_))
+            self.table = (sums + self.smoothing * self.prior) / (counts + self.smoothing)
+        return class_codes
+
+    @staticmethod
+    def _string_keys(values: np.ndarray) -> np.ndarray:
+        return np.asarray(pd.Series(values, dtype=object).astype(str), dtype=str)
+
+    def class_codes(self, values: Union[pd.Series, np.ndarray]) -> np.ndarray:
+        """Class index per value, or -1 for categories not seen during fit."""
+        positions = self.categories.get_indexer(values)
+        codes = np.where(positions >= 0, self.category_codes[np.maximum(positions, 0)], -1)
+        unseen = np.flatnonzero(positions < 0)
+        if len(unseen):
+            # Fall back to the string form for the few rows whose raw value was not seen.
+            keys = self._string_keys(np.asarray(values, dtype=object)[unseen])
+            matches = np.minimum(np.searchsorted(self.classes_, keys), len(self.classes_) - 1)
+            codes[unseen] = np.where(self.classes_[matches] == keys, matches, -1)
+        return codes
+
+    def transform(self, values: Union[pd.Series, np.ndarray]) -> np.ndarray:
+        if self.method == 'hash':
+            hashes = pd.util.hash_pandas_object(pd.Series(values), index=False).to_numpy()
+            return (hashes % np.uint64(self.hash_buckets)).astype(self.dtype)
+        if self.categories is None:
+            raise ValueError("CategoricalEncoder is not fitted")
+        return self._encode(self.class_codes(values))
+
+    def _encode(self, codes: np.ndarray) -> np.ndarray:
+        if self.method == 'label':
+            return np.where(codes >= 0, codes, self.unseen_value).astype(self.dtype)
+        fallback = 0.0 if self.method == 'frequency' else self.prior
+        return np.where(codes >= 0, self.table[np.maximum(codes, 0)], fallback)
+
+    def fit_transform(self, values: Union[pd.Series, np.ndarray], target: Optional[np.ndarray] = None) -> np.ndarray:
+        if self.method == 'hash':
+            return self.transform(values)
+        return self._encode(self._fit(values, target))
+
 class DataPreprocessor:
     
     """
     A comprehensive data preprocessing class for cleaning, normalizing, and augmenting data
     for machine learning model training.
     """
-    def __init__(self, logger: Optional[logging.Logger] = None):
+    def __init__(self, logger: Optional[logging.Logger] = None, num_workers: int = 1,
+                 context: Optional[str] = None, cardinality: str = 'exact', cardinality_error: float = 0.01,
+                 role_cache_dir: Optional[Union[str, Path]] = None):
         """
         Initialize the DataPreprocessor with optional logging.
         
         Args:
             logger (Optional[logging.Logger]): Logger instance for tracking preprocessing steps.
+            num_workers (int): Worker processes for ``fit``/``transform``. Above 1, the columns are
+                partitioned into blocks that are fitted and transformed in a process pool.
+            context (Optional[str]): Multiprocessing start method for the pool.
+            cardinality (str): How ``identify_columns`` counts distinct values: 'exact' or 'hll'
+                (HyperLogLog sketch, see ``estimate_distinct``).
+            cardinality_error (float): Relative standard error of the 'hll' estimate.
+            role_cache_dir (Optional[Union[str, Path]]): Directory caching column roles per schema
+                fingerprint, so tables with a known schema skip the cardinality scan.
         """
+        if cardinality not in ('exact', 'hll'):
+            raise ValueError(f"Unsupported cardinality method: {cardinality}")
         self.logger = logger or logging.getLogger(__name__)
+        self.num_workers = max(1, num_workers)
+        self.ctx = mp.get_context(context)
+        self.cardinality = cardinality
+        self.cardinality_error = cardinality_error
+        self.role_cache_dir = Path(role_cache_dir) if role_cache_dir is not None else None
         self.scaler = StandardScaler()
         self.label_encoders: Dict[str, LabelEncoder] = {}
+        self.categorical_encoders: Dict[str, CategoricalEncoder] = {}
         self.imputer_numeric = SimpleImputer(strategy='mean')
         self.imputer_categorical = SimpleImputer(strategy='most_frequent')
         self.numerical_cols: List[str] = []
         self.categorical_cols: List[str] = []
+        self.transform_spec: Optional[TransformSpec] = None
 
-    def load_data(self, file_path: Union[str, Path], file_type: str = 'csv') -> pd.DataFrame:
+    def load_data(self, file_path: Union[str, Path], file_type: str = 'csv', columns: Optional[List[str]] = None,
+                  filters: Optional[List[Tuple[str, str, Any]]] = None, memory_map: bool = True,
+                  dtype: Optional[Dict[str, str]] = None) -> pd.DataFrame:
         """
-        Load data from a file (CSV, JSON, etc.).
+        Load data from a file (CSV, JSON, Parquet, Feather or Arrow IPC).
         
         Args:
             file_path (Union[str, Path]): Path to the data file.
-            file_type (str): Type of file ('csv', 'json', etc.). Defaults to 'csv'.
+            file_type (str): 'csv', 'json', 'jsonl', 'parquet', 'feather' or 'arrow'/'ipc'. Defaults to 'csv'.
+            columns (Optional[List[str]]): Only load these columns.
+            filters (Optional[List[Tuple[str, str, Any]]]): Conjunctive row filters such as
+                ``[('amount', '>', 0), ('chain', 'in', ['sol', 'eth'])]``. For Parquet they are pushed
+                down to skip row groups; CSV and line-delimited JSON apply them chunk by chunk while
+                reading. A JSON array is filtered after it has been read in full, and Feather/Arrow
+                IPC after the file has been mapped.
+            memory_map (bool): Memory-map Parquet/Arrow files instead of reading them into buffers.
+            dtype (Optional[Dict[str, str]]): Explicit CSV column dtypes (see ``infer_csv_dtypes``).
             
         Returns:
             pd.DataFrame: Loaded data as a pandas DataFrame.
@@ -44,10 +501,28 @@ class DataPreprocessor:
             if not file_path.exists():
                 raise FileNotFoundError(f"File not found at {file_path}")
             
-            if file_type.lower() == 'csv':
-                data = pd.read_csv(file_path)
-            elif file_type.lower() == 'json':
-                data = pd.read_json(file_path)
+            file_type = file_type.lower()
+            if file_type == 'csv':
+                if filters:
+                    # Filter chunk by chunk so rows that are dropped are never all in memory at once.
+                    chunks = list(self.iter_chunks(file_path, 'csv', columns=columns, filters=filters,
+                                                   dtype=dtype or {}))
+                    # Widen every chunk to the final categories so concat keeps the category dtype.
+                    for chunk in chunks[:-1]:
+                        for col in chunk.columns:
+                            if isinstance(chunk[col].dtype, pd.CategoricalDtype):
+                                chunk[col] = chunk[col].cat.set_categories(chunks[-1][col].cat.categories)
+                    data = pd.concat(chunks, ignore_index=True)
+                else:
+                    data = pd.read_csv(file_path, usecols=columns, dtype=dtype)
+            elif file_type == 'jsonl' and filters:
+                data = pd.concat(list(self.iter_chunks(file_path, 'jsonl', columns=columns, filters=filters)),
+                                 ignore_index=True)
+            elif file_type in ('json', 'jsonl'):
+                data = pd.read_json(file_path, lines=file_type == 'jsonl')
+                data = _project_and_filter(data, columns, filters)
+            elif file_type in COLUMNAR_FILE_TYPES:
+                data = self._read_arrow_table(file_path, file_type, columns, filters, memory_map).to_pandas()
             else:
                 raise ValueError(f"Unsupported file type: {file_type}")
                 
@@ -57,53 +532,176 @@ class DataPreprocessor:
             self.logger.error(f"Error loading data: {str(e)}")
             raise
 
-    def identify_columns(self, data: pd.DataFrame, threshold: float = 0.5) -> None:
-let state = &mut ctx.accounts.state;
-        let holder = &mut ctx.accounts.holder;
-        require!(!holder.active, AeryonError::AlreadyActive);
-        holder.owner = ctx.accounts.owner.key();
-        holder.active = true;
-recompute_pressure(state)?;
-        emit!(HolderEnter {
-            owner: holder.owner,
-            active_holders: state.active_holders,
-            pressure_index: state.pressure_index
-
-$Aeryon  
-)}
+    def _read_arrow_table(self, file_path: Path, file_type: str, columns: Optional[List[str]],
+                          filters: Optional[List[Tuple[str, str, Any]]], memory_map: bool):
+        pa, ds, pq = _import_pyarrow()
+        if file_type == 'parquet':
+            return pq.read_table(file_path, columns=columns, filters=filters or None, memory_map=memory_map)
+        source = pa.memory_map(str(file_path)) if memory_map else pa.OSFile(str(file_path))
+        table = pa.ipc.open_file(source).read_all()
+        if filters:
+            table = table.filter(pq.filters_to_expression(filters))
+        return table.select(columns) if columns is not None else table
 
+    def infer_csv_dtypes(self, file_path: Union[str, Path], sample_rows: int = 10000,
+                         columns: Optional[List[str]] = None, categorical_ratio: float = 0.05,
+                         float_dtype: str = 'float32') -> Dict[str, str]:
+        """
+        Infer compact CSV dtypes from the first ``sample_rows`` rows of a file.
+        
+        Float columns are narrowed to ``float_dtype`` and text columns whose unique ratio in the
+        sample is below ``categorical_ratio`` are read as ``category``. Integer and other columns
+        are left to the parser, so a later NaN in an integer column cannot break the read.
+        
+        Args:
+            file_path (Union[str, Path]): Path to the CSV file.
+            sample_rows (int): Number of leading rows to sample.
+            columns (Optional[List[str]]): Only infer dtypes for these columns.
+            categorical_ratio (float): Unique ratio below which text columns become categories.
+            float_dtype (str): Dtype for floating-point columns.
+            
+        Returns:
+            Dict[str, str]: Column name to dtype, suitable for ``pd.read_csv(dtype=...)``.
+        """
+        sample = pd.read_csv(file_path, nrows=sample_rows, usecols=columns)
+        dtypes = {}
+        for col in sample.columns:
+            series = sample[col]
+            if pd.api.types.is_float_dtype(series):
+                dtypes[col] = float_dtype
+            elif not pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series) \
+                    and series.nunique() < categorical_ratio * max(len(series), 1):
+                dtypes[col] = 'category'
+        self.logger.info(f"Inferred dtypes from {len(sample)} sampled rows of {file_path}: {dtypes}")
+        return dtypes
 
+    def iter_chunks(self, file_path: Union[str, Path], file_type: str = 'csv', chunksize: int = 100000,
+                    columns: Optional[List[str]] = None, filters: Optional[List[Tuple[str, str, Any]]] = None,
+                    memory_map: bool = True, dtype: Optional[Dict[str, str]] = None,
+                    sample_rows: int = 10000) -> Iterator[pd.DataFrame]:
+        """
+        Stream a file as DataFrames of at most ``chunksize`` rows, so files larger than memory
+        can be processed chunk by chunk.
+        
+        CSV chunks are all parsed with the same dtypes: ``dtype`` if given, otherwise the result
+        of ``infer_csv_dtypes`` on the first ``sample_rows`` rows. Categorical columns share one
+        append-only category list, so codes are consistent across chunks. JSON must be line-delimited
+        ('jsonl'). Parquet is scanned with projection and filter pushdown; Feather/Arrow IPC files
+        are memory-mapped and sliced record batch by record batch.
         
+        Args:
+            file_path (Union[str, Path]): Path to the data file.
+            file_type (str): 'csv', 'jsonl', 'parquet', 'feather' or 'arrow'/'ipc'. Defaults to 'csv'.
+            chunksize (int): Maximum rows per chunk (before filtering for CSV/JSON).
+            columns (Optional[List[str]]): Only load these columns.
+            filters (Optional[List[Tuple[str, str, Any]]]): Conjunctive row filters (see ``load_data``).
+            memory_map (bool): Memory-map Arrow IPC files.
+            dtype (Optional[Dict[str, str]]): Explicit CSV column dtypes.
+            sample_rows (int): Rows sampled for CSV dtype inference.
+            
+        Yields:
+            pd.DataFrame: Consecutive chunks of the file.
+        """
+        try:
+            file_path = Path(file_path)
+            if not file_path.exists():
+                raise FileNotFoundError(f"File not found at {file_path}")
+            file_type = file_type.lower()
+            read_columns = _read_columns(columns, filters)
+            rows = 0
+            if file_type == 'csv':
+                if dtype is None:
+                    dtype = self.infer_csv_dtypes(file_path, sample_rows, read_columns)
+                chunks = (_project_and_filter(chunk, columns, filters) for chunk in
+                          pd.read_csv(file_path, usecols=read_columns, dtype=dtype, chunksize=chunksize))
+            elif file_type == 'jsonl':
+                chunks = (_project_and_filter(chunk, columns, filters) for chunk in
+                          pd.read_json(file_path, lines=True, chunksize=chunksize))
+            elif file_type == 'parquet':
+                pa, ds, pq = _import_pyarrow()
+                scanner = ds.dataset(str(file_path), format='parquet').to_batches(
+                    columns=columns, filter=pq.filters_to_expression(filters) if filters else None,
+                    batch_size=chunksize)
+                chunks = (batch.to_pandas() for batch in scanner)
+            elif file_type in COLUMNAR_FILE_TYPES:
+                chunks = self._iter_ipc_chunks(file_path, chunksize, columns, filters, memory_map)
+            else:
+                raise ValueError(f"Unsupported file type for chunked reading: {file_type}")
+
+            for chunk in _stable_categories(chunks):
+                rows += len(chunk)
+                yield chunk
+            self.logger.info(f"Streamed {rows} rows from {file_path}")
+        except Exception as e:
+            self.logger.error(f"Error streaming data: {str(e)}")
+            raise
+
+    def _iter_ipc_chunks(self, file_path: Path, chunksize: int, columns: Optional[List[str]],
+                         filters: Optional[List[Tuple[str, str, Any]]], memory_map: bool) -> Iterator[pd.DataFrame]:
+        pa, ds, pq = _import_pyarrow()
+        expression = pq.filters_to_expression(filters) if filters else None
+        source = pa.memory_map(str(file_path)) if memory_map else pa.OSFile(str(file_path))
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            table = pa.Table.from_batches([reader.get_batch(i)])
+            if expression is not None:
+                table = table.filter(expression)
+            if columns is not None:
+                table = table.select(columns)
+            for offset in range(0, table.num_rows, chunksize):
+                yield table.slice(offset, chunksize).to_pandas()
+
+    def identify_columns(self, data: pd.DataFrame, threshold: float = 0.5) -> None:
         """
         Identify numerical and categorical columns based on data types and unique value ratio.
         
+        Numeric columns with a distinct-value ratio below ``threshold`` and all non-numeric
+        columns are categorical. Distinct values are counted with ``self.cardinality``, and roles
+        are read from (and saved to) ``role_cache_dir`` when it is set.
+        
         Args:
             data (pd.DataFrame): Input DataFrame.
-            state.mint = ctx.accounts.mint.key();
-        state.total_supply = 0;
-        state.active_holders = 0;
-        state.precision = precision.max(1_000_000_000_000u128);
             threshold (float): Threshold for unique value ratio to determine categorical columns.
         """
         try:
-            self.numerical_cols = data.select_dtypes(include=[np.number]).columns.tolist()
-            potential_categorical = data.select_dtypes(exclude=[np.number]).columns.tolist()
-            
-            for col in data.columns:
-                if col in self.numerical_cols:
-                    unique_ratio = data[col].nunique() / len(data[col])
-                    if unique_ratio < threshold:
-                        self.numerical_cols.remove(col)
-                        self.categorical_cols.append(col)
-                else:
-                    self.categorical_cols.append(col)
-                    
+            roles = self._cached_roles(data, threshold)
+            if roles is not None:
+                self.numerical_cols, self.categorical_cols = roles
+                self.logger.info(f"Loaded cached roles for {len(data.columns)} columns")
+                return
+            self.numerical_cols = numerical_columns(data, threshold, self.cardinality, self.cardinality_error)
+            self.categorical_cols = [col for col in data.columns if col not in self.numerical_cols]
+            self._cache_roles(data, threshold)
             self.logger.info(f"Identified {len(self.numerical_cols)} numerical and "
                             f"{len(self.categorical_cols)} categorical columns")
         except Exception as e:
             self.logger.error(f"Error identifying columns: {str(e)}")
             raise
 
+    def _role_cache_path(self, data: pd.DataFrame, threshold: float) -> Optional[Path]:
+        if self.role_cache_dir is None:
+            return None
+        fingerprint = schema_fingerprint(data, threshold, self.cardinality, self.cardinality_error)
+        return self.role_cache_dir / f"roles-{fingerprint}.json"
+
+    def _cached_roles(self, data: pd.DataFrame, threshold: float) -> Optional[Tuple[List[str], List[str]]]:
+        path = self._role_cache_path(data, threshold)
+        if path is None or not path.exists():
+            return None
+        with open(path, 'r') as f:
+            roles = json.load(f)
+        return roles['numerical_cols'], roles['categorical_cols']
+
+    def _cache_roles(self, data: pd.DataFrame, threshold: float) -> None:
+        path = self._role_cache_path(data, threshold)
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({'numerical_cols': self.numerical_cols, 'categorical_cols': self.categorical_cols}, f)
+        os.replace(tmp_path, path)
+
     def handle_missing_values(self, data: pd.DataFrame) -> pd.DataFrame:
         """
         Handle missing values in the dataset using imputation.
@@ -130,38 +728,41 @@ $Aeryon
             self.logger.error(f"Error handling missing values: {str(e)}")
             raise
 
-    def encode_categorical(self, data: pd.DataFrame) -> pd.DataFrame:
+    def encode_categorical(self, data: pd.DataFrame, method: str = 'label', dtype=np.int64,
+                           target: Optional[Union[str, pd.Series, np.ndarray]] = None,
+                           hash_buckets: int = 1 << 20, smoothing: float = 10.0) -> pd.DataFrame:
         """
-        Encode categorical variables into numerical format using LabelEncoder.
+        Encode categorical variables into numerical format.
         
         Args:
             data (pd.DataFrame): Input DataFrame with categorical columns.
+            method (str): 'label' (LabelEncoder-compatible codes), 'hash', 'frequency' or
+                'target' (see ``CategoricalEncoder``). Defaults to 'label'.
+            dtype: Integer dtype for label/hash codes, e.g. np.int32 to halve memory.
+            target (Optional[Union[str, pd.Series, np.ndarray]]): Target values, or the name of
+                the target column, for target encoding. A target column is never encoded itself.
+            hash_buckets (int): Number of buckets for hash encoding.
+            smoothing (float): Prior weight for target encoding.
             
         Returns:
             pd.DataFrame: DataFrame with encoded categorical columns.
         """
         try:
+            target_values = data[target] if isinstance(target, str) else target
             for col in self.categorical_cols:
-                if col in data.columns:
-                    self.label_encoders[col] = LabelEncoder()
-                    data[col] = self.label_encoders[col].fit_transform(data[col].astype(str))
-            self.logger.info("Categorical variables encoded successfully")
+                if col in data.columns and not (isinstance(target, str) and col == target):
+                    encoder = CategoricalEncoder(method, dtype=dtype, hash_buckets=hash_buckets, smoothing=smoothing)
+                    data[col] = encoder.fit_transform(data[col], target_values)
+                    self.categorical_encoders[col] = encoder
+                    if method == 'label':
+                        self.label_encoders[col] = LabelEncoder()
+                        self.label_encoders[col].classes_ = encoder.classes_
+            self.logger.info(f"Categorical variables encoded successfully using {method} encoding")
             return data
         except Exception as e:
             self.logger.error(f"Error encoding categorical variables: {str(e)}")
             raise
 
-    #[derive(Accounts)]
-#[instruction(bump_state: u8)]
-pub struct Initialize<'info> {
-    #[account(
-        init,
-        payer = payer,
-        seeds = [b"aeryon_state", mint.key().as_ref()],
-        bump,
-        space = 8 + State::SIZE
-)}
-
     def normalize_data(self, data: pd.DataFrame) -> pd.DataFrame:
         """
         Normalize numerical data using StandardScaler.
@@ -184,6 +785,7 @@ pub struct Initialize<'info> {
     def augment_data(self, data: pd.DataFrame, method: str = 'noise', factor: float = 0.1) -> pd.DataFrame:
         """
         Augment data by adding noise or duplicating with modifications for numerical columns.
+        This materializes the augmented rows; ``augment_batches`` yields them lazily instead.
         
         Args:
             data (pd.DataFrame): Input DataFrame to augment.
@@ -213,38 +815,158 @@ pub struct Initialize<'info> {
             self.logger.error(f"Error augmenting data: {str(e)}")
             raise
 
- pub fn record_pulse(ctx: Context<RecordPulse>, amount: u64, dir: PulseDir) -> Result<()> {
-        let state = &mut ctx.accounts.state;
-        let mint = &ctx.accounts.mint;
-        state.total_supply = mint.supply;
-        let energy = amount as u128;
-        state.cum_pulse = state.cum_pulse.saturating_add(energy);
-        state.last_update_slot = Clock::get()?.slot;
-        recompute_pressure(state)?;
-        emit!(PulseRecorded {
+    def augment_batches(self, data: pd.DataFrame, batch_size: int = 1024, method: str = 'noise',
+                        factor: float = 0.1, target: Optional[str] = None, seed: Optional[int] = None,
+                        shuffle: bool = True, include_original: bool = True, alpha: float = 0.2,
+                        k_neighbors: int = 5, neighbor_pool: int = 2048,
+                        dtype=np.float32) -> Iterator[Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]]:
+        """
+        Lazily yield training batches of original and augmented rows.
+        
+        Unlike ``augment_data``, nothing is copied or concatenated up front: each batch gathers
+        its source rows straight from the DataFrame's column arrays and synthesizes its augmented
+        rows on the fly, so peak memory is one batch plus a permutation of row indices. The same
+        seed yields the same batches.
+        
+        Numerical columns (``self.numerical_cols``, or the float columns if none were identified)
+        are augmented; other columns, e.g. categorical codes, are copied from the source row.
+        
+        Args:
+            data (pd.DataFrame): Preprocessed data.
+            batch_size (int): Rows per yielded batch.
+            method (str): 'noise' (one Gaussian-noised copy of every row), 'duplicate' (rows
+                resampled with replacement), 'mixup' (convex combinations of two random rows with a
+                Beta(alpha, alpha) weight) or 'smote' (interpolation towards one of the
+                ``k_neighbors`` nearest rows of the same target class).
+            factor (float): Noise standard deviation for 'noise'; ratio of synthetic to original
+                rows for the other methods.
+            target (Optional[str]): Target column, yielded separately. Mixup mixes targets with
+                the row weights; SMOTE keeps the base row's target.
+            seed (Optional[int]): Seed for the row order and all augmentation randomness.
+            shuffle (bool): Interleave original and synthetic rows in a random order.
+            include_original (bool): Yield the original rows as well as the synthetic ones.
+            alpha (float): Beta distribution parameter for mixup.
+            k_neighbors (int): Neighbors per base row for SMOTE.
+            neighbor_pool (int): SMOTE searches for neighbors among this many rows sampled per
+                batch instead of the whole dataset, keeping the cost per batch bounded.
+            dtype: Feature dtype of the yielded batches.
+            
+        Returns:
+            Iterator over np.ndarray batches of shape (rows, features) with columns in ``data``
+            order (minus the target), or over (features, targets) tuples if ``target`` is given.
+            
+        Raises:
+            ValueError: For an unsupported method, a non-positive batch size or a missing target
+                column, raised by this call rather than by the first batch.
+        """
+        if method not in ('noise', 'duplicate', 'mixup', 'smote'):
+            raise ValueError(f"Unsupported augmentation method: {method}")
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        if target is not None and target not in data.columns:
+            raise ValueError(f"Target column {target!r} not in data")
+        rng = np.random.default_rng(seed)
+        feature_cols = [col for col in data.columns if col != target]
+        numeric = set(self.numerical_cols) or set(data.select_dtypes(include=[np.floating]).columns)
+        num = np.array([i for i, col in enumerate(feature_cols) if col in numeric], dtype=np.int64)
+        arrays = [data[col].to_numpy() for col in feature_cols]
+        labels = data[target].to_numpy() if target is not None else None
+        n = len(data)
+
+        def gather(rows: np.ndarray) -> np.ndarray:
+            batch = np.empty((len(rows), len(arrays)), dtype=dtype)
+            for j, values in enumerate(arrays):
+                batch[:, j] = values[rows]
+            return batch
+
+        def synthesize(rows: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+            count = len(rows)
+            base = rows if method == 'noise' else rng.integers(n, size=count)
+            batch = gather(base)
+            batch_labels = labels[base] if labels is not None else None
+            if method == 'noise' and len(num):
+                batch[:, num] += rng.normal(0, factor, size=(count, len(num))).astype(dtype)
+            elif method == 'mixup':
+                other = rng.integers(n, size=count)
+                weights = rng.beta(alpha, alpha, size=count)
+                mixed = gather(other)
+                blended = weights[:, None] * batch[:, num] + (1 - weights[:, None]) * mixed[:, num]
+                # Non-numerical columns come from whichever row dominates the mix.
+                batch = np.where((weights < 0.5)[:, None], mixed, batch)
+                batch[:, num] = blended.astype(dtype)
+                if labels is not None:
+                    batch_labels = weights * labels[base] + (1 - weights) * labels[other]
+            elif method == 'smote' and len(num):
+                pool = rng.choice(n, size=min(n, neighbor_pool), replace=False)
+                points, candidates = batch[:, num].astype(np.float64), gather(pool)[:, num].astype(np.float64)
+                distances = (np.square(points).sum(1)[:, None] + np.square(candidates).sum(1)[None, :] -
+                             2 * points @ candidates.T)
+                distances[base[:, None] == pool[None, :]] = np.inf
+                if labels is not None:
+                    distances[labels[base][:, None] != labels[pool][None, :]] = np.inf
+                k = min(k_neighbors, len(pool))
+                nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+                choice = nearest[np.arange(count), rng.integers(k, size=count)]
+                # Rows without a same-class neighbor in the pool are kept as they are.
+                gaps = rng.random(count) * np.isfinite(distances[np.arange(count), choice])
+                batch[:, num] = (points + gaps[:, None] * (candidates[choice] - points)).astype(dtype)
+            return batch, batch_labels
 
-             )} $Aeryon
+        def generate() -> Iterator[Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]]:
+            synthetic = n if method == 'noise' else int(n * factor)
+            offset = n if include_original else 0
+            order = rng.permutation(offset + synthetic) if shuffle else np.arange(offset + synthetic)
+            for start in range(0, len(order), batch_size):
+                rows = order[start:start + batch_size]
+                original = rows < offset
+                features = np.empty((len(rows), len(arrays)), dtype=dtype)
+                features[original] = gather(rows[original])
+                features[~original], synthetic_labels = synthesize(rows[~original] - offset)
+                if labels is None:
+                    yield features
+                    continue
+                targets = np.empty(len(rows), dtype=np.float64 if method == 'mixup' else labels.dtype)
+                targets[original] = labels[rows[original]]
+                targets[~original] = synthetic_labels
+                yield features, targets
+            self.logger.info(f"Yielded {len(order)} rows ({synthetic} synthetic) using {method} augmentation")
+
+        # Arguments are checked above, when this is called, rather than on the first batch.
+        return generate()
 
     def preprocess_pipeline(self, data: pd.DataFrame, augment: bool = False, 
-                           augment_method: str = 'noise', augment_factor: float = 0.1) -> pd.DataFrame:
+                           augment_method: str = 'noise', augment_factor: float = 0.1,
+                           batch_size: Optional[int] = None, target: Optional[str] = None,
+                           seed: Optional[int] = None) -> Union[pd.DataFrame, Iterator]:
         """
         Run the full preprocessing pipeline on the input data.
         
+        With ``augment`` and a ``batch_size``, the augmented rows are streamed by
+        ``augment_batches`` instead of being concatenated onto a copy of the data, so the
+        pipeline never holds more than the preprocessed data plus one batch.
+        
         Args:
             data (pd.DataFrame): Raw input DataFrame.
             augment (bool): Whether to apply data augmentation. Defaults to False.
             augment_method (str): Augmentation method if augment is True. Defaults to 'noise'.
             augment_factor (float): Factor for augmentation. Defaults to 0.1.
+            batch_size (Optional[int]): Stream augmented batches of this many rows. Defaults to
+                None, which materializes the augmented DataFrame with ``augment_data``.
+            target (Optional[str]): Target column, yielded separately when streaming.
+            seed (Optional[int]): Seed for the streamed batches.
             
         Returns:
-            pd.DataFrame: Fully preprocessed DataFrame.
+            Union[pd.DataFrame, Iterator]: Fully preprocessed DataFrame, or the iterator returned
+            by ``augment_batches`` when streaming.
         """
         try:
             self.logger.info("Starting preprocessing pipeline")
-            self.identify_columns(data)
-            data = self.handle_missing_values(data)
-            data = self.encode_categorical(data)
-            data = self.normalize_data(data)
+            data = self.fit_transform(data)
+            if augment and batch_size is not None:
+                batches = self.augment_batches(data, batch_size=batch_size, method=augment_method,
+                                               factor=augment_factor, target=target, seed=seed)
+                self.logger.info("Preprocessing pipeline completed; streaming augmented batches")
+                return batches
             if augment:
                 data = self.augment_data(data, method=augment_method, factor=augment_factor)
             self.logger.info("Preprocessing pipeline completed successfully")
@@ -253,6 +975,214 @@ pub struct Initialize<'info> {
             self.logger.error(f"Error in preprocessing pipeline: {str(e)}")
             raise
 
+    def fit(self, data: pd.DataFrame) -> TransformSpec:
+        """
+        Fit imputation values, scaling and vocabularies on a DataFrame without modifying it.
+        
+        The scikit-learn ``imputer_numeric``, ``imputer_categorical``, ``scaler`` and
+        ``label_encoders`` are set to match the fitted spec.
+        
+        Args:
+            data (pd.DataFrame): Training data.
+            
+        Returns:
+            TransformSpec: The fitted transform, also kept as ``self.transform_spec``.
+        """
+        try:
+            if self._parallel(data):
+                self._run_column_blocks(data, fit=True, transform=False)
+                return self.transform_spec
+            self.identify_columns(data)
+            stats = RunningColumnStats(self.numerical_cols, self.categorical_cols)
+            stats.update(data)
+            self.transform_spec = stats.to_spec(list(data.columns))
+            self._sync_fitted_objects(len(data))
+            self.logger.info(f"Fitted transform on {len(data)} rows")
+            return self.transform_spec
+        except Exception as e:
+            self.logger.error(f"Error fitting transform: {str(e)}")
+            raise
+
+    def transform(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Impute, encode and normalize data with the fitted (or loaded) transform spec.
+        
+        Args:
+            data (pd.DataFrame): Data with the columns the transform was fitted on.
+            
+        Returns:
+            pd.DataFrame: Preprocessed DataFrame.
+        """
+        if self.transform_spec is None:
+            raise ValueError("DataPreprocessor is not fitted; call fit() or load_transform() first")
+        if self._parallel(data):
+            return self._run_column_blocks(data[self.transform_spec.columns], fit=False, transform=True)
+        return pd.DataFrame(self.transform_spec.transform_columns(data), index=data.index)
+
+    def fit_transform(self, data: pd.DataFrame) -> pd.DataFrame:
+        if self._parallel(data):
+            return self._run_column_blocks(data, fit=True, transform=True)
+        self.fit(data)
+        return self.transform(data)
+
+    def _parallel(self, data: pd.DataFrame) -> bool:
+        return self.num_workers > 1 and len(data.columns) > 1 and len(data) > 0
+
+    def _run_column_blocks(self, data: pd.DataFrame, fit: bool, transform: bool) -> Optional[pd.DataFrame]:
+        """
+        Parallel ``fit``/``transform``: the columns are partitioned into one block per worker.
+        
+        ``data`` is written once into a shared-memory Arrow IPC buffer that every worker reads
+        its block from. Fitting identifies the roles of each block's columns in its worker (unless
+        they are in the role cache) and returns one small ``TransformSpec`` per block, which are
+        combined here. Transforming writes each column straight into its row of a shared float64
+        (numerical) or int64 (categorical) array, so the result is assembled from those two
+        arrays with a single copy out of shared memory.
+        """
+        blocks = _column_blocks(data, self.num_workers)
+        shm, table_spec = _share_table(data)
+        try:
+            with self.ctx.Pool(processes=len(blocks)) as pool:
+                if fit:
+                    roles = self._cached_roles(data, 0.5)
+                    tasks = [(block, table_spec, [col for col in roles[0] if col in block] if roles else None,
+                              0.5, self.cardinality, self.cardinality_error) for block in blocks]
+                    parts = pool.starmap(_fit_block, tasks)
+                    self.transform_spec = TransformSpec.combine(list(data.columns), parts)
+                    self.numerical_cols = list(self.transform_spec.numerical_cols)
+                    self.categorical_cols = list(self.transform_spec.categorical_cols)
+                    if roles is None:
+                        self._cache_roles(data, 0.5)
+                    self._sync_fitted_objects(len(data))
+                    self.logger.info(f"Fitted transform on {len(data)} rows with {len(blocks)} workers")
+                if not transform:
+                    return None
+                spec = self.transform_spec
+                rows = {col: ('numerical', i) for i, col in enumerate(spec.numerical_cols)}
+                rows.update({col: ('categorical', i) for i, col in enumerate(spec.categorical_cols)})
+                outputs, arrays, handles = {}, {}, []
+                try:
+                    for kind, cols, dtype in (('numerical', spec.numerical_cols, np.float64),
+                                              ('categorical', spec.categorical_cols, np.int64)):
+                        out_shm, arrays[kind] = _create_shared((len(cols), len(data)), dtype)
+                        handles.append(out_shm)
+                        outputs[kind] = (out_shm.name, arrays[kind].shape, arrays[kind].dtype.str)
+                    pool.starmap(_transform_block, [(spec.select(block), table_spec, outputs, rows)
+                                                    for block in blocks])
+                    results = {kind: array.copy() for kind, array in arrays.items()}
+                finally:
+                    del arrays
+                    for out_shm in handles:
+                        out_shm.close()
+                        out_shm.unlink()
+        finally:
+            shm.close()
+            shm.unlink()
+        columns = {col: results[kind][row] for col, (kind, row) in rows.items()}
+        return pd.DataFrame({col: columns[col] for col in spec.columns}, index=data.index, copy=False)
+
+    def _sync_fitted_objects(self, rows: Optional[int] = None) -> None:
+        """
+        Set the scikit-learn imputers, scaler and label encoders from ``self.transform_spec``.
+
+        ``fit`` only builds the spec, so this keeps ``imputer_numeric``, ``imputer_categorical``,
+        ``scaler`` (e.g. for ``inverse_transform``) and ``label_encoders`` consistent with the
+        transform that was actually applied, as if the step-by-step methods had been run.
+        ``rows`` is the number of fitted rows, recorded as the scaler's ``n_samples_seen_``.
+        """
+        spec = self.transform_spec
+        self.imputer_numeric = SimpleImputer(strategy='mean')
+        self.imputer_categorical = SimpleImputer(strategy='most_frequent')
+        self.scaler = StandardScaler()
+        self.label_encoders = {}
+        if spec.numerical_cols:
+            # Fitting on one row of the means sets every fitted attribute; the scaler's statistics
+            # are then replaced by the spec's.
+            means = pd.DataFrame([spec.means], columns=spec.numerical_cols)
+            self.imputer_numeric.fit(means)
+            self.scaler.fit(means)
+            self.scaler.mean_ = spec.means.copy()
+            self.scaler.scale_ = spec.scales.copy()
+            self.scaler.var_ = spec.scales ** 2
+            if rows is not None:
+                self.scaler.n_samples_seen_ = rows
+        if spec.categorical_cols:
+            self.imputer_categorical.fit(pd.DataFrame([[spec.fill_values[col] for col in spec.categorical_cols]],
+                                                      columns=spec.categorical_cols, dtype=object))
+        for col in spec.categorical_cols:
+            self.label_encoders[col] = LabelEncoder()
+            self.label_encoders[col].classes_ = spec.vocabularies[col].copy()
+
+    def save_transform(self, path: Union[str, Path]) -> None:
+        """Save the fitted transform spec as JSON for reuse at inference time."""
+        if self.transform_spec is None:
+            raise ValueError("DataPreprocessor is not fitted; nothing to save")
+        self.transform_spec.save(path)
+
+    def load_transform(self, path: Union[str, Path]) -> TransformSpec:
+        """Load a transform spec saved by ``save_transform``."""
+        self.transform_spec = TransformSpec.load(path)
+        self.numerical_cols = list(self.transform_spec.numerical_cols)
+        self.categorical_cols = list(self.transform_spec.categorical_cols)
+        self._sync_fitted_objects()
+        self.logger.info(f"Loaded transform spec from {path}")
+        return self.transform_spec
+
+    def preprocess_stream(self, input_path: Union[str, Path], output_path: Union[str, Path],
+                          file_type: str = 'csv', output_type: str = 'csv', chunksize: int = 100000,
+                          columns: Optional[List[str]] = None, filters: Optional[List[Tuple[str, str, Any]]] = None,
+                          dtype: Optional[Dict[str, str]] = None) -> TransformSpec:
+        """
+        Out-of-core ``preprocess_pipeline``: preprocess a file of any size in bounded memory.
+        
+        The first pass streams the input once to identify column roles (from the first chunk)
+        and accumulate means, variances, most frequent values and vocabularies. The second pass
+        streams it again, transforms each chunk with those dataset-wide statistics and appends
+        it to the output. Only one chunk plus the per-column statistics is held at a time.
+        Augmentation is not applied in streaming mode.
+        
+        Args:
+            input_path (Union[str, Path]): Raw data file.
+            output_path (Union[str, Path]): Destination for the preprocessed data.
+            file_type (str): Input format (see ``iter_chunks``). Defaults to 'csv'.
+            output_type (str): 'csv', 'jsonl' or 'parquet'. Defaults to 'csv'.
+            chunksize (int): Rows per chunk.
+            columns (Optional[List[str]]): Only preprocess these columns.
+            filters (Optional[List[Tuple[str, str, Any]]]): Row filters (see ``load_data``).
+            dtype (Optional[Dict[str, str]]): Explicit CSV dtypes; inferred from a sample if None.
+            
+        Returns:
+            TransformSpec: The fitted transform, also kept as ``self.transform_spec``.
+        """
+        try:
+            self.logger.info(f"Starting streaming preprocessing of {input_path}")
+            read_kwargs = dict(file_type=file_type, chunksize=chunksize, columns=columns, filters=filters)
+            if file_type.lower() == 'csv' and dtype is None:
+                dtype = self.infer_csv_dtypes(input_path, columns=_read_columns(columns, filters))
+            stats, columns = None, None
+            for chunk in self.iter_chunks(input_path, dtype=dtype, **read_kwargs):
+                if stats is None:
+                    self.identify_columns(chunk)
+                    stats = RunningColumnStats(self.numerical_cols, self.categorical_cols)
+                    columns = list(chunk.columns)
+                stats.update(chunk)
+            if stats is None:
+                raise ValueError(f"No rows to preprocess in {input_path}")
+            self.transform_spec = stats.to_spec(columns)
+            self._sync_fitted_objects(stats.rows)
+
+            writer = _ChunkWriter(Path(output_path), output_type)
+            try:
+                for chunk in self.iter_chunks(input_path, dtype=dtype, **read_kwargs):
+                    writer.write(self.transform(chunk))
+            finally:
+                writer.close()
+            self.logger.info(f"Streamed {stats.rows} preprocessed rows in {writer.chunks} chunks to {output_path}")
+            return self.transform_spec
+        except Exception as e:
+            self.logger.error(f"Error in streaming preprocessing: {str(e)}")
+            raise
+
     def save_preprocessed_data(self, data: pd.DataFrame, output_path: Union[str, Path], 
                               file_type: str = 'csv') -> None:
         """
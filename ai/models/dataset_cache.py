@@ -0,0 +1,212 @@
+import numpy as np
+import pandas as pd
+import torch
+from torch.utils.data import Subset, TensorDataset
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+import hashlib
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+
+logger = logging.getLogger(__name__)
+
+class TensorBatchLoader:
+    """
+    Batch iterator over feature and target arrays, a drop-in for ``DataLoader``.
+
+    Batches are slices of the arrays, so an epoch costs one gather per batch (to apply the
+    epoch's permutation when shuffling) instead of a ``__getitem__`` and collate per sample.
+    NumPy arrays, including memory-mapped ``DatasetCache`` entries, are wrapped without copying,
+    and ``indices`` selects the rows of a train/validation split, so the split is never
+    materialized: each batch reads just its own rows and peak memory is one batch. With
+    ``prefetch``, batches are gathered and moved to ``device`` by a background thread that
+    stays up to ``prefetch`` batches ahead of the training loop.
+    """
+    def __init__(self, features: Union[np.ndarray, torch.Tensor], targets: Union[np.ndarray, torch.Tensor],
+                 batch_size: int = 32, shuffle: bool = False, prefetch: int = 0,
+                 device: Optional[Union[str, torch.device]] = None, generator: Optional[torch.Generator] = None,
+                 indices: Optional[Union[np.ndarray, torch.Tensor]] = None):
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        self.features = torch.as_tensor(features)
+        self.targets = torch.as_tensor(targets)
+        if len(self.features) != len(self.targets):
+            raise ValueError(f"{len(self.features)} feature rows but {len(self.targets)} targets")
+        self.indices = torch.as_tensor(indices, dtype=torch.int64) if indices is not None else None
+        self.dataset = TensorDataset(self.features, self.targets)
+        if self.indices is not None:
+            self.dataset = Subset(self.dataset, self.indices)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.prefetch = prefetch
+        self.device = torch.device(device) if device is not None else None
+        self.generator = generator
+
+    def __len__(self) -> int:
+        return -(-len(self.dataset) // self.batch_size)
+
+    def _batches(self) -> Iterator[Tuple[torch.Tensor, torch.Tensor]]:
+        rows = len(self.dataset)
+        order = self.indices
+        if self.shuffle:
+            permutation = torch.randperm(rows, generator=self.generator)
+            order = permutation if order is None else order[permutation]
+        for start in range(0, rows, self.batch_size):
+            if order is None:
+                batch_X = self.features[start:start + self.batch_size]
+                batch_y = self.targets[start:start + self.batch_size]
+            else:
+                batch_rows = order[start:start + self.batch_size]
+                batch_X = self.features.index_select(0, batch_rows)
+                batch_y = self.targets.index_select(0, batch_rows)
+            if self.device is not None:
+                batch_X, batch_y = batch_X.to(self.device), batch_y.to(self.device)
+            yield batch_X, batch_y
+
+    def __iter__(self) -> Iterator[Tuple[torch.Tensor, torch.Tensor]]:
+        if self.prefetch <= 0:
+            return self._batches()
+        return self._prefetched()
+
+    def _prefetched(self) -> Iterator[Tuple[torch.Tensor, torch.Tensor]]:
+        batches: queue.Queue = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+        done = object()
+
+        def offer(item) -> bool:
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                for batch in self._batches():
+                    if not offer(batch):
+                        return
+                offer(done)
+            except BaseException as e:
+                offer(e)
+
+        worker = threading.Thread(target=produce, name='batch-prefetch', daemon=True)
+        worker.start()
+        try:
+            while True:
+                batch = batches.get()
+                if batch is done:
+                    return
+                if isinstance(batch, BaseException):
+                    raise batch
+                yield batch
+        finally:
+            # Unblock the producer when the loop stops early, e.g. on an exception in training.
+            stop.set()
+            worker.join()
+
+class DatasetCache:
+    """
+    On-disk cache of training arrays, keyed by the content hash of the source file and the
+    target column.
+
+    Each entry is a directory holding ``features.npy`` (rows x features) and ``targets.npy``
+    as contiguous float32 arrays plus a small ``meta.json``, written atomically. Entries are
+    memory-mapped copy-on-write on load, so a cache hit costs a few file opens regardless of
+    the dataset size. Content hashes are memoized per path, size and modification time, so an
+    unchanged source file is not re-hashed either.
+    """
+    VERSION = 1
+
+    def __init__(self, root: Union[str, os.PathLike], hash_chunk_bytes: int = 8 << 20):
+        self.root = str(root)
+        self.hash_chunk_bytes = hash_chunk_bytes
+        self.digests_path = os.path.join(self.root, 'digests.json')
+        os.makedirs(self.root, exist_ok=True)
+
+    def file_digest(self, path: Union[str, os.PathLike]) -> str:
+        """BLAKE2b digest of the file's contents, memoized by path, size and mtime."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        digests = self._read_json(self.digests_path) or {}
+        cached = digests.get(path)
+        if cached is not None and cached[:2] == signature:
+            return cached[2]
+        hasher = hashlib.blake2b(digest_size=20)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(self.hash_chunk_bytes), b''):
+                hasher.update(block)
+        digests[path] = signature + [hasher.hexdigest()]
+        self._write_json(self.digests_path, digests)
+        return hasher.hexdigest()
+
+    def key(self, path: Union[str, os.PathLike], target_column: str) -> str:
+        material = json.dumps([self.VERSION, self.file_digest(path), target_column])
+        return hashlib.blake2b(material.encode('utf-8'), digest_size=16).hexdigest()
+
+    def entry_dir(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def load(self, path: Union[str, os.PathLike], target_column: str) -> Optional[Tuple[np.ndarray, np.ndarray, Dict]]:
+        """Memory-mapped (features, targets, metadata) for the file, or None on a cache miss."""
+        entry = self.entry_dir(self.key(path, target_column))
+        meta = self._read_json(os.path.join(entry, 'meta.json'))
+        if meta is None:
+            return None
+        # Copy-on-write maps keep the pages lazy while giving torch writable arrays.
+        features = np.load(os.path.join(entry, 'features.npy'), mmap_mode='c')
+        targets = np.load(os.path.join(entry, 'targets.npy'), mmap_mode='c')
+        return features, targets, meta
+
+    def store(self, path: Union[str, os.PathLike], target_column: str,
+              data: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, Dict]:
+        """
+        Write ``data`` (numeric columns, including the target) as a cache entry for the file.
+
+        Features are written column by column into the memory-mapped output, so no second
+        in-memory copy of the table is made.
+
+        Returns:
+            Tuple of the memory-mapped features, targets and the entry metadata.
+        """
+        if target_column not in data.columns:
+            raise ValueError(f"Target column {target_column} not found in data")
+        feature_names: List[str] = [col for col in data.columns if col != target_column]
+        entry = self.entry_dir(self.key(path, target_column))
+        tmp_entry = f"{entry}.{os.getpid()}.tmp"
+        os.makedirs(tmp_entry, exist_ok=True)
+        features = np.lib.format.open_memmap(os.path.join(tmp_entry, 'features.npy'), mode='w+',
+                                             dtype=np.float32, shape=(len(data), len(feature_names)))
+        for j, col in enumerate(feature_names):
+            features[:, j] = data[col].to_numpy(dtype=np.float32)
+        features.flush()
+        del features
+        np.save(os.path.join(tmp_entry, 'targets.npy'), data[target_column].to_numpy(dtype=np.float32))
+        meta = {'source': os.path.abspath(path), 'target_column': target_column,
+                'feature_names': feature_names, 'rows': len(data)}
+        self._write_json(os.path.join(tmp_entry, 'meta.json'), meta)
+        if os.path.exists(entry):
+            shutil.rmtree(entry)
+        os.replace(tmp_entry, entry)
+        logger.info(f"Cached {len(data)} rows x {len(feature_names)} features of {path} in {entry}")
+        return self.load(path, target_column)
+
+    @staticmethod
+    def _read_json(path: str) -> Optional[Dict]:
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    @staticmethod
+    def _write_json(path: str, payload: Dict) -> None:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, path)
@@ -8,9 +8,11 @@ import logging
 import os
 from datetime import datetime
 import sys
-from typing import Union, List, Tuple
+from typing import Optional, Union, List, Tuple
 import json
 
+from transform_spec import TransformSpec
+
 # Set up logging
 def setup_logging(log_dir: str = "logs") -> None:
     """
@@ -82,18 +84,31 @@ def load_model(model_path: str, device: str = "cpu") -> nn.Module:
         raise
 
 def preprocess_data(data: Union[np.ndarray, pd.DataFrame, List], 
-                    feature_columns: List[str] = None) -> np.ndarray:
+                    feature_columns: List[str] = None,
+                    transform_spec: Optional[TransformSpec] = None) -> np.ndarray:
     """
     Preprocess input data for inference (e.g., normalization, handling missing values).
     
     Args:
         data: Input data as numpy array, pandas DataFrame, or list.
         feature_columns (List[str]): List of feature columns if data is a DataFrame.
+        transform_spec (Optional[TransformSpec]): Transform fitted by DataPreprocessor at training
+            time. When given, it is applied instead of the ad-hoc imputation below, and arrays or
+            lists must have their columns in the spec's column order.
     
     Returns:
         np.ndarray: Preprocessed data ready for model input.
     """
     try:
+        if transform_spec is not None:
+            if not isinstance(data, pd.DataFrame):
+                data = np.asarray(data, dtype=object)
+                if data.ndim == 1:
+                    data = data.reshape(1, -1)
+            data = transform_spec.transform(data, dtype=np.float32)
+            logging.info("Input data transformed with fitted spec. Shape: %s", data.shape)
+            return data
+
         if isinstance(data, pd.DataFrame):
             if feature_columns:
                 data = data[feature_columns].values
@@ -203,6 +218,8 @@ def main():
                         choices=["cpu", "cuda"], help="Device to run inference on.")
     parser.add_argument("--log_dir", type=str, default="logs", 
                         help="Directory to save inference logs.")
+    parser.add_argument("--transform_spec", type=str, default=None,
+                        help="Path to a transform spec saved by DataPreprocessor.save_transform.")
     
     args = parser.parse_args()
     
@@ -225,7 +242,8 @@ def main():
         logging.info("Input data loaded from: %s", args.input_data)
         
         # Preprocess data
-        processed_data = preprocess_data(input_data)
+        transform_spec = TransformSpec.load(args.transform_spec) if args.transform_spec else None
+        processed_data = preprocess_data(input_data, transform_spec=transform_spec)
         
         # Create DataLoader for batch processing
         dataloader = create_dataloader(processed_data, batch_size=args.batch_size)
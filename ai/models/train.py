@@ -1,18 +1,115 @@
 import torch      
 import torch.nn as nn
 import torch.optim as optim
-from torch.utils.data import DataLoader, TensorDataset
+from torch.func import functional_call, stack_module_state, vmap
+from torch.utils.data import DataLoader
 import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
-from typing import Dict, List, Tuple, Optional, Union
+from typing import Any, Dict, List, Tuple, Optional, Union
 import logging 
+import multiprocessing as mp
 import os
+import time
 from pathlib import Path
 import json
 import itertools
 from datetime import datetime
 
+from dataset_cache import DatasetCache, TensorBatchLoader
+
+def sample_configurations(param_grid: Dict, sampler: str = 'grid', num_trials: Optional[int] = None,
+                          seed: int = 0) -> List[Dict]:
+    """
+    Hyperparameter configurations to try.
+    
+    Every parameter maps to a list of candidate values, or for 'random'/'sobol' sampling also to
+    a continuous range ``{'low': ..., 'high': ..., 'log': bool}``.
+    
+    Args:
+        param_grid (Dict): Search space.
+        sampler (str): 'grid' (every combination, as ``itertools.product``), 'random' (uniform
+            draws) or 'sobol' (scrambled Sobol sequence, which covers the space more evenly than
+            random draws for the same budget).
+        num_trials (Optional[int]): Number of draws for 'random'/'sobol'; duplicates are dropped.
+        seed (int): Seed for the draws.
+        
+    Returns:
+        List[Dict]: Configurations in trial order.
+    """
+    keys = list(param_grid)
+    if sampler == 'grid':
+        if any(isinstance(param_grid[key], dict) for key in keys):
+            raise ValueError("Grid search needs a list of values for every parameter")
+        return [dict(zip(keys, values)) for values in itertools.product(*(param_grid[key] for key in keys))]
+    if sampler not in ('random', 'sobol'):
+        raise ValueError(f"Unsupported sampler: {sampler}")
+    if not num_trials:
+        raise ValueError(f"{sampler} sampling needs num_trials")
+    if sampler == 'random':
+        points = np.random.default_rng(seed).random((num_trials, len(keys)))
+    else:
+        from scipy.stats import qmc
+        # Sobol points are balanced in blocks of powers of two; draw one and keep a prefix.
+        sobol = qmc.Sobol(d=len(keys), scramble=True, seed=seed)
+        points = sobol.random_base2(int(np.ceil(np.log2(max(num_trials, 1)))))[:num_trials]
+    configurations, seen = [], set()
+    for point in points:
+        params = {}
+        for key, u in zip(keys, point):
+            space = param_grid[key]
+            if isinstance(space, dict):
+                low, high = space['low'], space['high']
+                params[key] = float(np.exp(np.log(low) + u * (np.log(high) - np.log(low)))
+                                    if space.get('log') else low + u * (high - low))
+            else:
+                params[key] = space[min(int(u * len(space)), len(space) - 1)]
+        identity = json.dumps(params, sort_keys=True)
+        if identity not in seen:
+            seen.add(identity)
+            configurations.append(params)
+    return configurations
+
+_TUNING_WORKER: Dict[str, Any] = {}
+
+def _init_tuning_worker(trainer_args: Dict, train_loader: DataLoader, val_loader: DataLoader,
+                        num_threads: int) -> None:
+    """Pool initializer: pin the worker's intra-op threads and keep the loaders for its trials."""
+    torch.set_num_threads(num_threads)
+    _TUNING_WORKER.update(trainer_args=trainer_args, train_loader=train_loader, val_loader=val_loader)
+
+def _run_trial(trial: int, params: Dict, num_epochs: int, early_stopping_patience: int,
+               trainer_args: Optional[Dict] = None, train_loader: Optional[DataLoader] = None,
+               val_loader: Optional[DataLoader] = None) -> Tuple[Dict, Optional[Dict], float]:
+    """
+    Train one configuration with a fresh ModelTrainer.
+    
+    Returns:
+        Tuple of the trial record, the state dict of its best epoch and that epoch's validation loss.
+    """
+    trainer_args = trainer_args or _TUNING_WORKER['trainer_args']
+    trainer = ModelTrainer(**trainer_args)
+    started = time.perf_counter()
+    # Loaders are checked against None: an empty loader is falsy but still the one to use.
+    train_loader = train_loader if train_loader is not None else _TUNING_WORKER['train_loader']
+    val_loader = val_loader if val_loader is not None else _TUNING_WORKER['val_loader']
+    result = trainer.train(train_loader, val_loader, params, num_epochs, early_stopping_patience)
+    record = {
+        'trial': trial,
+        'params': params,
+        'val_loss': result['final_val_loss'],
+        'final_train_loss': result['final_train_loss'],
+        'best_val_loss': trainer.best_val_loss,
+        'epochs': len(result['history']['val_loss']),
+        'seconds': time.perf_counter() - started
+    }
+    best_state = {key: value.detach().cpu() for key, value in trainer.best_model.items()} \
+        if trainer.best_model is not None else None
+    return record, best_state, trainer.best_val_loss
+
+def _run_trial_task(task: Tuple) -> Tuple[Dict, Optional[Dict], float]:
+    return _run_trial(*task)
+
 class AgentModel(nn.Module):
     """
     A simple neural network model for decision-making and behavior prediction.
@@ -79,47 +176,63 @@ class ModelTrainer:
         self.training_history: Dict[str, List[float]] = {'train_loss': [], 'val_loss': []}
 
     def load_data(self, data_path: Union[str, Path], target_column: str, 
-                  test_size: float = 0.2, random_state: int = 42) -> Tuple[DataLoader, DataLoader]:
+                  test_size: float = 0.2, random_state: int = 42,
+                  cache_dir: Optional[Union[str, Path]] = None, batch_size: int = 32,
+                  prefetch: int = 0) -> Tuple[TensorBatchLoader, TensorBatchLoader]:
         """
         Load and prepare data for training.
         
+        Features and targets are read as float32 arrays and split into train and validation
+        row indices, served in batches by ``TensorBatchLoader``. With ``cache_dir``, the arrays
+        are cached as ``.npy`` files keyed by the file's content hash and the target column, and
+        later runs memory-map them instead of parsing the file again; both loaders then read
+        their batches straight from the map, so the data is never loaded into memory as a whole.
+        
         Args:
             data_path (Union[str, Path]): Path to the preprocessed data file.
             target_column (str): Name of the target column for prediction.
             test_size (float): Proportion of data for validation. Defaults to 0.2.
             random_state (int): Random seed for reproducibility. Defaults to 42.
+            cache_dir (Optional[Union[str, Path]]): Directory of the ``DatasetCache``.
+            batch_size (int): Samples per batch. Defaults to 32.
+            prefetch (int): Batches prepared ahead by a background thread; 0 disables it.
             
         Returns:
-            Tuple[DataLoader, DataLoader]: Training and validation DataLoaders.
+            Tuple[TensorBatchLoader, TensorBatchLoader]: Training and validation loaders.
         """
         try:
             data_path = Path(data_path)
             if not data_path.exists():
                 raise FileNotFoundError(f"Data file not found at {data_path}")
                 
-            data = pd.read_csv(data_path)
-            if target_column not in data.columns:
-                raise ValueError(f"Target column {target_column} not found in data")
-                
-            X = data.drop(columns=[target_column]).values
-            y = data[target_column].values
-            
-            X_train, X_val, y_train, y_val = train_test_split(
-                X, y, test_size=test_size, random_state=random_state
-            )
+            cache = DatasetCache(cache_dir) if cache_dir is not None else None
+            cached = cache.load(data_path, target_column) if cache is not None else None
+            if cached is not None:
+                X, y, _ = cached
+                self.logger.info(f"Memory-mapped {len(X)} cached samples for {data_path}")
+            else:
+                data = pd.read_csv(data_path)
+                if target_column not in data.columns:
+                    raise ValueError(f"Target column {target_column} not found in data")
+                if cache is not None:
+                    X, y, _ = cache.store(data_path, target_column, data)
+                else:
+                    y = data.pop(target_column).to_numpy(dtype=np.float32)
+                    X = data.to_numpy(dtype=np.float32)
+                del data
             
-            train_dataset = TensorDataset(
-                torch.FloatTensor(X_train), torch.FloatTensor(y_train)
-            )
-            val_dataset = TensorDataset(
-                torch.FloatTensor(X_val), torch.FloatTensor(y_val)
+            # Splitting row indices shuffles exactly like splitting X and y themselves.
+            train_idx, val_idx = train_test_split(
+                np.arange(len(X)), test_size=test_size, random_state=random_state
             )
             
-            train_loader = DataLoader(train_dataset, batch_size=32, shuffle=True)
-            val_loader = DataLoader(val_dataset, batch_size=32, shuffle=False)
+            train_loader = TensorBatchLoader(X, y, batch_size=batch_size, shuffle=True, prefetch=prefetch,
+                                             device=self.device, indices=train_idx)
+            val_loader = TensorBatchLoader(X, y, batch_size=batch_size, shuffle=False, prefetch=prefetch,
+                                           device=self.device, indices=val_idx)
             
-            self.logger.info(f"Loaded data with {len(train_dataset)} training and "
-                            f"{len(val_dataset)} validation samples")
+            self.logger.info(f"Loaded data with {len(train_idx)} training and "
+                            f"{len(val_idx)} validation samples")
             return train_loader, val_loader
         except Exception as e:
             self.logger.error(f"Error loading data: {str(e)}")
@@ -132,7 +245,7 @@ class ModelTrainer:
         
         Args:
             model (nn.Module): Model to train.
-            train_loader (DataLoader): DataLoader for training data.
+            train_loader (DataLoader): Training batches, e.g. a ``TensorBatchLoader`` or DataLoader.
             criterion (nn.Module): Loss function.
             optimizer (optim.Optimizer): Optimizer for training.
             
@@ -157,7 +270,7 @@ class ModelTrainer:
         
         Args:
             model (nn.Module): Model to validate.
-            val_loader (DataLoader): DataLoader for validation data.
+            val_loader (DataLoader): Validation batches, e.g. a ``TensorBatchLoader`` or DataLoader.
             criterion (nn.Module): Loss function.
             
         Returns:
@@ -173,6 +286,19 @@ class ModelTrainer:
                 total_loss += loss.item()
         return total_loss / len(val_loader)
 
+    def build_trial(self, hyperparameters: Dict) -> Tuple[nn.Module, nn.Module, optim.Optimizer]:
+        """Model, loss and optimizer for one hyperparameter configuration."""
+        model = self.model_class(
+            input_size=self.input_size,
+            hidden_sizes=hyperparameters['hidden_sizes'],
+            output_size=self.output_size,
+            dropout_rate=hyperparameters['dropout_rate']
+        ).to(self.device)
+        
+        criterion = nn.MSELoss()
+        optimizer = optim.Adam(model.parameters(), lr=hyperparameters['learning_rate'])
+        return model, criterion, optimizer
+
     def train(self, train_loader: DataLoader, val_loader: DataLoader, hyperparameters: Dict,
               num_epochs: int = 50, early_stopping_patience: int = 5) -> Dict:
         """
@@ -189,15 +315,7 @@ class ModelTrainer:
             Dict: Training results including final loss and history.
         """
         try:
-            model = self.model_class(
-                input_size=self.input_size,
-                hidden_sizes=hyperparameters['hidden_sizes'],
-                output_size=self.output_size,
-                dropout_rate=hyperparameters['dropout_rate']
-            ).to(self.device)
-            
-            criterion = nn.MSELoss()
-            optimizer = optim.Adam(model.parameters(), lr=hyperparameters['learning_rate'])
+            model, criterion, optimizer = self.build_trial(hyperparameters)
             
             early_stopping_counter = 0
             local_best_val_loss = float('inf')
@@ -218,7 +336,7 @@ class ModelTrainer:
                     early_stopping_counter = 0
                     if val_loss < self.best_val_loss:
                         self.best_val_loss = val_loss
-                        self.best_model = model.state_dict()
+                        self.best_model = {key: value.detach().clone() for key, value in model.state_dict().items()}
                 else:
                     early_stopping_counter += 1
                     if early_stopping_counter >= early_stopping_patience:
@@ -234,49 +352,397 @@ class ModelTrainer:
             self.logger.error(f"Error during training: {str(e)}")
             raise
 
+    def train_ensemble(self, train_loader: DataLoader, val_loader: DataLoader, hyperparameters: List[Dict],
+                       num_epochs: int = 50, early_stopping_patience: int = 5) -> List[Dict]:
+        """
+        Train K same-shape models at once: one batched forward/backward pass per batch for all K.
+        
+        The models are built exactly as ``train`` builds them and stacked into batched weight
+        tensors with ``torch.func.stack_module_state``; the forward pass is ``vmap``-ed over the
+        stack, so each layer of all K models runs as one batched matrix product. Every model
+        keeps its own learning rate (a batched Adam step equivalent to ``optim.Adam``), dropout
+        rate and early stopping: a model whose patience runs out is frozen while the others
+        continue. Each model sees the same batches as in ``train``, so without dropout its losses
+        match training it alone from the same initialization; dropout masks are drawn per model
+        but from a different random stream. The model's ``network`` must be an ``nn.Sequential``;
+        its layers other than ``nn.Dropout`` run through ``torch.func.functional_call``, and
+        layers with running state (e.g. batch norm) raise ``TypeError``.
+        
+        Args:
+            train_loader (DataLoader): DataLoader for training data.
+            val_loader (DataLoader): DataLoader for validation data.
+            hyperparameters (List[Dict]): One configuration per model; all must share ``hidden_sizes``.
+            num_epochs (int): Maximum number of epochs to train. Defaults to 50.
+            early_stopping_patience (int): Patience for early stopping. Defaults to 5.
+            
+        Returns:
+            List[Dict]: Per model, the ``train`` results plus its ``best_val_loss`` and the
+            ``best_state`` state dict of its best epoch.
+        """
+        try:
+            if len({json.dumps(params['hidden_sizes']) for params in hyperparameters}) > 1:
+                raise ValueError("Ensemble members must share hidden_sizes")
+            models = [self.build_trial(params)[0] for params in hyperparameters]
+            params, _ = stack_module_state(models)
+            base = models[0]
+            if not isinstance(getattr(base, 'network', None), nn.Sequential):
+                raise TypeError(f"Ensemble training needs a Sequential 'network', {type(base).__name__} has none")
+            for layer in base.network:
+                # Dropout is applied per model below; other dropout variants and layers with
+                # running state (e.g. batch norm) cannot be replayed functionally.
+                if (isinstance(layer, nn.modules.dropout._DropoutNd) and type(layer) is not nn.Dropout) or \
+                        next(layer.buffers(), None) is not None:
+                    raise TypeError(f"Unsupported layer for ensemble training: {type(layer).__name__}")
+            layer_params = [[name for name, _ in layer.named_parameters()] for layer in base.network]
+            num_models = len(models)
+            lrs = torch.tensor([p['learning_rate'] for p in hyperparameters], device=self.device)
+            dropout = torch.tensor([p['dropout_rate'] for p in hyperparameters], device=self.device)
+            exp_avg = {name: torch.zeros_like(value) for name, value in params.items()}
+            exp_avg_sq = {name: torch.zeros_like(value) for name, value in params.items()}
+            steps = torch.zeros(num_models, device=self.device)
+            beta1, beta2, eps = 0.9, 0.999, 1e-8
+
+            def forward(model_params: Dict[str, torch.Tensor], rate: torch.Tensor, x: torch.Tensor,
+                        training: bool) -> torch.Tensor:
+                for i, layer in enumerate(base.network):
+                    if type(layer) is nn.Dropout:
+                        if training:
+                            x = x * (torch.rand_like(x) >= rate) / (1 - rate)
+                    else:
+                        x = functional_call(layer, {name: model_params[f'network.{i}.{name}'] for name in layer_params[i]},
+                                            (x,))
+                return x
+
+            def batch_losses(batch_X: torch.Tensor, batch_y: torch.Tensor, training: bool) -> torch.Tensor:
+                outputs = vmap(forward, in_dims=(0, 0, None, None), randomness='different')(
+                    params, dropout, batch_X, training)
+                targets = batch_y.unsqueeze(1) if outputs.shape[1:] != batch_y.shape else batch_y
+                return (outputs - targets).pow(2).flatten(1).mean(1)
+
+            active = torch.ones(num_models, dtype=torch.bool, device=self.device)
+            histories = [{'train_loss': [], 'val_loss': []} for _ in range(num_models)]
+            best_losses = [float('inf')] * num_models
+            best_states: List[Optional[Dict]] = [None] * num_models
+            counters = [0] * num_models
+            for epoch in range(num_epochs):
+                train_totals = torch.zeros(num_models, device=self.device)
+                for batch_X, batch_y in train_loader:
+                    batch_X, batch_y = batch_X.to(self.device), batch_y.to(self.device)
+                    for value in params.values():
+                        value.grad = None
+                    losses = batch_losses(batch_X, batch_y, training=True)
+                    losses.sum().backward()
+                    train_totals += losses.detach()
+                    with torch.no_grad():
+                        steps += active
+                        step_size = (lrs / (1 - beta1 ** steps.clamp(min=1))) * active
+                        bias_correction2 = (1 - beta2 ** steps.clamp(min=1)).sqrt()
+                        for name, value in params.items():
+                            shape = (num_models,) + (1,) * (value.dim() - 1)
+                            mask = active.view(shape)
+                            grad = value.grad
+                            exp_avg[name] = torch.where(mask, beta1 * exp_avg[name] + (1 - beta1) * grad, exp_avg[name])
+                            exp_avg_sq[name] = torch.where(mask, beta2 * exp_avg_sq[name] + (1 - beta2) * grad * grad,
+                                                           exp_avg_sq[name])
+                            denom = exp_avg_sq[name].sqrt() / bias_correction2.view(shape) + eps
+                            value -= step_size.view(shape) * exp_avg[name] / denom
+                with torch.no_grad():
+                    val_totals = torch.zeros(num_models, device=self.device)
+                    for batch_X, batch_y in val_loader:
+                        val_totals += batch_losses(batch_X.to(self.device), batch_y.to(self.device), training=False)
+                train_losses = (train_totals / len(train_loader)).tolist()
+                val_losses = (val_totals / len(val_loader)).tolist()
+
+                for k in range(num_models):
+                    if not active[k]:
+                        continue
+                    histories[k]['train_loss'].append(train_losses[k])
+                    histories[k]['val_loss'].append(val_losses[k])
+                    if val_losses[k] < best_losses[k]:
+                        best_losses[k] = val_losses[k]
+                        counters[k] = 0
+                        best_states[k] = {name: value[k].detach().clone() for name, value in params.items()}
+                    else:
+                        counters[k] += 1
+                        if counters[k] >= early_stopping_patience:
+                            active[k] = False
+                self.logger.info(f"Epoch {epoch+1}/{num_epochs} - {int(active.sum())}/{num_models} models active, "
+                                 f"best val loss {min(best_losses):.4f}")
+                if not active.any():
+                    break
+
+            results = []
+            for k in range(num_models):
+                if best_losses[k] < self.best_val_loss:
+                    self.best_val_loss = best_losses[k]
+                    self.best_model = best_states[k]
+                results.append({
+                    'final_train_loss': histories[k]['train_loss'][-1],
+                    'final_val_loss': histories[k]['val_loss'][-1],
+                    'history': histories[k],
+                    'best_val_loss': best_losses[k],
+                    'best_state': best_states[k]
+                })
+            return results
+        except Exception as e:
+            self.logger.error(f"Error during ensemble training: {str(e)}")
+            raise
+
     def hyperparameter_tuning(self, train_loader: DataLoader, val_loader: DataLoader,
                               param_grid: Dict, num_epochs: int = 50,
-                              early_stopping_patience: int = 5) -> Dict:
+                              early_stopping_patience: int = 5, sampler: str = 'grid',
+                              num_trials: Optional[int] = None, seed: int = 0, num_workers: int = 1,
+                              threads_per_trial: Optional[int] = None,
+                              results_path: Optional[Union[str, Path]] = None,
+                              context: Optional[str] = None, vectorize: bool = False) -> Dict:
         """
-        Perform hyperparameter tuning using grid search.
+        Perform hyperparameter tuning using grid search, or random/Sobol sampling.
+        
+        With ``num_workers`` above 1, trials run in a process pool. Each worker pins itself to
+        ``threads_per_trial`` intra-op threads, so concurrent trials share the cores rather than
+        oversubscribing them, and results stream back as trials finish. With ``results_path``,
+        every finished trial is appended to a JSON lines file and the best weights so far are
+        saved next to it (``<results_path>.best.pt``); rerunning the same search skips the
+        trials already recorded there, so an interrupted search resumes where it stopped.
         
         Args:
             train_loader (DataLoader): DataLoader for training data.
             val_loader (DataLoader): DataLoader for validation data.
-            param_grid (Dict): Dictionary of hyperparameter grids to search.
+            param_grid (Dict): Search space (see ``sample_configurations``).
             num_epochs (int): Maximum number of epochs per configuration. Defaults to 50.
             early_stopping_patience (int): Patience for early stopping. Defaults to 5.
+            sampler (str): 'grid', 'random' or 'sobol'. Defaults to 'grid'.
+            num_trials (Optional[int]): Number of configurations for 'random'/'sobol'.
+            seed (int): Seed for sampling configurations.
+            num_workers (int): Trials run concurrently. Defaults to 1 (in this process).
+            threads_per_trial (Optional[int]): Torch threads per worker; defaults to an even share
+                of the CPUs.
+            results_path (Optional[Union[str, Path]]): JSON lines file of trial results.
+            context (Optional[str]): Multiprocessing start method for the pool.
+            vectorize (bool): In this process, train configurations sharing ``hidden_sizes`` together
+                as one ensemble (see ``train_ensemble``) instead of one after another. Requires
+                ``num_workers`` of 1.
             
         Returns:
             Dict: Best hyperparameters and corresponding performance.
         """
         try:
-            keys, values = zip(*param_grid.items())
-            combinations = [dict(zip(keys, v)) for v in itertools.product(*values)]
-            self.logger.info(f"Starting hyperparameter tuning with {len(combinations)} combinations")
+            if vectorize and num_workers > 1:
+                raise ValueError("vectorize trains in this process; it cannot be combined with num_workers > 1")
+            combinations = sample_configurations(param_grid, sampler, num_trials, seed)
+            tuning_results = self._load_trial_results(results_path)
+            done = {json.dumps(result['params'], sort_keys=True) for result in tuning_results}
+            pending = [(trial, params) for trial, params in enumerate(combinations)
+                       if json.dumps(params, sort_keys=True) not in done]
+            self.logger.info(f"Starting hyperparameter tuning with {len(combinations)} combinations "
+                             f"({len(combinations) - len(pending)} already done)")
             
-            best_params = None
-            best_val_loss = float('inf')
-            tuning_results = []
+            trainer_args = {'model_class': self.model_class, 'input_size': self.input_size,
+                            'output_size': self.output_size, 'device': str(self.device)}
+            tasks = [(trial, params, num_epochs, early_stopping_patience) for trial, params in pending]
+            if num_workers > 1 and len(tasks) > 1:
+                num_workers = min(num_workers, len(tasks))
+                threads = threads_per_trial or max(1, mp.cpu_count() // num_workers)
+                with mp.get_context(context).Pool(num_workers, initializer=_init_tuning_worker,
+                                                  initargs=(trainer_args, train_loader, val_loader, threads)) as pool:
+                    for outcome in pool.imap_unordered(_run_trial_task, tasks):
+                        tuning_results.append(self._record_trial(*outcome, results_path))
+            elif vectorize:
+                groups: Dict[str, List[Tuple]] = {}
+                for task in tasks:
+                    groups.setdefault(json.dumps(task[1]['hidden_sizes']), []).append(task)
+                for group in groups.values():
+                    self.logger.info(f"Training {len(group)} configurations as one ensemble")
+                    started = time.perf_counter()
+                    ensemble = ModelTrainer(**trainer_args, logger=self.logger).train_ensemble(
+                        train_loader, val_loader, [params for _, params, _, _ in group],
+                        num_epochs, early_stopping_patience)
+                    seconds = (time.perf_counter() - started) / len(group)
+                    for (trial, params, _, _), result in zip(group, ensemble):
+                        record = {'trial': trial, 'params': params, 'val_loss': result['final_val_loss'],
+                                  'final_train_loss': result['final_train_loss'],
+                                  'best_val_loss': result['best_val_loss'],
+                                  'epochs': len(result['history']['val_loss']), 'seconds': seconds}
+                        tuning_results.append(self._record_trial(record, result['best_state'],
+                                                                 result['best_val_loss'], results_path))
+            else:
+                for task in tasks:
+                    self.logger.info(f"Training with parameters: {task[1]}")
+                    outcome = _run_trial(*task, trainer_args=dict(trainer_args, logger=self.logger),
+                                         train_loader=train_loader, val_loader=val_loader)
+                    tuning_results.append(self._record_trial(*outcome, results_path))
             
-            for params in combinations:
-                self.logger.info(f"Training with parameters: {params}")
-                result = self.train(
-                    train_loader, val_loader, params, num_epochs, early_stopping_patience
-                )
-                val_loss = result['final_val_loss']
-                tuning_results.append({'params': params, 'val_loss': val_loss})
-                
-                if val_loss < best_val_loss:
-                    best_val_loss = val_loss
-                    best_params = params
-                    
+            tuning_results.sort(key=lambda result: result['trial'])
+            best = min(tuning_results, key=lambda result: result['val_loss'], default=None)
+            best_params = best['params'] if best else None
+            best_val_loss = best['val_loss'] if best else float('inf')
             self.logger.info(f"Best parameters: {best_params} with validation loss: {best_val_loss:.4f}")
             return {'best_params': best_params, 'best_val_loss': best_val_loss, 'results': tuning_results}
         except Exception as e:
             self.logger.error(f"Error during hyperparameter tuning: {str(e)}")
             raise
 
+    def successive_halving(self, train_loader: DataLoader, val_loader: DataLoader, param_grid: Dict,
+                           max_epochs: int = 50, min_epochs: int = 1, reduction_factor: int = 3,
+                           sampler: str = 'grid', num_trials: Optional[int] = None, seed: int = 0,
+                           configurations: Optional[List[Dict]] = None) -> Dict:
+        """
+        Hyperparameter search with successive halving.
+        
+        All configurations train for ``min_epochs``; only the best ``1 / reduction_factor`` of
+        them by validation loss are promoted to the next rung, which trains them further (keeping
+        their weights and optimizer state) up to ``reduction_factor`` times as many epochs, and so
+        on until ``max_epochs``. Poor configurations therefore stop after a small fraction of the
+        budget that ``hyperparameter_tuning`` spends on every one of them.
+        
+        Args:
+            train_loader (DataLoader): DataLoader for training data.
+            val_loader (DataLoader): DataLoader for validation data.
+            param_grid (Dict): Search space (see ``sample_configurations``).
+            max_epochs (int): Epochs trained by the configurations reaching the last rung.
+            min_epochs (int): Epochs trained by every configuration in the first rung.
+            reduction_factor (int): Promote the top 1 / reduction_factor trials per rung.
+            sampler (str): 'grid', 'random' or 'sobol'.
+            num_trials (Optional[int]): Number of configurations for 'random'/'sobol'.
+            seed (int): Seed for sampling configurations.
+            configurations (Optional[List[Dict]]): Explicit configurations, overriding the sampler.
+            
+        Returns:
+            Dict: Best hyperparameters and validation loss, per-trial ``results`` (epochs trained
+            and validation loss at each rung they reached), ``epochs_trained`` in total and the
+            ``full_budget_epochs`` that training every configuration to ``max_epochs`` would take.
+        """
+        try:
+            if reduction_factor < 2:
+                raise ValueError("reduction_factor must be at least 2")
+            if configurations is None:
+                configurations = sample_configurations(param_grid, sampler, num_trials, seed)
+            rungs = [min(max_epochs, min_epochs * reduction_factor ** i)
+                     for i in range(int(np.ceil(np.log(max_epochs / min_epochs) / np.log(reduction_factor))) + 1)]
+            self.logger.info(f"Successive halving over {len(configurations)} configurations, rungs {rungs}")
+            
+            trials = [{'trial': i, 'params': params, 'epochs': 0, 'rung_losses': [],
+                       'state': self.build_trial(params)} for i, params in enumerate(configurations)]
+            survivors = trials
+            for rung, budget in enumerate(rungs):
+                for trial in survivors:
+                    model, criterion, optimizer = trial['state']
+                    while trial['epochs'] < budget:
+                        self.train_epoch(model, train_loader, criterion, optimizer)
+                        trial['epochs'] += 1
+                    trial['val_loss'] = self.validate(model, val_loader, criterion)
+                    trial['rung_losses'].append(trial['val_loss'])
+                    # Lower rungs are not comparable with the full budget, so only finalists count.
+                    if rung == len(rungs) - 1 and trial['val_loss'] < self.best_val_loss:
+                        self.best_val_loss = trial['val_loss']
+                        self.best_model = {key: value.detach().clone() for key, value in model.state_dict().items()}
+                survivors = sorted(survivors, key=lambda trial: trial['val_loss'])
+                self.logger.info(f"Rung {rung} ({budget} epochs): best validation loss "
+                                 f"{survivors[0]['val_loss']:.4f} with {survivors[0]['params']}")
+                if rung < len(rungs) - 1:
+                    survivors = survivors[:max(1, len(survivors) // reduction_factor)]
+                promoted = {trial['trial'] for trial in survivors}
+                for trial in trials:
+                    if trial['trial'] not in promoted:
+                        trial['state'] = None
+            
+            results = [{key: value for key, value in trial.items() if key != 'state'} for trial in trials]
+            # Only configurations that reached the last rung were trained on the full budget.
+            best = min((result for result in results if result['epochs'] == rungs[-1]), key=lambda result: result['val_loss'])
+            epochs_trained = sum(result['epochs'] for result in results)
+            self.logger.info(f"Best parameters: {best['params']} with validation loss: {best['val_loss']:.4f} "
+                             f"after {epochs_trained} of {len(trials) * max_epochs} epochs")
+            return {'best_params': best['params'], 'best_val_loss': best['val_loss'], 'results': results,
+                    'epochs_trained': epochs_trained, 'full_budget_epochs': len(trials) * max_epochs}
+        except Exception as e:
+            self.logger.error(f"Error during successive halving: {str(e)}")
+            raise
+
+    def hyperband(self, train_loader: DataLoader, val_loader: DataLoader, param_grid: Dict,
+                  max_epochs: int = 50, reduction_factor: int = 3, sampler: str = 'sobol', seed: int = 0) -> Dict:
+        """
+        Hyperband: successive halving brackets trading the number of configurations against
+        the epochs each starts with, hedging against configurations that only pull ahead late.
+        
+        Bracket ``s`` samples ``ceil((s_max + 1) / (s + 1) * reduction_factor ** s)``
+        configurations (with ``sampler``, seeded per bracket; 'grid' takes a random subset of the
+        grid rather than its first combinations) and starts them at
+        ``max_epochs / reduction_factor ** s`` epochs.
+        
+        Args:
+            train_loader (DataLoader): DataLoader for training data.
+            val_loader (DataLoader): DataLoader for validation data.
+            param_grid (Dict): Search space (see ``sample_configurations``).
+            max_epochs (int): Epochs trained by the configurations reaching a bracket's last rung.
+            reduction_factor (int): Promote the top 1 / reduction_factor trials per rung.
+            sampler (str): 'grid', 'random' or 'sobol'. Defaults to 'sobol'.
+            seed (int): Base seed; bracket ``s`` samples with ``seed + s``.
+        
+        Returns:
+            Dict: Best hyperparameters and validation loss over all brackets, each bracket's
+            ``successive_halving`` result and the total ``epochs_trained``.
+        """
+        try:
+            s_max = int(np.floor(np.log(max_epochs) / np.log(reduction_factor)))
+            brackets = []
+            for s in range(s_max, -1, -1):
+                num_trials = int(np.ceil((s_max + 1) / (s + 1) * reduction_factor ** s))
+                min_epochs = max(1, int(round(max_epochs / reduction_factor ** s)))
+                if sampler == 'grid':
+                    grid = sample_configurations(param_grid)
+                    order = np.random.default_rng(seed + s).permutation(len(grid))[:num_trials]
+                    configurations = [grid[i] for i in order]
+                else:
+                    configurations = sample_configurations(param_grid, sampler, num_trials, seed + s)
+                brackets.append(self.successive_halving(train_loader, val_loader, param_grid, max_epochs, min_epochs,
+                                                        reduction_factor, configurations=configurations))
+            best = min(brackets, key=lambda bracket: bracket['best_val_loss'])
+            self.logger.info(f"Best parameters over {len(brackets)} brackets: {best['best_params']} "
+                             f"with validation loss: {best['best_val_loss']:.4f}")
+            return {'best_params': best['best_params'], 'best_val_loss': best['best_val_loss'], 'brackets': brackets,
+                    'epochs_trained': sum(bracket['epochs_trained'] for bracket in brackets)}
+        except Exception as e:
+            self.logger.error(f"Error during hyperband: {str(e)}")
+            raise
+
+    def _load_trial_results(self, results_path: Optional[Union[str, Path]]) -> List[Dict]:
+        """Trial records of an earlier run of the search, restoring its best weights."""
+        if results_path is None or not Path(results_path).exists():
+            return []
+        with open(results_path, 'r') as f:
+            lines = f.readlines()
+        if lines and not lines[-1].endswith('\n'):
+            # Drop a partial line left by an interrupted write before appending after it.
+            lines = lines[:-1]
+            with open(results_path, 'w') as f:
+                f.writelines(lines)
+        records = [json.loads(line) for line in lines if line.strip()]
+        best_path = Path(f"{results_path}.best.pt")
+        if best_path.exists():
+            checkpoint = torch.load(best_path, map_location=self.device)
+            if checkpoint['val_loss'] < self.best_val_loss:
+                self.best_val_loss = checkpoint['val_loss']
+                self.best_model = checkpoint['state_dict']
+        return records
+
+    def _record_trial(self, record: Dict, best_state: Optional[Dict], best_val_loss: float,
+                      results_path: Optional[Union[str, Path]]) -> Dict:
+        """Keep the best weights across trials and append the trial to the results file."""
+        self.logger.info(f"Trial {record['trial']} finished in {record['seconds']:.1f}s: "
+                         f"{record['params']} -> validation loss {record['val_loss']:.4f}")
+        improved = best_state is not None and best_val_loss < self.best_val_loss
+        if improved:
+            self.best_val_loss = best_val_loss
+            self.best_model = best_state
+        if results_path is not None:
+            if improved:
+                best_path = f"{results_path}.best.pt"
+                torch.save({'val_loss': best_val_loss, 'state_dict': best_state}, f"{best_path}.tmp")
+                os.replace(f"{best_path}.tmp", best_path)
+            with open(results_path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+        return record
+
     def save_model(self, output_path: Union[str, Path]) -> None:
         """
         Save the best model to a file.
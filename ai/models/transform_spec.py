@@ -0,0 +1,169 @@
+import numpy as np
+from typing import Any, Dict, Sequence, Tuple, Union
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+def factorize(values: Any) -> Tuple[np.ndarray, Any, np.ndarray]:
+    """
+    Factorize a column into codes, its distinct values and their ``str`` forms.
+
+    Missing values (None, NaN, NaT) get code -1. With pandas installed this is one hash-table
+    pass and only the distinct values are converted to strings; without it, the values are
+    converted to strings and sorted.
+
+    Returns:
+        Tuple of the code per value, the distinct values and the string key per distinct value.
+    """
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None
+    if pd is not None:
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        uniques = pd.Index(uniques)
+        return codes, uniques, np.asarray(uniques.astype(str), dtype=str)
+    values = np.asarray(values)
+    if values.dtype.kind in 'fc':
+        missing = np.isnan(values)
+    elif values.dtype.kind == 'O':
+        missing = np.equal(values, None) | (values != values)
+    else:
+        missing = np.zeros(len(values), dtype=bool)
+    keys, codes = np.unique(values.astype(str), return_inverse=True)
+    return np.where(missing, -1, codes.reshape(-1)), keys, keys
+
+class TransformSpec:
+    """
+    Fitted preprocessing transform: column roles, imputation values, scaling and vocabularies.
+
+    Produced by ``DataPreprocessor.fit`` or ``DataPreprocessor.preprocess_stream`` and saved
+    as a small JSON document. Applying it only needs NumPy (pandas, when installed, speeds up
+    categorical encoding), so serving code can reproduce the training-time preprocessing exactly
+    without scikit-learn. Numerical columns are
+    mean-imputed and standardized; categorical columns are mapped to their index in the sorted
+    vocabulary of string values (the ``LabelEncoder`` convention), with missing and unseen
+    values mapped to the most frequent training value. Unlike ``CategoricalEncoder``, which
+    gives unseen values a separate ``unseen_value`` code, the spec reproduces the training
+    pipeline (impute, then encode), so every output is a valid vocabulary code.
+    """
+    FORMAT = 'ontora-transform-v1'
+
+    def __init__(self, columns: Sequence[str], numerical_cols: Sequence[str], means: Sequence[float],
+                 scales: Sequence[float], categorical_cols: Sequence[str],
+                 vocabularies: Dict[str, Sequence[str]], fill_values: Dict[str, str]):
+        self.columns = list(columns)
+        self.numerical_cols = list(numerical_cols)
+        self.means = np.asarray(means, dtype=np.float64)
+        self.scales = np.asarray(scales, dtype=np.float64)
+        self.categorical_cols = list(categorical_cols)
+        self.vocabularies = {col: np.asarray(vocabularies[col], dtype=str) for col in self.categorical_cols}
+        self.fill_values = {col: str(fill_values[col]) for col in self.categorical_cols}
+        self.fill_codes = {col: int(np.searchsorted(self.vocabularies[col], self.fill_values[col]))
+                           for col in self.categorical_cols}
+
+    def _column(self, data: Any, col: str) -> np.ndarray:
+        if isinstance(data, np.ndarray) and data.ndim == 2:
+            return data[:, self.columns.index(col)]
+        column = data[col]
+        # Keep array-likes such as pandas Series as they are, so categorical columns factorize by code.
+        return column if hasattr(column, 'dtype') else np.asarray(column)
+
+    def encode(self, col: str, values: np.ndarray) -> np.ndarray:
+        """
+        Vocabulary codes for one categorical column; missing and unseen values get the fill code.
+
+        Values are factorized first (see ``factorize``), so only the distinct values are
+        converted to strings and looked up in the vocabulary.
+        """
+        vocabulary = self.vocabularies[col]
+        fill = self.fill_codes[col]
+        codes, _, keys = factorize(values)
+        if len(vocabulary) and len(keys):
+            matches = np.minimum(np.searchsorted(vocabulary, keys), len(vocabulary) - 1)
+            key_codes = np.where(vocabulary[matches] == keys, matches, fill)
+        else:
+            key_codes = np.full(len(keys), fill)
+        return np.where(codes >= 0, key_codes[np.maximum(codes, 0)] if len(keys) else fill, fill).astype(np.int64)
+
+    def transform_columns(self, data: Any) -> Dict[str, np.ndarray]:
+        """
+        Apply the transform column by column.
+
+        Args:
+            data: Anything indexable by column name (a dict of arrays, a DataFrame) or a 2D
+                array whose columns are in ``self.columns`` order.
+
+        Returns:
+            Dict[str, np.ndarray]: Transformed columns in ``self.columns`` order; numerical
+            columns are float64 and categorical columns int64 codes.
+        """
+        transformed: Dict[str, np.ndarray] = {}
+        if self.numerical_cols:
+            values = np.column_stack([self._column(data, col).astype(np.float64) for col in self.numerical_cols])
+            values = np.where(np.isnan(values), self.means, values)
+            scaled = (values - self.means) / self.scales
+            for i, col in enumerate(self.numerical_cols):
+                transformed[col] = scaled[:, i]
+        for col in self.categorical_cols:
+            transformed[col] = self.encode(col, self._column(data, col))
+        return {col: transformed[col] for col in self.columns}
+
+    def transform(self, data: Any, dtype=np.float32) -> np.ndarray:
+        """Apply the transform and return a (rows, columns) feature matrix in ``self.columns`` order."""
+        return np.column_stack([column.astype(dtype, copy=False)
+                                for column in self.transform_columns(data).values()])
+
+    def select(self, columns: Sequence[str]) -> 'TransformSpec':
+        """The transform restricted to ``columns``, e.g. for one worker's block of columns."""
+        selected = set(columns)
+        columns = [col for col in self.columns if col in selected]
+        numerical = [i for i, col in enumerate(self.numerical_cols) if col in columns]
+        categorical = [col for col in self.categorical_cols if col in columns]
+        return TransformSpec(columns, [self.numerical_cols[i] for i in numerical], self.means[numerical],
+                             self.scales[numerical], categorical,
+                             {col: self.vocabularies[col] for col in categorical},
+                             {col: self.fill_values[col] for col in categorical})
+
+    @classmethod
+    def combine(cls, columns: Sequence[str], parts: Sequence['TransformSpec']) -> 'TransformSpec':
+        """Merge specs fitted on disjoint column blocks into one spec over ``columns``."""
+        means = {col: mean for part in parts for col, mean in zip(part.numerical_cols, part.means)}
+        scales = {col: scale for part in parts for col, scale in zip(part.numerical_cols, part.scales)}
+        vocabularies = {col: part.vocabularies[col] for part in parts for col in part.categorical_cols}
+        fill_values = {col: part.fill_values[col] for part in parts for col in part.categorical_cols}
+        numerical = [col for col in columns if col in means]
+        categorical = [col for col in columns if col in vocabularies]
+        return cls(columns, numerical, [means[col] for col in numerical], [scales[col] for col in numerical],
+                   categorical, vocabularies, fill_values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'format': self.FORMAT,
+            'columns': self.columns,
+            'numerical_cols': self.numerical_cols,
+            'means': self.means.tolist(),
+            'scales': self.scales.tolist(),
+            'categorical_cols': self.categorical_cols,
+            'vocabularies': {col: vocabulary.tolist() for col, vocabulary in self.vocabularies.items()},
+            'fill_values': self.fill_values
+        }
+
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any]) -> 'TransformSpec':
+        if spec.get('format') != cls.FORMAT:
+            raise ValueError(f"Unsupported transform spec format: {spec.get('format')}")
+        return cls(spec['columns'], spec['numerical_cols'], spec['means'], spec['scales'],
+                   spec['categorical_cols'], spec['vocabularies'], spec['fill_values'])
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+        logger.info(f"Transform spec saved to {path}")
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike]) -> 'TransformSpec':
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,229 @@
+import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+import time
+
+from agent_model import OntoraAgent
+
+logger = logging.getLogger(__name__)
+
+class MockWeb3Env:
+    """
+    Minimal environment with the same dynamics as the agent_model demo loop: random
+    states, uniform rewards in [-1, 1] and episodes that end with probability 0.1.
+    """
+    def __init__(self, state_dim: int = 64, done_prob: float = 0.1, seed: Optional[int] = None):
+        self.state_dim = state_dim
+        self.done_prob = done_prob
+        self.rng = np.random.default_rng(seed)
+
+    def reset(self) -> np.ndarray:
+        return self.rng.standard_normal(self.state_dim, dtype=np.float32)
+
+    def step(self, action: int) -> Tuple[np.ndarray, float, bool]:
+        next_state = self.rng.standard_normal(self.state_dim, dtype=np.float32)
+        reward = float(self.rng.uniform(-1, 1))
+        done = bool(self.rng.random() < self.done_prob)
+        return next_state, reward, done
+
+class SharedArray:
+    """A NumPy array living in a named shared-memory block that child processes can attach to."""
+    def __init__(self, shape: Tuple[int, ...], dtype, name: Optional[str] = None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        nbytes = max(int(np.prod(self.shape)) * self.dtype.itemsize, 1)
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(create=self.owner, size=nbytes, name=name)
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+
+    def spec(self) -> Tuple[str, Tuple[int, ...], str]:
+        """Picklable description used to re-attach from another process."""
+        return self.shm.name, self.shape, self.dtype.str
+
+    @classmethod
+    def attach(cls, spec: Tuple[str, Tuple[int, ...], str]) -> 'SharedArray':
+        name, shape, dtype = spec
+        return cls(shape, dtype, name=name)
+
+    def close(self):
+        del self.array
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+def _worker(remote, env_fns: List[Callable], start: int, specs: Dict[str, Tuple]):
+    """Step a contiguous slice of environments, reading actions from and writing results to shared memory."""
+    buffers = {key: SharedArray.attach(spec) for key, spec in specs.items()}
+    obs, next_obs = buffers['obs'].array, buffers['next_obs'].array
+    actions, rewards, dones = buffers['actions'].array, buffers['rewards'].array, buffers['dones'].array
+    envs = [env_fn() for env_fn in env_fns]
+    try:
+        while True:
+            cmd = remote.recv()
+            if cmd == 'step':
+                for offset, env in enumerate(envs):
+                    i = start + offset
+                    state, reward, done = env.step(int(actions[i]))
+                    next_obs[i] = state
+                    rewards[i] = reward
+                    dones[i] = done
+                    obs[i] = env.reset() if done else state
+                remote.send(True)
+            elif cmd == 'reset':
+                for offset, env in enumerate(envs):
+                    obs[start + offset] = env.reset()
+                remote.send(True)
+            elif cmd == 'close':
+                break
+    finally:
+        for buffer in buffers.values():
+            buffer.close()
+        remote.close()
+
+class VectorEnv:
+    """
+    Steps N environments in parallel worker processes over shared-memory buffers.
+
+    Environments are split into contiguous slices, one per worker. Each step only sends
+    a one-word command through a pipe; observations, actions, rewards and done flags are
+    exchanged through shared arrays, so per-step IPC cost does not grow with state size.
+    Finished environments are reset automatically: ``next_observations`` holds the final
+    state of the episode while ``observations`` already holds the first state of the next.
+    """
+    def __init__(self, env_fns: List[Callable], state_dim: int, num_workers: Optional[int] = None,
+                 context: Optional[str] = None):
+        self.num_envs = len(env_fns)
+        self.state_dim = state_dim
+        self.num_workers = max(1, min(num_workers or mp.cpu_count(), self.num_envs))
+        self.buffers = {
+            'obs': SharedArray((self.num_envs, state_dim), np.float32),
+            'next_obs': SharedArray((self.num_envs, state_dim), np.float32),
+            'actions': SharedArray((self.num_envs,), np.int64),
+            'rewards': SharedArray((self.num_envs,), np.float32),
+            'dones': SharedArray((self.num_envs,), np.float32),
+        }
+        self.observations = self.buffers['obs'].array
+        self.next_observations = self.buffers['next_obs'].array
+        self.actions = self.buffers['actions'].array
+        self.rewards = self.buffers['rewards'].array
+        self.dones = self.buffers['dones'].array
+
+        ctx = mp.get_context(context)
+        specs = {key: buffer.spec() for key, buffer in self.buffers.items()}
+        bounds = np.linspace(0, self.num_envs, self.num_workers + 1).astype(int)
+        self.remotes, self.processes = [], []
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            remote, worker_remote = ctx.Pipe()
+            process = ctx.Process(target=_worker, args=(worker_remote, env_fns[start:end], int(start), specs),
+                                  daemon=True)
+            process.start()
+            worker_remote.close()
+            self.remotes.append(remote)
+            self.processes.append(process)
+        self.waiting = False
+        self.closed = False
+        logger.info(f"VectorEnv started {self.num_envs} environments on {self.num_workers} workers")
+
+    def _broadcast(self, cmd: str):
+        for remote in self.remotes:
+            remote.send(cmd)
+
+    def _wait(self):
+        for remote in self.remotes:
+            remote.recv()
+
+    def reset(self) -> np.ndarray:
+        """Reset every environment and return a copy of the initial observations."""
+        self._broadcast('reset')
+        self._wait()
+        return self.observations.copy()
+
+    def step_async(self, actions: np.ndarray):
+        """Hand actions to the workers and return immediately while they step."""
+        self.actions[:] = actions
+        self._broadcast('step')
+        self.waiting = True
+
+    def step_wait(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Wait for the pending step to finish.
+
+        Returns:
+            Tuple of (next_observations, rewards, dones) views into the shared buffers; they are
+            overwritten by the next step.
+        """
+        self._wait()
+        self.waiting = False
+        return self.next_observations, self.rewards, self.dones
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close(self):
+        if self.closed:
+            return
+        if self.waiting:
+            self._wait()
+        self._broadcast('close')
+        for process in self.processes:
+            process.join()
+        for remote in self.remotes:
+            remote.close()
+        for buffer in self.buffers.values():
+            buffer.close()
+        self.closed = True
+
+    def __enter__(self) -> 'VectorEnv':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class RolloutRunner:
+    """
+    Collects experience from a VectorEnv into an OntoraAgent.
+
+    Actions for all environments are selected in one batched forward pass, and the agent's
+    gradient steps run on this (learner) thread while the workers step the environments.
+    """
+    def __init__(self, agent: OntoraAgent, vec_env: VectorEnv, updates_per_step: int = 1):
+        self.agent = agent
+        self.vec_env = vec_env
+        self.updates_per_step = updates_per_step
+        self.frames = 0
+        self.episode_rewards: List[float] = []
+        self.running_rewards = np.zeros(vec_env.num_envs, dtype=np.float64)
+
+    def run(self, num_steps: int) -> Dict[str, float]:
+        """
+        Run ``num_steps`` vectorized environment steps.
+
+        Returns:
+            Dict: Frames collected, elapsed seconds and frames per second.
+        """
+        states = self.vec_env.reset()
+        # The reset cuts off the episodes in progress, so their partial returns are dropped.
+        self.running_rewards[:] = 0.0
+        start_time = time.perf_counter()
+        for _ in range(num_steps):
+            actions = self.agent.select_actions(states)
+            self.vec_env.step_async(actions)
+            for _ in range(self.updates_per_step):
+                self.agent.optimize_model()
+            next_states, rewards, dones = self.vec_env.step_wait()
+            self.agent.store_transitions(states, actions, rewards, next_states, dones)
+
+            self.running_rewards += rewards
+            finished = dones.astype(bool)
+            if finished.any():
+                self.episode_rewards.extend(self.running_rewards[finished].tolist())
+                self.running_rewards[finished] = 0.0
+            states = self.vec_env.observations.copy()
+            self.frames += self.vec_env.num_envs
+
+        elapsed = time.perf_counter() - start_time
+        frames = num_steps * self.vec_env.num_envs
+        return {'frames': frames, 'seconds': elapsed, 'fps': frames / elapsed if elapsed > 0 else 0.0}
@@ -0,0 +1,87 @@
+"""
+Benchmark memory per user agent and action-selection throughput for AgentPool.
+
+Memory per agent is compared against a standalone OntoraAgent (policy and target
+networks plus Adam state, measured after one optimizer step so the moment buffers
+exist). Throughput compares one batched ``AgentPool.select_actions`` call over
+requests from many tenants with looping over per-user OntoraAgents.
+
+Usage:
+    python benchmarks/bench_agent_pool.py --tenants 100000 --batch-size 4096
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import torch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ai', 'models')))
+from agent_model import AgentConfig, OntoraAgent
+from agent_pool import AgentPool
+
+
+def tensor_bytes(tensors) -> int:
+    return sum(t.numel() * t.element_size() for t in tensors if torch.is_tensor(t))
+
+
+def ontora_agent_bytes(config: AgentConfig) -> int:
+    agent = OntoraAgent(config)
+    for _ in range(config.batch_size):
+        agent.store_transition(np.zeros(config.state_dim), 0, 0.0, np.zeros(config.state_dim), False)
+    agent.optimize_model()
+    optimizer_state = [value for state in agent.optimizer.state.values() for value in state.values()]
+    return (tensor_bytes(agent.policy_net.parameters()) + tensor_bytes(agent.target_net.parameters()) +
+            tensor_bytes(optimizer_state))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AgentPool memory and throughput benchmark")
+    parser.add_argument('--tenants', type=int, default=100000)
+    parser.add_argument('--state-dim', type=int, default=64)
+    parser.add_argument('--action-dim', type=int, default=10)
+    parser.add_argument('--hidden-dim', type=int, default=128)
+    parser.add_argument('--batch-size', type=int, default=4096)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--loop-agents', type=int, default=64)
+    args = parser.parse_args()
+
+    logging.getLogger('agent_model').setLevel(logging.WARNING)
+    config = AgentConfig({'state_dim': args.state_dim, 'action_dim': args.action_dim,
+                          'hidden_dim': args.hidden_dim, 'epsilon_start': 0.05})
+    agent_bytes = ontora_agent_bytes(config)
+
+    pool = AgentPool(config)
+    start = time.perf_counter()
+    pool.slots([f"user-{i}" for i in range(args.tenants)])
+    register_time = time.perf_counter() - start
+    pool_bytes = pool.bytes_per_tenant()
+    print(f"memory per agent: OntoraAgent={agent_bytes / 1024:,.1f} KiB  AgentPool={pool_bytes / 1024:,.2f} KiB  "
+          f"({agent_bytes / pool_bytes:,.0f}x smaller)")
+    print(f"{args.tenants:,} tenants: {args.tenants * pool_bytes / 2**20:,.1f} MiB packed state, "
+          f"registered in {register_time:.2f}s")
+
+    rng = np.random.default_rng(0)
+    states = rng.standard_normal((args.batch_size, args.state_dim), dtype=np.float32)
+    user_ids = [pool.tenants[i] for i in rng.integers(args.tenants, size=args.batch_size)]
+    pool.select_actions(user_ids, states)
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        pool.select_actions(user_ids, states)
+    pool_rate = args.iterations * args.batch_size / (time.perf_counter() - start)
+
+    agents = [OntoraAgent(config) for _ in range(args.loop_agents)]
+    owners = rng.integers(args.loop_agents, size=args.batch_size)
+    start = time.perf_counter()
+    for owner, state in zip(owners, states):
+        agents[owner].select_action(state)
+    loop_rate = args.batch_size / (time.perf_counter() - start)
+
+    print(f"actions/sec: batched pool={pool_rate:,.0f}  per-agent loop={loop_rate:,.0f}  "
+          f"speedup={pool_rate / loop_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark ModelTrainer epochs fed by TensorBatchLoader against a DataLoader.
+
+Trains and validates the same small AgentModel for a few epochs on in-memory tensors,
+once per batch size, with a shuffling ``DataLoader(TensorDataset)`` (per-sample indexing
+and collate), with ``TensorBatchLoader`` and with ``TensorBatchLoader`` plus a prefetch
+thread, and reports the average epoch time of each.
+
+Usage:
+    python benchmarks/bench_batch_loader.py --rows 100000 --batch-sizes 32 256
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+import torch
+import torch.nn as nn
+import torch.optim as optim
+from torch.utils.data import DataLoader, TensorDataset
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ai', 'models')))
+from dataset_cache import TensorBatchLoader
+from train import AgentModel, ModelTrainer
+
+
+def epoch_seconds(trainer, train_loader, val_loader, features, epochs):
+    torch.manual_seed(0)
+    model = AgentModel(features, [64, 32], 1)
+    optimizer = optim.Adam(model.parameters(), lr=1e-3)
+    criterion = nn.MSELoss()
+    start = time.perf_counter()
+    for _ in range(epochs):
+        trainer.train_epoch(model, train_loader, criterion, optimizer)
+        trainer.validate(model, val_loader, criterion)
+    return (time.perf_counter() - start) / epochs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-memory batch loader benchmark")
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--features', type=int, default=16)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[32, 256])
+    parser.add_argument('--epochs', type=int, default=3)
+    args = parser.parse_args()
+
+    logging.getLogger('train').setLevel(logging.WARNING)
+    torch.manual_seed(0)
+    X = torch.randn(args.rows, args.features)
+    y = X.sum(1)
+    split = int(0.8 * args.rows)
+    trainer = ModelTrainer(AgentModel, args.features, 1)
+    for batch_size in args.batch_sizes:
+        loaders = {
+            'DataLoader': (DataLoader(TensorDataset(X[:split], y[:split]), batch_size=batch_size, shuffle=True),
+                           DataLoader(TensorDataset(X[split:], y[split:]), batch_size=batch_size)),
+            'TensorBatchLoader': (TensorBatchLoader(X[:split], y[:split], batch_size, shuffle=True),
+                                  TensorBatchLoader(X[split:], y[split:], batch_size)),
+            'TensorBatchLoader+prefetch': (TensorBatchLoader(X[:split], y[:split], batch_size, shuffle=True,
+                                                             prefetch=4),
+                                           TensorBatchLoader(X[split:], y[split:], batch_size, prefetch=4)),
+        }
+        baseline = None
+        for name, (train_loader, val_loader) in loaders.items():
+            seconds = epoch_seconds(trainer, train_loader, val_loader, args.features, args.epochs)
+            baseline = baseline or seconds
+            print(f"batch_size={batch_size:4d} {name:27s} {seconds:6.2f}s/epoch  speedup {baseline / seconds:4.2f}x")
+
+
+if __name__ == "__main__":
+    main()
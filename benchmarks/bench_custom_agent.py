@@ -0,0 +1,113 @@
+"""
+Benchmark CustomAgent's interned NumPy Q-table against the original dict-of-dicts engine.
+
+Runs the same learning loop (intern state, epsilon-greedy choice, simulated reward,
+Q update) over a state sequence touching ``--states`` distinct states, once with the
+original ``experience[str(state)][behavior]`` implementation and once with the
+vectorized ``intern_states`` / ``choose_actions`` / ``update_learning_batch`` path.
+Reports steps per second and the memory held by each learned table.
+
+Usage:
+    python benchmarks/bench_custom_agent.py --states 1000000 --steps 2000000
+"""
+import argparse
+import gc
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'examples')))
+from custom_agent import CustomAgent
+
+BEHAVIORS = {'stake_tokens': 0.5, 'claim_rewards': 0.3, 'analyze_data': 0.2, 'idle': 0.1}
+
+
+class DictEngine:
+    """The original experience-dict learning loop, without its per-step logging."""
+    def __init__(self, behaviors, learning_rate=0.1, exploration_rate=0.2):
+        self.behaviors = dict(behaviors)
+        self.learning_rate = learning_rate
+        self.exploration_rate = exploration_rate
+        self.experience = {}
+        self.total_rewards = 0.0
+
+    def run(self, states):
+        for state in states:
+            key = str(state)
+            if key not in self.experience:
+                self.experience[key] = {b: 0.0 for b in self.behaviors.keys()}
+            if random.random() < self.exploration_rate:
+                action = random.choice(list(self.behaviors.keys()))
+            else:
+                state_experience = self.experience[key]
+                action = max(state_experience, key=state_experience.get)
+            reward = self.behaviors[action] + random.uniform(-0.1, 0.1)
+            current_value = self.experience[key][action]
+            self.experience[key][action] = current_value + self.learning_rate * (reward - current_value)
+            self.behaviors[action] += self.learning_rate * reward
+            self.total_rewards += reward
+
+
+def run_vectorized(agent: CustomAgent, states, batch_size: int):
+    for start in range(0, len(states), batch_size):
+        state_ids = agent.intern_states(states[start:start + batch_size])
+        action_ids = agent.choose_actions(state_ids)
+        agent.update_learning_batch(state_ids, action_ids, agent.perform_actions(action_ids))
+
+
+def measure(fn):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CustomAgent Q-table engine benchmark")
+    parser.add_argument('--states', type=int, default=1000000)
+    parser.add_argument('--steps', type=int, default=2000000)
+    parser.add_argument('--batch-size', type=int, default=65536)
+    args = parser.parse_args()
+
+    logging.getLogger('custom_agent').setLevel(logging.WARNING)
+    rng = np.random.default_rng(0)
+    # Every state appears at least once, the rest of the sequence revisits them at random.
+    state_ids = np.concatenate([np.arange(args.states), rng.integers(args.states, size=max(args.steps - args.states, 0))])
+    states = [f"state_{i}" for i in state_ids.tolist()]
+
+    # Time without tracing, then trace a second run for memory (tracemalloc slows allocation-heavy code).
+    dict_engine = DictEngine(BEHAVIORS)
+    start = time.perf_counter()
+    dict_engine.run(states)
+    dict_time = time.perf_counter() - start
+    del dict_engine
+    _, _, dict_peak = measure(lambda: DictEngine(BEHAVIORS).run(states))
+
+    def make_agent():
+        return CustomAgent("bench_agent", dict(BEHAVIORS), config_path=os.path.join(tempfile.mkdtemp(), "config.json"))
+
+    agent = make_agent()
+    start = time.perf_counter()
+    run_vectorized(agent, states, args.batch_size)
+    table_time = time.perf_counter() - start
+    del agent
+    _, _, table_peak = measure(lambda: run_vectorized(make_agent(), states, args.batch_size))
+
+    print(f"{args.steps:,} steps over {args.states:,} states")
+    print(f"dict engine:   {args.steps / dict_time:>12,.0f} steps/s  peak {dict_peak / 2**20:8.1f} MiB")
+    print(f"Q-table engine:{args.steps / table_time:>12,.0f} steps/s  peak {table_peak / 2**20:8.1f} MiB  "
+          f"speedup={dict_time / table_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
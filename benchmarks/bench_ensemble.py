@@ -0,0 +1,80 @@
+"""
+Benchmark vectorized ensemble training against training the same models one by one.
+
+Trains K AgentModels that share hidden sizes but differ in learning rate, once with
+``ModelTrainer.train_ensemble`` (one vmap-ed forward/backward per batch) and once with K
+sequential ``ModelTrainer.train`` runs from the same initial weights, and reports the
+speedup and the largest difference in per-epoch validation loss.
+
+Usage:
+    python benchmarks/bench_ensemble.py --models 4 16 32 --epochs 5
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ai', 'models')))
+from train import AgentModel, ModelTrainer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized ensemble training benchmark")
+    parser.add_argument('--models', type=int, nargs='+', default=[4, 16, 32])
+    parser.add_argument('--rows', type=int, default=4000)
+    parser.add_argument('--features', type=int, default=8)
+    parser.add_argument('--epochs', type=int, default=5)
+    parser.add_argument('--batch-size', type=int, default=64)
+    args = parser.parse_args()
+
+    logging.getLogger('train').setLevel(logging.WARNING)
+    torch.manual_seed(0)
+    X = torch.randn(args.rows, args.features)
+    y = torch.sin(X).sum(1)
+    split = int(0.8 * args.rows)
+    train_loader = DataLoader(TensorDataset(X[:split], y[:split]), batch_size=args.batch_size)
+    val_loader = DataLoader(TensorDataset(X[split:], y[split:]), batch_size=256)
+    hidden_sizes = [64, 32]
+
+    # Warm up torch.func so its one-time import is not billed to the first run.
+    ModelTrainer(AgentModel, args.features, 1).train_ensemble(
+        train_loader, val_loader, [{'hidden_sizes': hidden_sizes, 'learning_rate': 1e-3, 'dropout_rate': 0.0}] * 2, 1)
+
+    build_trial = ModelTrainer.build_trial
+    for num_models in args.models:
+        configs = [{'hidden_sizes': hidden_sizes, 'learning_rate': lr, 'dropout_rate': 0.0}
+                   for lr in torch.logspace(-3.5, -2, num_models).tolist()]
+        inits = [AgentModel(args.features, hidden_sizes, 1).state_dict() for _ in configs]
+        queue = []
+
+        def build_from_inits(trainer, params):
+            model, criterion, optimizer = build_trial(trainer, params)
+            model.load_state_dict(queue.pop(0))
+            return model, criterion, optimizer
+
+        ModelTrainer.build_trial = build_from_inits
+        queue[:] = inits
+        start = time.perf_counter()
+        ensemble = ModelTrainer(AgentModel, args.features, 1).train_ensemble(train_loader, val_loader, configs,
+                                                                            args.epochs, args.epochs + 1)
+        ensemble_seconds = time.perf_counter() - start
+        queue[:] = inits
+        start = time.perf_counter()
+        sequential = [ModelTrainer(AgentModel, args.features, 1).train(train_loader, val_loader, config,
+                                                                       args.epochs, args.epochs + 1)
+                      for config in configs]
+        sequential_seconds = time.perf_counter() - start
+        ModelTrainer.build_trial = build_trial
+
+        diff = max(abs(a - b) for batched, single in zip(ensemble, sequential)
+                   for a, b in zip(batched['history']['val_loss'], single['history']['val_loss']))
+        print(f"K={num_models:3d}: ensemble {ensemble_seconds:6.2f}s  sequential {sequential_seconds:6.2f}s  "
+              f"speedup {sequential_seconds / ensemble_seconds:5.1f}x  max val loss diff {diff:.1e}")
+
+
+if __name__ == "__main__":
+    main()
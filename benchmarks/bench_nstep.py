@@ -0,0 +1,103 @@
+"""
+Benchmark frames-to-target-reward for 1-step vs n-step DQN targets.
+
+Uses a deterministic chain environment: the agent starts at the left end of a
+corridor of ``length`` cells, moves left or right, and only receives a reward of 1
+when it reaches the right end. Sparse, delayed reward like this is where n-step
+returns propagate value faster than one-step bootstrapping. The greedy policy is
+evaluated periodically and the number of environment frames until it solves the
+chain is reported for each n.
+
+Usage:
+    python benchmarks/bench_nstep.py --length 12 --n-steps 1 3 5 --seeds 3
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+
+import numpy as np
+import torch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ai', 'models')))
+from agent_model import AgentConfig, OntoraAgent
+
+
+class ChainEnv:
+    def __init__(self, length: int):
+        self.length = length
+        self.max_steps = 2 * length
+        self.position = 0
+        self.steps = 0
+
+    def observation(self) -> np.ndarray:
+        obs = np.zeros(self.length, dtype=np.float32)
+        obs[self.position] = 1.0
+        return obs
+
+    def reset(self) -> np.ndarray:
+        self.position = 0
+        self.steps = 0
+        return self.observation()
+
+    def step(self, action: int):
+        self.position = min(self.position + 1, self.length - 1) if action == 1 else max(self.position - 1, 0)
+        self.steps += 1
+        reached = self.position == self.length - 1
+        reward = 1.0 if reached else 0.0
+        return self.observation(), reward, reached or self.steps >= self.max_steps
+
+
+def greedy_solves(agent: OntoraAgent, length: int) -> bool:
+    env = ChainEnv(length)
+    state = env.reset()
+    for _ in range(length - 1):
+        with torch.no_grad():
+            q_values = agent.policy_net(torch.from_numpy(state).unsqueeze(0).to(agent.config.device))
+        state, reward, done = env.step(int(q_values.argmax(1).item()))
+        if reward > 0:
+            return True
+    return False
+
+
+def frames_to_target(n_step: int, length: int, max_frames: int, eval_every: int, seed: int) -> int:
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+    config = AgentConfig({'state_dim': length, 'action_dim': 2, 'hidden_dim': 64, 'learning_rate': 1e-3,
+                          'gamma': 0.95, 'epsilon_decay': max_frames // 5, 'memory_size': max_frames,
+                          'batch_size': 32, 'target_update_freq': 200, 'n_step': n_step})
+    agent = OntoraAgent(config)
+    env = ChainEnv(length)
+    state = env.reset()
+    for frame in range(1, max_frames + 1):
+        action = agent.select_action(state)
+        next_state, reward, done = env.step(action)
+        agent.store_transition(state, action, reward, next_state, done)
+        agent.optimize_model()
+        state = env.reset() if done else next_state
+        if frame % eval_every == 0 and greedy_solves(agent, length):
+            return frame
+    return max_frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="n-step return frames-to-target benchmark")
+    parser.add_argument('--length', type=int, default=12)
+    parser.add_argument('--n-steps', type=int, nargs='+', default=[1, 3, 5])
+    parser.add_argument('--max-frames', type=int, default=20000)
+    parser.add_argument('--eval-every', type=int, default=250)
+    parser.add_argument('--seeds', type=int, default=3)
+    args = parser.parse_args()
+
+    logging.getLogger('agent_model').setLevel(logging.WARNING)
+    print(f"chain length={args.length} max_frames={args.max_frames}")
+    for n_step in args.n_steps:
+        frames = [frames_to_target(n_step, args.length, args.max_frames, args.eval_every, seed)
+                  for seed in range(args.seeds)]
+        print(f"n_step={n_step}: frames to solve per seed={frames} mean={np.mean(frames):,.0f}")
+
+
+if __name__ == "__main__":
+    main()
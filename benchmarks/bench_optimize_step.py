@@ -0,0 +1,78 @@
+"""
+Benchmark DQN optimization steps per second.
+
+Runs OntoraAgent.optimize_model (staged, allocation-free batch tensors) against a
+baseline step that rebuilds the five batch tensors from Python lists with
+torch.FloatTensor, as optimize_model originally did.
+
+Usage:
+    python benchmarks/bench_optimize_step.py --batch-size 64 --steps 2000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ai', 'models')))
+from agent_model import AgentConfig, OntoraAgent
+
+
+def legacy_step(agent: OntoraAgent):
+    """One optimize_model step using per-step tensor construction from lists."""
+    memory = agent.memory
+    indices = memory.sample_indices(agent.config.batch_size)
+    device = agent.config.device
+    state_batch = torch.FloatTensor([memory.states[i] for i in indices]).to(device)
+    action_batch = torch.LongTensor([memory.actions[i] for i in indices]).to(device)
+    reward_batch = torch.FloatTensor([memory.rewards[i] for i in indices]).to(device)
+    next_state_batch = torch.FloatTensor([memory.next_states[i] for i in indices]).to(device)
+    done_batch = torch.FloatTensor([memory.dones[i] for i in indices]).to(device)
+
+    current_q_values = agent.policy_net(state_batch).gather(1, action_batch.unsqueeze(1)).squeeze(1)
+    next_q_values = agent.target_net(next_state_batch).max(1)[0].detach()
+    target_q_values = reward_batch + agent.config.gamma * next_q_values * (1 - done_batch)
+    loss = nn.MSELoss()(current_q_values, target_q_values)
+    agent.optimizer.zero_grad()
+    loss.backward()
+    agent.optimizer.step()
+
+
+def steps_per_second(step, steps: int) -> float:
+    for _ in range(10):
+        step()
+    if torch.cuda.is_available():
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(steps):
+        step()
+    if torch.cuda.is_available():
+        torch.cuda.synchronize()
+    return steps / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DQN optimization step benchmark")
+    parser.add_argument('--state-dim', type=int, default=64)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--memory-size', type=int, default=100000)
+    parser.add_argument('--steps', type=int, default=2000)
+    args = parser.parse_args()
+
+    config = AgentConfig({'state_dim': args.state_dim, 'batch_size': args.batch_size,
+                          'memory_size': args.memory_size})
+    agent = OntoraAgent(config)
+    states = np.random.randn(args.memory_size, args.state_dim).astype(np.float32)
+    for i in range(args.memory_size):
+        agent.store_transition(states[i], i % config.action_dim, 0.0, states[(i + 1) % args.memory_size], False)
+
+    print(f"device={config.device} batch_size={args.batch_size} state_dim={args.state_dim}")
+    print(f"{'legacy tensor construction':>28}: {steps_per_second(lambda: legacy_step(agent), args.steps):,.0f} steps/s")
+    print(f"{'staged batch tensors':>28}: {steps_per_second(agent.optimize_model, args.steps):,.0f} steps/s")
+
+
+if __name__ == "__main__":
+    main()
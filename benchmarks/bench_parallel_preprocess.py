@@ -0,0 +1,70 @@
+"""
+Benchmark DataPreprocessor.fit_transform scaling across worker processes.
+
+Preprocesses the same wide transactions frame (float features, low-cardinality integer
+columns and string columns) serially and with 2, 4, ... up to ``--max-workers`` column
+blocks, checks that every parallel result equals the serial one and reports speedup
+and parallel efficiency over the serial run.
+
+Usage:
+    python benchmarks/bench_parallel_preprocess.py --rows 2000000 --float-cols 24 --string-cols 8
+"""
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ai', 'models')))
+from data_preprocess import DataPreprocessor
+
+
+def make_frame(rows: int, float_cols: int, int_cols: int, string_cols: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for i in range(float_cols):
+        values = rng.normal(size=rows)
+        values[rng.random(rows) < 0.05] = np.nan
+        columns[f"f{i}"] = values
+    for i in range(int_cols):
+        columns[f"i{i}"] = rng.integers(0, 50, size=rows)
+    for i in range(string_cols):
+        vocabulary = np.array([f"token_{i}_{j}" for j in range(1000 * (i + 1))], dtype=object)
+        columns[f"s{i}"] = vocabulary[rng.integers(len(vocabulary), size=rows)]
+    return pd.DataFrame(columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel column-wise preprocessing scaling benchmark")
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--float-cols', type=int, default=24)
+    parser.add_argument('--int-cols', type=int, default=4)
+    parser.add_argument('--string-cols', type=int, default=8)
+    parser.add_argument('--max-workers', type=int, default=mp.cpu_count())
+    args = parser.parse_args()
+
+    data = make_frame(args.rows, args.float_cols, args.int_cols, args.string_cols)
+    print(f"{args.rows:,} rows x {len(data.columns)} columns "
+          f"({data.memory_usage(deep=True).sum() / 2**20:,.0f} MiB), {mp.cpu_count()} CPUs")
+
+    start = time.perf_counter()
+    expected = DataPreprocessor().fit_transform(data.copy())
+    baseline = time.perf_counter() - start
+    print(f"serial:      {baseline:7.2f}s")
+
+    worker_counts = sorted({1 << k for k in range(1, args.max_workers.bit_length())} | {args.max_workers} - {1})
+    for num_workers in worker_counts:
+        start = time.perf_counter()
+        result = DataPreprocessor(num_workers=num_workers).fit_transform(data.copy())
+        seconds = time.perf_counter() - start
+        pd.testing.assert_frame_equal(result, expected)
+        speedup = baseline / seconds
+        print(f"workers={num_workers:3d}: {seconds:7.2f}s  speedup={speedup:5.2f}x  "
+              f"efficiency={speedup / num_workers:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark Population scaling across worker processes.
+
+Evolves the same population of CustomAgent instances over the same state sequence with
+1, 2, 4, ... up to ``--max-workers`` workers and reports agent-steps per second, speedup
+over one worker and parallel efficiency. Results are identical for every worker count,
+since each agent's random stream only depends on the seed and its id.
+
+Usage:
+    python benchmarks/bench_population.py --agents 2000 --steps 5000 --states 500 --max-workers 8
+"""
+import argparse
+import logging
+import multiprocessing as mp
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'examples')))
+from population import Population
+
+BEHAVIORS = {'stake_tokens': 0.5, 'claim_rewards': 0.3, 'analyze_data': 0.2, 'idle': 0.1}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Population process-pool scaling benchmark")
+    parser.add_argument('--agents', type=int, default=2000)
+    parser.add_argument('--steps', type=int, default=5000)
+    parser.add_argument('--states', type=int, default=500)
+    parser.add_argument('--max-workers', type=int, default=mp.cpu_count())
+    args = parser.parse_args()
+
+    logging.getLogger('population').setLevel(logging.WARNING)
+    rng = np.random.default_rng(0)
+    state_sequence = [f"state_{i}" for i in rng.integers(args.states, size=args.steps).tolist()]
+    agent_ids = [f"agent_{i:06d}" for i in range(args.agents)]
+
+    worker_counts = sorted({1 << k for k in range(args.max_workers.bit_length())} | {args.max_workers})
+    print(f"{args.agents:,} agents x {args.steps:,} steps, {args.states:,} states, {mp.cpu_count()} CPUs")
+    baseline, reference = None, None
+    for num_workers in worker_counts:
+        results = Population(agent_ids, BEHAVIORS, num_workers=num_workers).run(state_sequence=state_sequence)
+        experience = [results[key] for key in ('experience_offsets', 'experience_state_ids', 'experience_values')]
+        if reference is None:
+            baseline, reference = results['seconds'], experience
+        assert all(np.array_equal(array, expected) for array, expected in zip(experience, reference))
+        rate = args.agents * args.steps / results['seconds']
+        speedup = baseline / results['seconds']
+        print(f"workers={num_workers:3d}: {rate:14,.0f} agent-steps/s  speedup={speedup:5.2f}x  "
+              f"efficiency={speedup / num_workers:6.1%}  shard imbalance="
+              f"{max(results['shard_seconds']) / max(np.mean(results['shard_seconds']), 1e-9):.2f}")
+
+
+if __name__ == "__main__":
+    main()
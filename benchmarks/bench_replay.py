@@ -0,0 +1,81 @@
+"""
+Benchmark replay-buffer sampling throughput.
+
+Compares the original deque-of-tuples ReplayMemory (including the zip + tensor
+construction that optimize_model had to do on every step) with the ring-buffer
+ReplayMemory and the sum-tree backed PrioritizedReplayMemory.
+
+Usage:
+    python benchmarks/bench_replay.py --capacity 1000000 --state-dim 64 --batch-size 64
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import deque
+
+import numpy as np
+import torch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ai', 'models')))
+from agent_model import ReplayMemory, PrioritizedReplayMemory
+
+
+class DequeReplayMemory:
+    """The original tuple-per-transition buffer, kept here as the baseline."""
+    def __init__(self, capacity: int):
+        self.memory = deque(maxlen=capacity)
+
+    def push(self, state, action, reward, next_state, done):
+        self.memory.append((state, action, reward, next_state, done))
+
+    def sample(self, batch_size: int):
+        transitions = random.sample(self.memory, batch_size)
+        batch_state, batch_action, batch_reward, batch_next_state, batch_done = zip(*transitions)
+        return (torch.FloatTensor(np.array(batch_state)), torch.LongTensor(batch_action),
+                torch.FloatTensor(batch_reward), torch.FloatTensor(np.array(batch_next_state)),
+                torch.FloatTensor(batch_done))
+
+    def __len__(self):
+        return len(self.memory)
+
+
+def fill(memory, capacity: int, state_dim: int):
+    states = np.random.randn(capacity, state_dim).astype(np.float32)
+    for i in range(capacity):
+        memory.push(states[i], i % 4, 0.0, states[(i + 1) % capacity], False)
+
+
+def bench_sample(memory, batch_size: int, iterations: int, prioritized: bool = False) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        batch = memory.sample(batch_size)
+        if prioritized:
+            memory.update_priorities(batch[-1], np.random.rand(batch_size))
+    elapsed = time.perf_counter() - start
+    return iterations * batch_size / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay buffer sampling benchmark")
+    parser.add_argument('--capacity', type=int, default=100000)
+    parser.add_argument('--state-dim', type=int, default=64)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    buffers = [
+        ('deque (baseline)', DequeReplayMemory(args.capacity), False),
+        ('ring buffer', ReplayMemory(args.capacity, args.state_dim), False),
+        ('prioritized (sum-tree)', PrioritizedReplayMemory(args.capacity, args.state_dim), True),
+    ]
+    print(f"capacity={args.capacity} state_dim={args.state_dim} batch_size={args.batch_size}")
+    for name, memory, prioritized in buffers:
+        fill(memory, args.capacity, args.state_dim)
+        rate = bench_sample(memory, args.batch_size, args.iterations, prioritized)
+        print(f"{name:>24}: {rate:,.0f} samples/s")
+
+
+if __name__ == "__main__":
+    main()
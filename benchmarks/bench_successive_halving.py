@@ -0,0 +1,83 @@
+"""
+Benchmark successive halving and Hyperband against the full grid search.
+
+Runs ``ModelTrainer.hyperparameter_tuning`` over a 3x3x3 grid and
+``ModelTrainer.successive_halving`` / ``ModelTrainer.hyperband`` on the same synthetic
+regression data on the CPU, and reports wall-clock time, epochs trained and the best
+validation loss each search finds.
+
+Usage:
+    python benchmarks/bench_successive_halving.py --epochs 27 --rows 20000
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ai', 'models')))
+from train import AgentModel, ModelTrainer
+
+PARAM_GRID = {
+    'hidden_sizes': [[32], [64, 32], [128, 64, 32]],
+    'learning_rate': [0.0001, 0.001, 0.01],
+    'dropout_rate': [0.0, 0.2, 0.4]
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Successive halving vs grid search benchmark")
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--features', type=int, default=16)
+    parser.add_argument('--epochs', type=int, default=27)
+    parser.add_argument('--reduction-factor', type=int, default=3)
+    args = parser.parse_args()
+
+    logging.getLogger('train').setLevel(logging.WARNING)
+    torch.manual_seed(0)
+    X = torch.randn(args.rows, args.features)
+    y = torch.sin(X[:, :4]).sum(1) + 0.1 * torch.randn(args.rows)
+    split = int(0.8 * args.rows)
+    train_loader = DataLoader(TensorDataset(X[:split], y[:split]), batch_size=256, shuffle=True)
+    val_loader = DataLoader(TensorDataset(X[split:], y[split:]), batch_size=1024)
+
+    def run(name, search):
+        torch.manual_seed(0)
+        trainer = ModelTrainer(AgentModel, input_size=args.features, output_size=1)
+        start = time.perf_counter()
+        result = search(trainer)
+        seconds = time.perf_counter() - start
+        print(f"{name:20s} {seconds:8.2f}s  epochs={result['epochs']:5d}  best val loss={result['loss']:.4f}  "
+              f"{result['params']}")
+        return seconds
+
+    num_configs = len(PARAM_GRID['hidden_sizes']) * len(PARAM_GRID['learning_rate']) * len(PARAM_GRID['dropout_rate'])
+    print(f"{num_configs} configurations, {args.epochs} epochs max, {args.rows:,} rows, CPU only")
+
+    def grid(trainer):
+        # Patience above the budget: every configuration trains for the full number of epochs.
+        result = trainer.hyperparameter_tuning(train_loader, val_loader, PARAM_GRID, args.epochs,
+                                               early_stopping_patience=args.epochs + 1)
+        return {'epochs': num_configs * args.epochs, 'loss': result['best_val_loss'], 'params': result['best_params']}
+
+    def halving(trainer):
+        result = trainer.successive_halving(train_loader, val_loader, PARAM_GRID, args.epochs,
+                                            reduction_factor=args.reduction_factor)
+        return {'epochs': result['epochs_trained'], 'loss': result['best_val_loss'], 'params': result['best_params']}
+
+    def hyperband(trainer):
+        result = trainer.hyperband(train_loader, val_loader, PARAM_GRID, args.epochs,
+                                   reduction_factor=args.reduction_factor)
+        return {'epochs': result['epochs_trained'], 'loss': result['best_val_loss'], 'params': result['best_params']}
+
+    baseline = run('grid search', grid)
+    for name, search in (('successive halving', halving), ('hyperband', hyperband)):
+        seconds = run(name, search)
+        print(f"{'':20s} saves {baseline - seconds:.2f}s ({1 - seconds / baseline:.0%}) of grid-search wall clock")
+
+
+if __name__ == "__main__":
+    main()
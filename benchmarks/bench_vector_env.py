@@ -0,0 +1,66 @@
+"""
+Benchmark experience-collection throughput of VectorEnv across worker counts.
+
+Each environment burns a configurable amount of pure-Python CPU per step to stand
+in for a real simulator, so throughput should scale close to linearly with the
+number of worker processes up to the number of physical cores.
+
+Usage:
+    python benchmarks/bench_vector_env.py --num-envs 64 --max-workers 8 --step-work 2000
+"""
+import argparse
+import multiprocessing as mp
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'ai', 'models')))
+from agent_model import AgentConfig, OntoraAgent
+from vector_env import MockWeb3Env, RolloutRunner, VectorEnv
+
+
+class CpuBoundEnv(MockWeb3Env):
+    """MockWeb3Env with extra per-step work."""
+    def __init__(self, state_dim: int, step_work: int, seed: int):
+        super(CpuBoundEnv, self).__init__(state_dim=state_dim, seed=seed)
+        self.step_work = step_work
+
+    def step(self, action):
+        acc = 0
+        for i in range(self.step_work):
+            acc += i * i
+        return super(CpuBoundEnv, self).step(action)
+
+
+class EnvFactory:
+    def __init__(self, state_dim: int, step_work: int, seed: int):
+        self.state_dim, self.step_work, self.seed = state_dim, step_work, seed
+
+    def __call__(self):
+        return CpuBoundEnv(self.state_dim, self.step_work, self.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VectorEnv collection throughput benchmark")
+    parser.add_argument('--num-envs', type=int, default=64)
+    parser.add_argument('--state-dim', type=int, default=64)
+    parser.add_argument('--max-workers', type=int, default=mp.cpu_count())
+    parser.add_argument('--steps', type=int, default=200)
+    parser.add_argument('--step-work', type=int, default=2000)
+    parser.add_argument('--updates-per-step', type=int, default=0)
+    args = parser.parse_args()
+
+    env_fns = [EnvFactory(args.state_dim, args.step_work, seed) for seed in range(args.num_envs)]
+    baseline = None
+    workers = 1
+    while workers <= args.max_workers:
+        config = AgentConfig({'state_dim': args.state_dim, 'memory_size': args.num_envs * args.steps})
+        agent = OntoraAgent(config)
+        with VectorEnv(env_fns, args.state_dim, num_workers=workers) as vec_env:
+            stats = RolloutRunner(agent, vec_env, updates_per_step=args.updates_per_step).run(args.steps)
+        baseline = baseline or stats['fps']
+        print(f"workers={workers:>3}: {stats['fps']:>12,.0f} frames/s  speedup={stats['fps'] / baseline:.2f}x")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,10 @@ import random
 import json 
 import logging
 import os
-from typing import Dict, List, Any, Optional
+import time
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Any, Optional, Sequence
 from datetime import datetime
 
 # Set up logging for debugging and tracking agent behavior
@@ -20,11 +23,139 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class StateInterner:
+    """
+    Maps states to dense integer ids by their ``str`` form (the key the experience dict always used).
+    Ids are assigned in first-seen order, so they double as row indices into the Q-table.
+    """
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def intern(self, state: Any) -> int:
+        return self.ids.setdefault(str(state), len(self.ids))
+
+    def intern_many(self, states: Sequence[Any]) -> np.ndarray:
+        ids = self.ids
+        return np.fromiter([ids.setdefault(key, len(ids)) for key in map(str, states)],
+                           dtype=np.int64, count=len(states))
+
+class QTable:
+    """
+    Dense (num_states, num_actions) Q-value matrix that grows geometrically as new states are interned.
+    ``dirty`` flags the rows changed since the last checkpoint.
+    """
+    def __init__(self, num_actions: int, initial_capacity: int = 1024) -> None:
+        self.values = np.zeros((max(initial_capacity, 1), num_actions), dtype=np.float64)
+        self.dirty = np.zeros(len(self.values), dtype=bool)
+
+    def ensure(self, num_states: int) -> None:
+        if num_states > len(self.values):
+            values = np.zeros((max(num_states, 2 * len(self.values)), self.values.shape[1]), dtype=np.float64)
+            values[:len(self.values)] = self.values
+            dirty = np.zeros(len(values), dtype=bool)
+            dirty[:len(self.dirty)] = self.dirty
+            self.values, self.dirty = values, dirty
+
+    def add_action(self) -> None:
+        self.values = np.hstack([self.values, np.zeros((len(self.values), 1), dtype=np.float64)])
+
+class ExperienceView(Mapping):
+    """
+    Read-only ``experience[str(state)][behavior]`` view of an agent's Q-table.
+
+    Rows are read from the table on access, so the view is always current and costs nothing
+    to create. Writing through it (``experience[s][a] = v``) raises ``TypeError``: assign a
+    full dict to ``CustomAgent.experience`` or use ``update_learning`` instead.
+    """
+    def __init__(self, agent: 'CustomAgent') -> None:
+        self.agent = agent
+
+    def __getitem__(self, state: str) -> Mapping:
+        row = self.agent.q_table.values[self.agent.states.ids[state]].tolist()
+        return MappingProxyType(dict(zip(self.agent.actions, row)))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.agent.states.ids)
+
+    def __len__(self) -> int:
+        return len(self.agent.states)
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        """Plain dict-of-dicts copy (the persisted format)."""
+        rows = self.agent.q_table.values[:len(self.agent.states)].tolist()
+        return {state: dict(zip(self.agent.actions, row)) for state, row in zip(self.agent.states.ids, rows)}
+
+class EvolutionHistory:
+    """
+    Columnar record of an evolution run: one NumPy array per field instead of one dict per step.
+    Wall-clock time is taken once per batch; ``batch_timestamps[i]`` applies to the steps from
+    ``batch_starts[i]`` up to the next batch start.
+    """
+    def __init__(self, capacity: int = 1024) -> None:
+        capacity = max(capacity, 1)
+        self.size = 0
+        self.state_ids = np.zeros(capacity, dtype=np.int64)
+        self.action_ids = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float64)
+        self.total_rewards = np.zeros(capacity, dtype=np.float64)
+        self.batch_starts: List[int] = []
+        self.batch_timestamps: List[float] = []
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, state_ids: np.ndarray, action_ids: np.ndarray, rewards: np.ndarray,
+               total_rewards: np.ndarray) -> None:
+        end = self.size + len(state_ids)
+        if end > len(self.state_ids):
+            capacity = max(end, 2 * len(self.state_ids))
+            for name in ('state_ids', 'action_ids', 'rewards', 'total_rewards'):
+                column = np.zeros(capacity, dtype=getattr(self, name).dtype)
+                column[:self.size] = getattr(self, name)[:self.size]
+                setattr(self, name, column)
+        self.state_ids[self.size:end] = state_ids
+        self.action_ids[self.size:end] = action_ids
+        self.rewards[self.size:end] = rewards
+        self.total_rewards[self.size:end] = total_rewards
+        self.batch_starts.append(self.size)
+        self.batch_timestamps.append(time.time())
+        self.size = end
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Recorded columns trimmed to the number of steps (views, not copies)."""
+        return {
+            'state_ids': self.state_ids[:self.size],
+            'action_ids': self.action_ids[:self.size],
+            'rewards': self.rewards[:self.size],
+            'total_rewards': self.total_rewards[:self.size]
+        }
+
+    def to_records(self, agent: 'CustomAgent') -> List[Dict]:
+        """Expand into the list-of-dicts format returned by ``CustomAgent.evolve``."""
+        state_keys = list(agent.states.ids)
+        batch_of_step = np.searchsorted(self.batch_starts, np.arange(self.size), side='right') - 1
+        timestamps = [datetime.fromtimestamp(t).isoformat() for t in self.batch_timestamps]
+        return [{
+            'state': state_keys[state_id],
+            'action': agent.actions[action_id],
+            'reward': reward,
+            'total_rewards': total_rewards,
+            'timestamp': timestamps[batch]
+        } for state_id, action_id, reward, total_rewards, batch in zip(
+            *(column.tolist() for column in self.columns().values()), batch_of_step.tolist())]
+
 class CustomAgent:
     """
     A custom AI agent designed for Web3 applications like Omelix AI.
     The agent learns and adapts based on user interactions and predefined behaviors.
     It can evolve over time through simulated reinforcement learning.
+
+    States are interned to integer ids and state-action values live in a NumPy Q-table, so
+    action selection and learning can run vectorized over whole state sequences. The
+    ``experience`` dict-of-dicts is still available as a read-only ``ExperienceView``.
     """
     def __init__(
         self,
@@ -49,8 +180,14 @@ class CustomAgent:
         self.learning_rate = learning_rate
         self.exploration_rate = exploration_rate
         self.config_path = config_path
+        self.journal_path = f"{os.path.splitext(config_path)[0]}.journal.jsonl"
+        self.actions: List[str] = []  # Q-table column order
+        self.action_ids: Dict[str, int] = {}
+        self.q_table = QTable(0)
+        self._sync_actions()
         self.experience = {}  # Store state-action-reward history
         self.current_state = None
+        self.current_state_id = None
         self.total_rewards = 0.0
         logger.info(f"Agent {self.agent_id} initialized with behaviors: {self.behaviors}")
 
@@ -67,6 +204,7 @@ class CustomAgent:
                     config = json.load(f)
                     if config.get('agent_id') == self.agent_id:
                         self.behaviors = config.get('behaviors', self.behaviors)
+                        self._sync_actions()
                         self.experience = config.get('experience', {})
                         self.total_rewards = config.get('total_rewards', 0.0)
                         logger.info(f"Loaded configuration for agent {self.agent_id} from {self.config_path}")
@@ -74,30 +212,121 @@ class CustomAgent:
                         logger.warning("Config file exists but agent ID does not match. Using default settings.")
             else:
                 logger.info(f"No config file found at {self.config_path}. Starting with default settings.")
+            self._replay_journal()
         except Exception as e:
             logger.error(f"Error loading config for agent {self.agent_id}: {str(e)}")
             logger.info("Proceeding with default settings.")
 
+    def _replay_journal(self) -> None:
+        """Apply checkpoints appended by ``append_checkpoint`` since the last full ``save_config``."""
+        if not os.path.exists(self.journal_path):
+            return
+        replayed = 0
+        with open(self.journal_path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Ignoring incomplete journal record in {self.journal_path}")
+                    break
+                if record.get('agent_id') != self.agent_id:
+                    continue
+                self.behaviors = record['behaviors']
+                self.total_rewards = record['total_rewards']
+                self._sync_actions()
+                action_ids = [self._register_action(action) for action in record['actions']]
+                state_ids = self.intern_states(list(record['experience']))
+                if len(state_ids):
+                    self.q_table.values[state_ids[:, np.newaxis], action_ids] = list(record['experience'].values())
+                replayed += 1
+        logger.info(f"Replayed {replayed} journal checkpoints for agent {self.agent_id} from {self.journal_path}")
+
+    def _register_action(self, action: str) -> int:
+        if action not in self.action_ids:
+            self.action_ids[action] = len(self.actions)
+            self.actions.append(action)
+            self.q_table.add_action()
+        return self.action_ids[action]
+
+    def _sync_actions(self) -> None:
+        for action in self.behaviors:
+            self._register_action(action)
+
+    @property
+    def experience(self) -> ExperienceView:
+        """Q-table as a read-only mapping keyed by ``str(state)`` and behavior name."""
+        return ExperienceView(self)
+
+    @experience.setter
+    def experience(self, experience: Dict[str, Dict[str, float]]) -> None:
+        self.states = StateInterner()
+        self.q_table = QTable(len(self.actions), len(experience))
+        for state, values in experience.items():
+            state_id = self.states.intern(state)
+            for action, value in values.items():
+                self.q_table.values[state_id, self._register_action(action)] = value
+
+    def intern_states(self, states: Sequence[Any]) -> np.ndarray:
+        """
+        Map a sequence of states to integer ids, adding Q-table rows for unseen states.
+
+        Args:
+            states (Sequence[Any]): States (e.g. user actions, blockchain events).
+
+        Returns:
+            np.ndarray: State id per input state.
+        """
+        state_ids = self.states.intern_many(states)
+        self.q_table.ensure(len(self.states))
+        return state_ids
+
     def save_config(self) -> None:
         """
         Save agent configuration and experience to a JSON file.
         """
         try:
-            pub total_supply: u64,
-}
             config = {
                 'agent_id': self.agent_id,
                 'behaviors': self.behaviors,
-                'experience': self.experience,
+                'experience': self.experience.to_dict(),
                 'total_rewards': self.total_rewards,
                 'timestamp': datetime.now().isoformat()
             }
             with open(self.config_path, 'w') as f:
                 json.dump(config, f, indent=2)
+            # The full config now supersedes any journaled checkpoints.
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            self.q_table.dirty[:] = False
             logger.info(f"Saved configuration for agent {self.agent_id} to {self.config_path}")
         except Exception as e:
             logger.error(f"Error saving config for agent {self.agent_id}: {str(e)}")
 
+    def append_checkpoint(self) -> None:
+        """
+        Append the Q-table rows changed since the last checkpoint, plus behaviors and total
+        rewards, as one JSON line to the journal. Unlike ``save_config`` this never rewrites
+        existing data; ``load_config`` replays the journal on top of the last full config.
+        """
+        try:
+            dirty = np.flatnonzero(self.q_table.dirty)
+            state_keys = list(self.states.ids)
+            record = {
+                'agent_id': self.agent_id,
+                'behaviors': self.behaviors,
+                'total_rewards': self.total_rewards,
+                'actions': self.actions,
+                'experience': dict(zip([state_keys[i] for i in dirty.tolist()],
+                                       self.q_table.values[dirty].tolist())),
+                'timestamp': datetime.now().isoformat()
+            }
+            with open(self.journal_path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+            self.q_table.dirty[:] = False
+            logger.debug(f"Appended checkpoint of {len(dirty)} states for agent {self.agent_id} to {self.journal_path}")
+        except Exception as e:
+            logger.error(f"Error appending checkpoint for agent {self.agent_id}: {str(e)}")
+
     def set_state(self, state: Any) -> None:
         """
         Update the current state of the agent based on environment or user input.
@@ -106,8 +335,11 @@ class CustomAgent:
             state (Any): The current state or context (e.g., user action, blockchain event).
         """
         self.current_state = str(state)  # Convert to string for consistency in dictionary keys
-        if self.current_state not in self.experience:
-            self.experience[self.current_state] = {b: 0.0 for b in self.behaviors.keys()}
+        num_states = len(self.states)
+        self.current_state_id = self.states.intern(self.current_state)
+        if len(self.states) > num_states:
+            self.q_table.ensure(len(self.states))
+            self.q_table.dirty[self.current_state_id] = True
         logger.debug(f"Agent {self.agent_id} state updated to: {self.current_state}")
 
     def choose_action(self) -> str:
@@ -119,18 +351,32 @@ class CustomAgent:
         """
         if self.current_state is None:
             logger.warning(f"Agent {self.agent_id} has no current state. Defaulting to random action.")
-            return random.choice(list(self.behaviors.keys()))
+            return random.choice(self.actions)
 
         # Epsilon-greedy: Explore with probability exploration_rate, otherwise exploit
         if random.random() < self.exploration_rate:
-            action = random.choice(list(self.behaviors.keys()))
+            action = random.choice(self.actions)
             logger.debug(f"Agent {self.agent_id} exploring: chose action {action}")
         else:
-            state_experience = self.experience.get(self.current_state, {b: 0.0 for b in self.behaviors.keys()})
-            action = max(state_experience, key=state_experience.get)
+            action = self.actions[int(self.q_table.values[self.current_state_id].argmax())]
             logger.debug(f"Agent {self.agent_id} exploiting: chose action {action} based on experience")
         return action
 
+    def choose_actions(self, state_ids: np.ndarray) -> np.ndarray:
+        """
+        Epsilon-greedy action selection for a batch of interned states.
+
+        Args:
+            state_ids (np.ndarray): State ids from ``intern_states``.
+
+        Returns:
+            np.ndarray: Selected action id (index into ``self.actions``) per state.
+        """
+        action_ids = self.q_table.values[state_ids].argmax(1)
+        explore = np.random.random(len(state_ids)) < self.exploration_rate
+        action_ids[explore] = np.random.randint(len(self.actions), size=int(explore.sum()))
+        return action_ids
+
     def perform_action(self, action: str) -> float:
         """
         Simulate performing the chosen action and return a reward.
@@ -153,6 +399,20 @@ class CustomAgent:
             logger.error(f"Error performing action {action} for agent {self.agent_id}: {str(e)}")
             return 0.0
 
+    def perform_actions(self, action_ids: np.ndarray) -> np.ndarray:
+        """
+        Vectorized ``perform_action``: simulated rewards for a batch of action ids, all computed
+        against the current behavior weights.
+
+        Args:
+            action_ids (np.ndarray): Action ids to perform.
+
+        Returns:
+            np.ndarray: Simulated reward per action.
+        """
+        weights = np.array([self.behaviors.get(action, 0.0) for action in self.actions])
+        return weights[action_ids] + np.random.uniform(-0.1, 0.1, size=len(action_ids))
+
     def update_learning(self, action: str, reward: float) -> None:
         """
         Update the agent's experience and behavior weights based on the reward received.
@@ -167,9 +427,11 @@ class CustomAgent:
                 return
 
             # Update experience for the state-action pair
-            current_value = self.experience[self.current_state].get(action, 0.0)
+            action_id = self._register_action(action)
+            current_value = float(self.q_table.values[self.current_state_id, action_id])
             new_value = current_value + self.learning_rate * (reward - current_value)
-            self.experience[self.current_state][action] = new_value
+            self.q_table.values[self.current_state_id, action_id] = new_value
+            self.q_table.dirty[self.current_state_id] = True
 
             # Update behavior weight based on reward
             self.behaviors[action] = self.behaviors.get(action, 0.0) + self.learning_rate * reward
@@ -179,13 +441,62 @@ class CustomAgent:
         except Exception as e:
             logger.error(f"Error updating learning for agent {self.agent_id}: {str(e)}")
 
-    def evolve(self, num_iterations: int = 10, state_sequence: Optional[List[Any]] = None) -> List[Dict]:
+    def update_learning_batch(self, state_ids: np.ndarray, action_ids: np.ndarray, rewards: np.ndarray) -> None:
+        """
+        Apply ``update_learning`` for a whole sequence of (state, action, reward) steps at once.
+
+        Repeated state-action pairs are folded in closed form, so the Q-table ends up exactly
+        where applying the steps one by one in order would leave it.
+
+        Args:
+            state_ids (np.ndarray): State id per step.
+            action_ids (np.ndarray): Action id per step.
+            rewards (np.ndarray): Reward per step.
+        """
+        rewards = np.asarray(rewards, dtype=np.float64)
+        if len(rewards) == 0:
+            return
+        decay = 1.0 - self.learning_rate
+        keys = np.asarray(state_ids, dtype=np.int64) * len(self.actions) + action_ids
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        counts = np.diff(np.r_[starts, len(keys)])
+        groups = np.repeat(np.arange(len(starts)), counts)
+        # A reward seen k steps before the last update of its pair is discounted by decay ** k.
+        steps_after = np.repeat(starts + counts - 1, counts) - np.arange(len(keys))
+        increments = np.bincount(groups, weights=self.learning_rate * decay ** steps_after * rewards[order])
+        flat_values = self.q_table.values.reshape(-1)
+        unique_keys = sorted_keys[starts]
+        flat_values[unique_keys] = decay ** counts * flat_values[unique_keys] + increments
+
+        reward_sums = np.bincount(action_ids, weights=rewards, minlength=len(self.actions))
+        for action, reward_sum in zip(self.actions, reward_sums.tolist()):
+            if reward_sum:
+                self.behaviors[action] = self.behaviors.get(action, 0.0) + self.learning_rate * reward_sum
+        self.total_rewards += float(rewards.sum())
+
+    def _evolve_batch(self, state_ids: np.ndarray):
+        """Choose, perform and learn from one batch of interned states; returns the per-step columns."""
+        action_ids = self.choose_actions(state_ids)
+        rewards = self.perform_actions(action_ids)
+        cumulative_rewards = self.total_rewards + np.cumsum(rewards)
+        self.update_learning_batch(state_ids, action_ids, rewards)
+        self.q_table.dirty[state_ids] = True
+        return state_ids, action_ids, rewards, cumulative_rewards
+
+    def evolve(self, num_iterations: int = 10, state_sequence: Optional[List[Any]] = None,
+               batch_size: int = 1) -> List[Dict]:
         """
         Simulate the agent's evolution over a number of iterations or state sequence.
         
         Args:
             num_iterations (int): Number of iterations to run if no state sequence is provided.
             state_sequence (Optional[List[Any]]): List of states to process (e.g., user actions).
+            batch_size (int): Steps chosen, rewarded and learned together. The default of 1 is
+                strictly step-by-step and runs through the scalar ``set_state``/``update_learning``
+                path; with larger batches (opt-in, for speed) actions use the Q-values and
+                rewards use the behavior weights from the start of their batch.
         
         Returns:
             List[Dict]: History of actions and rewards for analysis.
@@ -194,24 +505,91 @@ class CustomAgent:
         iterations = state_sequence if state_sequence else [f"state_{i}" for i in range(num_iterations)]
 
         try:
-            for state in iterations:
-                self.set_state(state)
-                action = self.choose_action()
-                reward = self.perform_action(action)
-                self.update_learning(action, reward)
-                history.append({
-                    'state': state,
-                    'action': action,
-                    'reward': reward,
-                    'total_rewards': self.total_rewards,
-                    'timestamp': datetime.now().isoformat()
-                })
-                logger.info(f"Iteration complete for agent {self.agent_id}: State={state}, Action={action}, Reward={reward:.2f}")
+            if batch_size <= 1:
+                # Single steps are cheaper through the scalar API than through one-row arrays.
+                for state in iterations:
+                    self.set_state(state)
+                    action = self.choose_action()
+                    reward = self.perform_action(action)
+                    self.update_learning(action, reward)
+                    history.append({
+                        'state': state,
+                        'action': action,
+                        'reward': reward,
+                        'total_rewards': self.total_rewards,
+                        'timestamp': datetime.now().isoformat()
+                    })
+                    logger.info(f"Iteration complete for agent {self.agent_id}: State={state}, Action={action}, Reward={reward:.2f}")
+            else:
+                for start in range(0, len(iterations), batch_size):
+                    states = iterations[start:start + batch_size]
+                    state_ids, action_ids, rewards, cumulative_rewards = self._evolve_batch(self.intern_states(states))
+                    for state, action_id, reward, total_rewards in zip(states, action_ids.tolist(), rewards.tolist(),
+                                                                       cumulative_rewards.tolist()):
+                        action = self.actions[action_id]
+                        history.append({
+                            'state': state,
+                            'action': action,
+                            'reward': reward,
+                            'total_rewards': total_rewards,
+                            'timestamp': datetime.now().isoformat()
+                        })
+                        logger.info(f"Iteration complete for agent {self.agent_id}: State={state}, Action={action}, Reward={reward:.2f}")
+                if iterations:
+                    self.set_state(iterations[-1])
             self.save_config()  # Save progress after evolution
         except Exception as e:
             logger.error(f"Error during evolution of agent {self.agent_id}: {str(e)}")
         return history
 
+    def evolve_batched(self, num_iterations: int = 10, state_sequence: Optional[Sequence[Any]] = None,
+                       batch_size: int = 65536, checkpoint_every: Optional[int] = 16,
+                       state_ids: Optional[np.ndarray] = None, persist: bool = True) -> EvolutionHistory:
+        """
+        High-throughput variant of ``evolve`` for long simulations.
+
+        Nothing is logged or serialized per step: history is recorded column-wise with one
+        timestamp per batch, and progress is persisted by appending a journal checkpoint
+        (changed rows only) every ``checkpoint_every`` batches and at the end, instead of
+        rewriting the full config.
+
+        Args:
+            num_iterations (int): Number of iterations to run if no state sequence is provided.
+            state_sequence (Optional[Sequence[Any]]): States to process (e.g., user actions).
+            batch_size (int): Steps chosen, rewarded and learned together (see ``evolve``).
+            checkpoint_every (Optional[int]): Batches between journal checkpoints; None only
+                checkpoints at the end.
+            state_ids (Optional[np.ndarray]): States already mapped with ``intern_states``; when
+                given, they are used instead of ``state_sequence`` and skip interning.
+            persist (bool): Whether to append journal checkpoints at all (False for throwaway runs).
+
+        Returns:
+            EvolutionHistory: Columnar history; ``to_records`` gives the ``evolve`` format.
+        """
+        history = EvolutionHistory(0)
+        started = time.perf_counter()
+        try:
+            if state_ids is None:
+                iterations = state_sequence if state_sequence is not None and len(state_sequence) > 0 \
+                    else [f"state_{i}" for i in range(num_iterations)]
+                state_ids = self.intern_states(iterations)
+            history = EvolutionHistory(len(state_ids))
+            for batch_index, start in enumerate(range(0, len(state_ids), batch_size), 1):
+                history.append(*self._evolve_batch(state_ids[start:start + batch_size]))
+                if persist and checkpoint_every and batch_index % checkpoint_every == 0:
+                    self.append_checkpoint()
+            if len(state_ids):
+                self.current_state_id = int(state_ids[-1])
+                self.current_state = list(self.states.ids)[self.current_state_id]
+            if persist:
+                self.append_checkpoint()
+            elapsed = time.perf_counter() - started
+            logger.info(f"Agent {self.agent_id} evolved {len(history)} steps in {elapsed:.2f}s, "
+                        f"total rewards {self.total_rewards:.2f}")
+        except Exception as e:
+            logger.error(f"Error during batched evolution of agent {self.agent_id}: {str(e)}")
+        return history
+
     def get_summary(self) -> Dict:
         """
         Get a summary of the agent's current status and performance.
@@ -225,7 +603,7 @@ class CustomAgent:
             'total_rewards': self.total_rewards,
             'exploration_rate': self.exploration_rate,
             'learning_rate': self.learning_rate,
-            'experience_states': len(self.experience)
+            'experience_states': len(self.states)
         }
 
 
@@ -0,0 +1,246 @@
+# population.py
+# Example of simulating a marketplace population of CustomAgent instances across CPU cores
+
+import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import json
+import logging
+import os
+import tempfile
+import time
+import zlib
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+from custom_agent import CustomAgent, StateInterner
+
+logger = logging.getLogger(__name__)
+
+def shard_of(agent_id: str, num_shards: int) -> int:
+    """
+    Stable shard for an agent: crc32 of its id, so placement does not depend on list order or
+    on the per-process string hash seed.
+    """
+    return zlib.crc32(agent_id.encode('utf-8')) % num_shards
+
+def _create_shared(shape: Tuple[int, ...], dtype) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    dtype = np.dtype(dtype)
+    shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+def _attach_shared(spec: Tuple[str, Tuple[int, ...], str]) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+def agent_seed(agent_id: str, seed: int) -> int:
+    """Seed of an agent's NumPy random stream: depends only on the base seed and the agent id."""
+    return (seed + zlib.crc32(agent_id.encode('utf-8'))) % 2**32
+
+def _run_shard(rows: List[Tuple[int, str]], behaviors: Dict[str, float], learning_rate: float,
+               exploration_rate: float, vocabulary: List[str], specs: Dict[str, Tuple], batch_size: int,
+               config_dir: Optional[str], seed: int,
+               log_level: int) -> Tuple[float, List[Tuple[int, np.ndarray, np.ndarray]]]:
+    """
+    Evolve one shard of agents over the shared state sequence and write each agent's behaviors
+    and total rewards into its row of the shared result arrays.
+
+    Returns:
+        Tuple of the seconds spent evolving the shard and, per agent, its row plus the
+        vocabulary ids and Q-value rows of the states it learned something about.
+    """
+    logging.getLogger('custom_agent').setLevel(log_level)
+    attached = {key: _attach_shared(spec) for key, spec in specs.items()}
+    handles = [shm for shm, _ in attached.values()]
+    sequence = attached['sequence'][1]
+    behavior_out, reward_out = (attached[key][1] for key in ('behaviors', 'total_rewards'))
+    del attached
+    actions = list(behaviors)
+    experience = []
+    started = time.perf_counter()
+    try:
+        with tempfile.TemporaryDirectory() as scratch_dir:
+            for row, agent_id in rows:
+                np.random.seed(agent_seed(agent_id, seed))
+                agent = CustomAgent(agent_id, dict(behaviors), learning_rate, exploration_rate,
+                                    config_path=os.path.join(config_dir or scratch_dir, f"{agent_id}.json"))
+                vocabulary_ids = agent.intern_states(vocabulary)
+                agent.evolve_batched(state_ids=vocabulary_ids[sequence], batch_size=batch_size,
+                                     persist=config_dir is not None)
+                columns = [agent.action_ids[action] for action in actions]
+                behavior_out[row] = [agent.behaviors[action] for action in actions]
+                reward_out[row] = agent.total_rewards
+                values = agent.q_table.values[vocabulary_ids][:, columns]
+                learned = np.flatnonzero(values.any(axis=1))
+                experience.append((row, learned, values[learned]))
+    finally:
+        # Views must be released before the blocks can be closed.
+        del sequence, behavior_out, reward_out
+        for shm in handles:
+            shm.close()
+    return time.perf_counter() - started, experience
+
+class Population:
+    """
+    Runs ``CustomAgent.evolve`` for many agents in parallel across a process pool.
+
+    Agents are sharded by ``crc32(agent_id)``, so an agent always lands on the same shard for
+    a given worker count. The state sequence is interned once in the parent and shared with
+    every worker as an id array; workers write each agent's learned behaviors and total
+    rewards straight into shared-memory result arrays. Experience comes back sparse: per agent,
+    only the Q-value rows of the states it learned something about, concatenated in CSR style
+    (``experience_offsets`` into ``experience_state_ids`` and ``experience_values``) so memory
+    grows with what agents learned rather than agents x vocabulary.
+    """
+    def __init__(
+        self,
+        agent_ids: Sequence[str],
+        behaviors: Dict[str, float],
+        learning_rate: float = 0.1,
+        exploration_rate: float = 0.2,
+        num_workers: Optional[int] = None,
+        config_dir: Optional[str] = None,
+        context: Optional[str] = None,
+        seed: int = 0
+    ) -> None:
+        """
+        Initialize the population.
+
+        Args:
+            agent_ids (Sequence[str]): Unique agent identifiers.
+            behaviors (Dict[str, float]): Initial behavior weights shared by every agent.
+            learning_rate (float): Learning rate of every agent.
+            exploration_rate (float): Exploration rate of every agent.
+            num_workers (Optional[int]): Worker processes (and shards); defaults to the CPU count.
+            config_dir (Optional[str]): Directory for per-agent configs and journals. Agents resume
+                from and checkpoint to ``<config_dir>/<agent_id>.json``; None runs without persistence.
+            context (Optional[str]): Multiprocessing start method.
+            seed (int): Base seed; each agent's random stream depends only on it and the agent id.
+        """
+        if len(set(agent_ids)) != len(agent_ids):
+            raise ValueError("Agent IDs must be unique")
+        self.agent_ids = list(agent_ids)
+        self.behaviors = dict(behaviors)
+        self.actions = list(self.behaviors)
+        self.learning_rate = learning_rate
+        self.exploration_rate = exploration_rate
+        self.num_workers = max(1, num_workers or mp.cpu_count())
+        self.config_dir = config_dir
+        self.ctx = mp.get_context(context)
+        self.seed = seed
+        if config_dir:
+            os.makedirs(config_dir, exist_ok=True)
+
+    def shards(self) -> List[List[Tuple[int, str]]]:
+        """(row, agent_id) pairs per shard."""
+        shards: List[List[Tuple[int, str]]] = [[] for _ in range(self.num_workers)]
+        for row, agent_id in enumerate(self.agent_ids):
+            shards[shard_of(agent_id, self.num_workers)].append((row, agent_id))
+        return shards
+
+    def run(self, num_iterations: int = 10, state_sequence: Optional[Sequence[Any]] = None,
+            batch_size: int = 65536, log_level: int = logging.WARNING) -> Dict[str, Any]:
+        """
+        Evolve every agent over the same state sequence.
+
+        Args:
+            num_iterations (int): Number of iterations to run if no state sequence is provided.
+            state_sequence (Optional[Sequence[Any]]): States every agent processes in order.
+            batch_size (int): Steps per vectorized batch inside each agent.
+            log_level (int): Log level for agent loggers in the workers.
+
+        Returns:
+            Dict: ``agent_ids``, ``actions`` and ``states`` (the interned vocabulary) label the
+            result arrays ``behaviors`` (agents x actions) and ``total_rewards`` (agents). Agent
+            ``i``'s Q-value rows are ``experience_values[experience_offsets[i]:experience_offsets[i + 1]]``
+            (rows x actions) for the states ``experience_state_ids`` over the same range (indices
+            into ``states``); ``experience_of`` turns them into a dict. ``seconds`` is the
+            wall-clock time and ``shard_seconds`` the busy time per shard.
+        """
+        iterations = state_sequence if state_sequence is not None and len(state_sequence) > 0 \
+            else [f"state_{i}" for i in range(num_iterations)]
+        interner = StateInterner()
+        sequence_ids = interner.intern_many(iterations)
+        vocabulary = list(interner.ids)
+
+        shapes = {
+            'sequence': ((len(sequence_ids),), np.int64),
+            'behaviors': ((len(self.agent_ids), len(self.actions)), np.float64),
+            'total_rewards': ((len(self.agent_ids),), np.float64),
+        }
+        created = {key: _create_shared(shape, dtype) for key, (shape, dtype) in shapes.items()}
+        handles = [shm for shm, _ in created.values()]
+        arrays = {key: array for key, (_, array) in created.items()}
+        del created
+        try:
+            arrays['sequence'][:] = sequence_ids
+            specs = {key: (handles[i].name, array.shape, array.dtype.str) for i, (key, array) in enumerate(arrays.items())}
+            tasks = [(rows, self.behaviors, self.learning_rate, self.exploration_rate, vocabulary, specs,
+                      batch_size, self.config_dir, self.seed, log_level) for rows in self.shards() if rows]
+            started = time.perf_counter()
+            with self.ctx.Pool(processes=min(self.num_workers, max(len(tasks), 1))) as pool:
+                shard_results = pool.starmap(_run_shard, tasks)
+            elapsed = time.perf_counter() - started
+            results = {key: arrays[key].copy() for key in ('behaviors', 'total_rewards')}
+        finally:
+            del arrays
+            for shm in handles:
+                shm.close()
+                shm.unlink()
+
+        logger.info(f"Evolved {len(self.agent_ids)} agents x {len(sequence_ids)} steps on "
+                    f"{self.num_workers} workers in {elapsed:.2f}s")
+        shard_seconds = [seconds for seconds, _ in shard_results]
+        experience = sorted((entry for _, entries in shard_results for entry in entries), key=lambda entry: entry[0])
+        del shard_results
+        counts = np.zeros(len(self.agent_ids) + 1, dtype=np.int64)
+        counts[1:][[row for row, _, _ in experience]] = [len(state_ids) for _, state_ids, _ in experience]
+        results.update({
+            'experience_offsets': np.cumsum(counts),
+            'experience_state_ids': np.concatenate([state_ids for _, state_ids, _ in experience]
+                                                   or [np.zeros(0, dtype=np.int64)]),
+            'experience_values': np.concatenate([values for _, _, values in experience]
+                                                or [np.zeros((0, len(self.actions)))]),
+            'agent_ids': self.agent_ids,
+            'actions': self.actions,
+            'states': vocabulary,
+            'seconds': elapsed,
+            'shard_seconds': shard_seconds
+        })
+        return results
+
+    @staticmethod
+    def experience_of(results: Dict[str, Any], index: int) -> Dict[str, Dict[str, float]]:
+        """Agent ``index``'s learned Q-values from ``run`` results, in the ``experience`` dict format."""
+        start, end = results['experience_offsets'][index:index + 2]
+        states = [results['states'][i] for i in results['experience_state_ids'][start:end].tolist()]
+        return {state: dict(zip(results['actions'], row))
+                for state, row in zip(states, results['experience_values'][start:end].tolist())}
+
+
+def main():
+    """
+    Main function to demonstrate a small marketplace population.
+    """
+    try:
+        initial_behaviors = {
+            'stake_tokens': 0.5,
+            'claim_rewards': 0.3,
+            'analyze_data': 0.2,
+            'idle': 0.1
+        }
+        state_sequence = ["user_login", "wallet_connected", "low_balance", "high_activity", "transaction_failed"] * 200
+        population = Population([f"ontora_agent_{i:04d}" for i in range(1000)], initial_behaviors, num_workers=4)
+        results = population.run(state_sequence=state_sequence)
+
+        best = int(np.argmax(results['total_rewards']))
+        print(f"Evolved {len(results['agent_ids'])} agents in {results['seconds']:.2f}s")
+        print(f"Best agent: {results['agent_ids'][best]} with total rewards {results['total_rewards'][best]:.2f}")
+        print(json.dumps(dict(zip(results['actions'], results['behaviors'][best].tolist())), indent=2))
+    except Exception as e:
+        logger.error(f"Error in main execution: {str(e)}")
+        print(f"An error occurred: {str(e)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import unittest
+import logging
+from functools import partial
+import torch
+import torch.multiprocessing as mp
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'ai', 'models')))
+from agent_model import AgentConfig, AgentNetwork
+from actor_learner import ApeXTrainer, SharedWeights, actor_epsilons
+from vector_env import MockWeb3Env
+
+
+class TestActorLearner(unittest.TestCase):
+    def setUp(self):
+        self.config = AgentConfig({'state_dim': 4, 'action_dim': 2, 'hidden_dim': 8,
+                                   'memory_size': 1000, 'batch_size': 8})
+        self.config.device = torch.device('cpu')
+
+    def test_actor_epsilons_decrease(self):
+        epsilons = actor_epsilons(4)
+        self.assertAlmostEqual(epsilons[0], 0.4)
+        self.assertTrue(all(a > b for a, b in zip(epsilons, epsilons[1:])))
+        self.assertEqual(actor_epsilons(1), [0.4])
+
+    def test_shared_weights_publish_and_pull(self):
+        weights = SharedWeights(mp.get_context(), self.config)
+        source = AgentNetwork(4, 2, 8)
+        weights.publish(source)
+        target = AgentNetwork(4, 2, 8)
+        version = weights.pull(target)
+        self.assertEqual(version, 1)
+        for a, b in zip(source.parameters(), target.parameters()):
+            self.assertTrue(torch.equal(a, b))
+
+    def test_short_run_reports_throughput(self):
+        logging.getLogger('agent_model').setLevel(logging.WARNING)
+        trainer = ApeXTrainer(self.config, partial(MockWeb3Env, state_dim=4), num_actors=2,
+                              chunk_size=16, publish_every=5)
+        stats = trainer.run(duration=3.0)
+        self.assertEqual(len(stats['actor_frames']), 2)
+        self.assertGreater(sum(stats['actor_frames']), 0)
+        self.assertGreater(stats['learner_transitions'], 0)
+        self.assertGreater(stats['weight_version'], 0)
+        self.assertGreater(max(stats['actor_weight_versions']), 0)
+        self.assertGreater(stats['total_actor_fps'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
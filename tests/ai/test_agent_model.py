@@ -0,0 +1,306 @@
+import unittest
+import numpy as np
+import pytest
+import torch
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'ai', 'models')))
+from agent_model import (AgentConfig, AgentNetwork, BatchStaging, ReplayMemory, PrioritizedReplayMemory, SumTree, MinTree,
+                         NStepAccumulator, OntoraAgent)
+
+
+class TestReplayMemory(unittest.TestCase):
+    def setUp(self):
+        self.memory = ReplayMemory(capacity=8, state_dim=3)
+
+    def test_push_and_len(self):
+        for i in range(5):
+            self.memory.push(np.full(3, i), i % 2, float(i), np.full(3, i + 1), i == 4)
+        self.assertEqual(len(self.memory), 5)
+        np.testing.assert_array_equal(self.memory.states[4], np.full(3, 4.0))
+        self.assertEqual(self.memory.dones[4], 1.0)
+
+    def test_ring_buffer_overwrites_oldest(self):
+        for i in range(11):
+            self.memory.push(np.full(3, i), 0, float(i), np.full(3, i), False)
+        self.assertEqual(len(self.memory), 8)
+        self.assertEqual(self.memory.position, 3)
+        np.testing.assert_array_equal(self.memory.rewards[:3], [8.0, 9.0, 10.0])
+
+    def test_push_batch_wraps_around(self):
+        for i in range(6):
+            self.memory.push(np.full(3, i), 0, float(i), np.full(3, i), False)
+        count = 5
+        indices = self.memory.push_batch(np.full((count, 3), 9.0), np.ones(count), np.arange(count),
+                                         np.zeros((count, 3)), np.ones(count))
+        np.testing.assert_array_equal(indices, [6, 7, 0, 1, 2])
+        self.assertEqual(len(self.memory), 8)
+        self.assertEqual(self.memory.position, 3)
+        np.testing.assert_array_equal(self.memory.rewards, [2, 3, 4, 3, 4, 5, 0, 1])
+
+    def test_push_batch_larger_than_capacity(self):
+        rewards = np.arange(20, dtype=np.float32)
+        self.memory.push_batch(np.zeros((20, 3)), np.zeros(20), rewards, np.zeros((20, 3)), np.zeros(20))
+        self.assertEqual(len(self.memory), 8)
+        self.assertEqual(sorted(self.memory.rewards.tolist()), list(range(12, 20)))
+        self.assertEqual(self.memory.position, 4)
+
+    def test_state_dim_is_inferred_on_first_push(self):
+        memory = ReplayMemory(capacity=4)
+        memory.push(np.zeros(5), 0, 1.0, np.ones(5), False)
+        self.assertEqual(memory.states.shape, (4, 5))
+        memory = ReplayMemory(capacity=4)
+        memory.push_batch(np.zeros((2, 3)), np.zeros(2), np.zeros(2), np.zeros((2, 3)), np.zeros(2))
+        self.assertEqual(memory.next_states.shape, (4, 3))
+
+    def test_sample_indices_are_distinct(self):
+        memory = ReplayMemory(capacity=1000, state_dim=1)
+        memory.push_batch(np.zeros((1000, 1)), np.zeros(1000), np.zeros(1000), np.zeros((1000, 1)), np.zeros(1000))
+        for batch_size in (32, 400, 1000):
+            indices = memory.sample_indices(batch_size)
+            self.assertEqual(len(np.unique(indices)), batch_size)
+            self.assertTrue(((indices >= 0) & (indices < 1000)).all())
+        with self.assertRaises(ValueError):
+            memory.sample_indices(1001)
+
+    def test_sample_returns_batch_tensors(self):
+        for i in range(8):
+            self.memory.push(np.full(3, i), i % 4, float(i), np.full(3, i + 1), False)
+        state, action, reward, next_state, done, exponent = self.memory.sample(4)
+        self.assertEqual(state.shape, (4, 3))
+        self.assertEqual(next_state.shape, (4, 3))
+        self.assertEqual(action.dtype, torch.int64)
+        self.assertEqual(reward.dtype, torch.float32)
+        self.assertEqual(done.shape, (4,))
+        torch.testing.assert_close(exponent, torch.ones(4))
+        # Every sampled row must be a consistent transition
+        torch.testing.assert_close(next_state[:, 0], state[:, 0] + 1)
+        torch.testing.assert_close(reward, state[:, 0])
+
+
+class TestAgentNetwork(unittest.TestCase):
+    def test_dueling_head_combines_value_and_advantage(self):
+        net = AgentNetwork(state_dim=4, action_dim=3, hidden_dim=8, dueling=True)
+        states = torch.randn(5, 4)
+        q_values = net(states)
+        self.assertEqual(q_values.shape, (5, 3))
+        hidden = net.relu(net.layer2(net.relu(net.layer1(states))))
+        torch.testing.assert_close(q_values.mean(dim=1), net.value(hidden).squeeze(1))
+
+
+class TestBatchStaging(unittest.TestCase):
+    def test_gather_reuses_buffers_per_batch_size(self):
+        source = np.arange(20, dtype=np.float32).reshape(10, 2)
+        staging = BatchStaging([source], torch.device('cpu'))
+        first, = staging.gather(np.array([1, 3, 5]))
+        np.testing.assert_array_equal(first.numpy(), source[[1, 3, 5]])
+        second, = staging.gather(np.array([0, 0, 9]))
+        self.assertEqual(first.data_ptr(), second.data_ptr())
+        np.testing.assert_array_equal(second.numpy(), source[[0, 0, 9]])
+        third, = staging.gather(np.array([2]))
+        self.assertNotEqual(third.data_ptr(), second.data_ptr())
+
+    def test_out_of_range_indices_raise(self):
+        staging = BatchStaging([np.zeros((4, 2), dtype=np.float32)], torch.device('cpu'))
+        with self.assertRaises(IndexError):
+            staging.gather(np.array([0, 4]))
+
+
+class TestSegmentTrees(unittest.TestCase):
+    def test_sum_tree_totals_and_prefix_lookup(self):
+        tree = SumTree(5)
+        tree.update(np.arange(5), np.array([1.0, 2.0, 3.0, 4.0, 0.0]))
+        self.assertAlmostEqual(tree.total(), 10.0)
+        indices = tree.find_prefixsum_idx(np.array([0.5, 1.0, 2.9, 3.1, 9.9]))
+        np.testing.assert_array_equal(indices, [0, 1, 1, 2, 3])
+
+    def test_batched_update_with_duplicates(self):
+        tree = SumTree(4)
+        tree.update(np.array([0, 1, 2, 3]), np.ones(4))
+        tree.update(np.array([2, 2, 3]), np.array([5.0, 5.0, 0.5]))
+        self.assertAlmostEqual(tree.total(), 7.5)
+
+    def test_min_tree(self):
+        tree = MinTree(3)
+        tree.update(np.arange(3), np.array([0.7, 0.2, 0.9]))
+        self.assertAlmostEqual(tree.min(), 0.2)
+
+
+class TestPrioritizedReplayMemory(unittest.TestCase):
+    def setUp(self):
+        self.memory = PrioritizedReplayMemory(capacity=16, state_dim=2, alpha=1.0, eps=0.0)
+        for i in range(16):
+            self.memory.push(np.full(2, i), 0, float(i), np.full(2, i), False)
+
+    def test_sample_returns_weights_and_indices(self):
+        batch = self.memory.sample(8, beta=0.5)
+        self.assertEqual(len(batch), 8)
+        weights, indices = batch[6], batch[7]
+        self.assertEqual(weights.shape, (8,))
+        self.assertTrue(torch.all(weights <= 1.0 + 1e-6))
+        torch.testing.assert_close(batch[2], torch.from_numpy(indices.astype(np.float32)))
+
+    def test_sampling_follows_priorities(self):
+        priorities = np.zeros(16)
+        priorities[3] = 1.0
+        self.memory.update_priorities(np.arange(16), priorities)
+        indices = self.memory.sample_indices(32)
+        self.assertTrue(np.all(indices == 3))
+
+
+class TestNStepAccumulator(unittest.TestCase):
+    def setUp(self):
+        self.acc = NStepAccumulator(n_step=3, gamma=0.5, state_dim=1)
+
+    def step(self, env_id, t, reward, done=False):
+        return self.acc.append(np.array([env_id]), np.array([[t]]), np.array([t]), np.array([reward]),
+                               np.array([[t + 1]]), np.array([done]))
+
+    def test_emits_after_n_steps(self):
+        self.assertEqual(len(self.step(0, 0, 1.0)[0]), 0)
+        self.assertEqual(len(self.step(0, 1, 2.0)[0]), 0)
+        states, actions, rewards, next_states, dones, n_steps = self.step(0, 2, 4.0)
+        np.testing.assert_array_equal(states, [[0]])
+        np.testing.assert_allclose(rewards, [1.0 + 0.5 * 2.0 + 0.25 * 4.0])
+        np.testing.assert_array_equal(next_states, [[3]])
+        np.testing.assert_array_equal(dones, [0.0])
+        np.testing.assert_array_equal(n_steps, [3])
+
+    def test_flushes_on_done(self):
+        self.step(0, 0, 1.0)
+        self.step(0, 1, 2.0)
+        self.step(0, 2, 4.0)
+        states, actions, rewards, next_states, dones, n_steps = self.step(0, 3, 8.0, done=True)
+        np.testing.assert_array_equal(actions, [1, 2, 3])
+        np.testing.assert_allclose(rewards, [2.0 + 2.0 + 2.0, 4.0 + 4.0, 8.0])
+        np.testing.assert_array_equal(next_states, [[4], [4], [4]])
+        np.testing.assert_array_equal(dones, [1.0, 1.0, 1.0])
+        np.testing.assert_array_equal(n_steps, [3, 2, 1])
+        self.assertEqual(len(self.step(0, 10, 1.0)[0]), 0)
+
+    def test_environments_are_independent(self):
+        self.step(0, 0, 1.0)
+        result = self.acc.append(np.array([0, 1]), np.array([[1], [5]]), np.array([1, 5]), np.array([1.0, 1.0]),
+                                 np.array([[2], [6]]), np.array([False, True]))
+        np.testing.assert_array_equal(result[0], [[5]])
+        np.testing.assert_array_equal(result[5], [1])
+        np.testing.assert_array_equal(self.acc.lengths, [2, 0])
+
+
+class TestOntoraAgent(unittest.TestCase):
+    def setUp(self):
+        self.config = AgentConfig({'state_dim': 4, 'action_dim': 2, 'hidden_dim': 16,
+                                   'memory_size': 100, 'batch_size': 8})
+        self.config.device = torch.device('cpu')
+        self.agent = OntoraAgent(self.config)
+
+    def test_optimize_model_updates_policy(self):
+        for _ in range(16):
+            self.agent.store_transition(np.random.randn(4), np.random.randint(2), 1.0,
+                                        np.random.randn(4), False)
+        before = [p.clone() for p in self.agent.policy_net.parameters()]
+        self.agent.optimize_model()
+        after = list(self.agent.policy_net.parameters())
+        self.assertTrue(any(not torch.equal(b, a) for b, a in zip(before, after)))
+
+    def test_prioritized_replay_updates_priorities(self):
+        config = AgentConfig({'state_dim': 4, 'action_dim': 2, 'hidden_dim': 16, 'memory_size': 100,
+                              'batch_size': 8, 'replay_mode': 'prioritized'})
+        config.device = torch.device('cpu')
+        agent = OntoraAgent(config)
+        for _ in range(16):
+            agent.store_transition(np.random.randn(4), np.random.randint(2), 1.0, np.random.randn(4), False)
+        initial_total = agent.memory.sum_tree.total()
+        agent.optimize_model()
+        self.assertNotAlmostEqual(agent.memory.sum_tree.total(), initial_total)
+
+    def test_double_dueling_optimize_step(self):
+        config = AgentConfig({'state_dim': 4, 'action_dim': 2, 'hidden_dim': 16, 'memory_size': 100,
+                              'batch_size': 8, 'double_dqn': True, 'dueling': True})
+        config.device = torch.device('cpu')
+        agent = OntoraAgent(config)
+        for _ in range(16):
+            agent.store_transition(np.random.randn(4), np.random.randint(2), 1.0, np.random.randn(4), False)
+        before = [p.clone() for p in agent.policy_net.parameters()]
+        agent.optimize_model()
+        self.assertTrue(any(not torch.equal(b, a) for b, a in zip(before, agent.policy_net.parameters())))
+
+    def test_soft_target_update(self):
+        target_before = [p.clone() for p in self.agent.target_net.parameters()]
+        with torch.no_grad():
+            for p in self.agent.policy_net.parameters():
+                p.add_(1.0)
+        self.agent.update_target_network(tau=0.25)
+        for before, target, policy in zip(target_before, self.agent.target_net.parameters(),
+                                          self.agent.policy_net.parameters()):
+            torch.testing.assert_close(target, before + 0.25 * (policy - before))
+        self.agent.update_target_network()
+        for target, policy in zip(self.agent.target_net.parameters(), self.agent.policy_net.parameters()):
+            self.assertTrue(torch.equal(target, policy))
+
+    def test_n_step_transitions_reach_memory(self):
+        config = AgentConfig({'state_dim': 4, 'action_dim': 2, 'hidden_dim': 16, 'memory_size': 100,
+                              'batch_size': 2, 'n_step': 3, 'gamma': 0.9})
+        config.device = torch.device('cpu')
+        agent = OntoraAgent(config)
+        for t in range(4):
+            agent.store_transition(np.full(4, t), 0, 1.0, np.full(4, t + 1), False)
+        self.assertEqual(len(agent.memory), 2)
+        np.testing.assert_allclose(agent.memory.rewards[:2], [1 + 0.9 + 0.81] * 2, rtol=1e-6)
+        np.testing.assert_array_equal(agent.memory.discount_exponents[:2], [3, 3])
+        agent.optimize_model()
+
+    def test_unknown_replay_mode(self):
+        config = AgentConfig({'replay_mode': 'bogus'})
+        with self.assertRaises(ValueError):
+            OntoraAgent(config)
+
+    def test_select_actions_batch(self):
+        states = np.random.randn(32, 4)
+        actions = self.agent.select_actions(states)
+        self.assertEqual(actions.shape, (32,))
+        self.assertTrue(np.all((actions >= 0) & (actions < 2)))
+        np.testing.assert_array_equal(self.agent.env_frame_idx, np.ones(32))
+        self.assertEqual(self.agent.frame_idx, 32)
+
+    def test_select_actions_greedy_matches_policy(self):
+        self.agent.config.epsilon_start = 0.0
+        self.agent.config.epsilon_end = 0.0
+        states = np.random.randn(16, 4).astype(np.float32)
+        actions = self.agent.select_actions(states)
+        with torch.no_grad():
+            expected = self.agent.policy_net(torch.from_numpy(states)).argmax(1).numpy()
+        np.testing.assert_array_equal(actions, expected)
+
+    def test_select_actions_per_env_schedule(self):
+        self.agent.select_actions(np.random.randn(3, 4))
+        self.agent.select_actions(np.random.randn(1, 4), env_ids=np.array([5]))
+        np.testing.assert_array_equal(self.agent.env_frame_idx, [1, 1, 1, 0, 0, 1])
+
+    def test_predict_behaviors_batch(self):
+        states = np.random.randn(5, 4)
+        probs = self.agent.predict_behaviors(states)
+        self.assertEqual(probs.shape, (5, 2))
+        np.testing.assert_allclose(probs.sum(axis=1), np.ones(5), rtol=1e-5)
+        single = self.agent.predict_behavior(states[0])
+        self.assertAlmostEqual(single['action_0'], probs[0, 0], places=5)
+
+    def test_optimize_model_waits_for_batch(self):
+        self.agent.store_transition(np.zeros(4), 0, 0.0, np.zeros(4), True)
+        before = [p.clone() for p in self.agent.policy_net.parameters()]
+        self.agent.optimize_model()
+        for b, a in zip(before, self.agent.policy_net.parameters()):
+            self.assertTrue(torch.equal(b, a))
+
+
+@pytest.mark.parametrize("capacity, pushes", [(10, 5), (10, 25), (1, 3)])
+def test_replay_memory_size_is_bounded(capacity, pushes):
+    memory = ReplayMemory(capacity=capacity, state_dim=2)
+    for i in range(pushes):
+        memory.push(np.zeros(2), 0, 0.0, np.zeros(2), False)
+    assert len(memory) == min(capacity, pushes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import numpy as np
+import torch
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'ai', 'models')))
+from agent_model import AgentConfig
+from agent_pool import AgentPool
+
+
+class TestAgentPool(unittest.TestCase):
+    def setUp(self):
+        self.config = AgentConfig({'state_dim': 4, 'action_dim': 3, 'hidden_dim': 8})
+        self.config.device = torch.device('cpu')
+        self.pool = AgentPool(self.config, initial_capacity=2)
+
+    def test_tenants_grow_capacity(self):
+        slots = self.pool.slots(['a', 'b', 'c', 'a'])
+        np.testing.assert_array_equal(slots, [0, 1, 2, 0])
+        self.assertEqual(len(self.pool), 3)
+        self.assertEqual(self.pool.capacity, 4)
+
+    def test_new_heads_match_shared_network(self):
+        states = np.random.randn(5, 4).astype(np.float32)
+        q_values = self.pool.q_values(self.pool.slots(['u1'] * 5), states)
+        with torch.no_grad():
+            expected = self.pool.base(torch.from_numpy(states))
+        torch.testing.assert_close(q_values, expected)
+
+    def test_select_actions_tracks_per_tenant_frames(self):
+        actions = self.pool.select_actions(['a', 'b', 'a'], np.random.randn(3, 4))
+        self.assertEqual(actions.shape, (3,))
+        np.testing.assert_array_equal(self.pool.frame_idx[:2], [2, 1])
+
+    def test_optimize_only_touches_own_heads(self):
+        self.pool.slots(['a', 'b'])
+        other_before = self.pool.head_weights[1].clone()
+        states = np.random.randn(4, 4)
+        td_before = self.pool.optimize(['a'] * 4, states, np.zeros(4), np.ones(4), states, np.ones(4))
+        td_after = self.pool.optimize(['a'] * 4, states, np.zeros(4), np.ones(4), states, np.ones(4))
+        self.assertLess(td_after, td_before)
+        self.assertTrue(torch.equal(self.pool.head_weights[1], other_before))
+
+    def test_bytes_per_tenant(self):
+        self.assertEqual(self.pool.bytes_per_tenant(), (3 * 8 + 3) * 4 + 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
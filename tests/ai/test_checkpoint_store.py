@@ -0,0 +1,84 @@
+import unittest
+import tempfile
+import numpy as np
+import torch
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'ai', 'models')))
+from agent_model import AgentConfig, OntoraAgent
+from checkpoint_store import CheckpointStore
+
+
+class TestCheckpointStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = CheckpointStore(self.tmp.name, chunk_bytes=64)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip_multi_chunk_and_dtypes(self):
+        tensors = {'w': torch.randn(10, 7), 'step': torch.tensor(3.0), 'idx': torch.arange(5),
+                   'half': torch.randn(40).to(torch.bfloat16), 'empty': torch.zeros(0)}
+        self.store.save('ckpt.json', tensors, metadata={'frame_idx': 12})
+        loaded, metadata = self.store.load('ckpt.json')
+        self.assertEqual(metadata, {'frame_idx': 12})
+        for key, tensor in tensors.items():
+            self.assertEqual(loaded[key].dtype, tensor.dtype)
+            self.assertTrue(torch.equal(loaded[key], tensor))
+
+    def test_identical_and_unchanged_tensors_are_deduplicated(self):
+        weight = torch.randn(32, 32)
+        first = self.store.save('a.json', {'policy': weight, 'target': weight.clone()})
+        self.assertEqual(first['bytes_written'], first['bytes_total'] // 2)
+        second = self.store.save('b.json', {'policy': weight, 'target': weight})
+        self.assertEqual(second['bytes_written'], 0)
+        weight[0, 0] += 1.0
+        third = self.store.save('c.json', {'policy': weight, 'target': weight})
+        self.assertEqual(third['bytes_written'], 64)
+
+    def test_collect_garbage_keeps_referenced_chunks(self):
+        kept, dropped = torch.randn(40), torch.randn(40)
+        self.store.save('kept.json', {'w': kept})
+        self.store.save('dropped.json', {'w': dropped})
+        os.remove(os.path.join(self.tmp.name, 'dropped.json'))
+        stats = self.store.collect_garbage()
+        self.assertEqual(stats, {'chunks_removed': 3, 'bytes_freed': 160})
+        self.assertEqual(self.store.collect_garbage()['chunks_removed'], 0)
+        loaded, _ = self.store.load('kept.json')
+        self.assertTrue(torch.equal(loaded['w'], kept))
+
+    def test_is_manifest(self):
+        self.store.save('m.json', {'x': torch.ones(2)})
+        torch.save({'x': torch.ones(2)}, os.path.join(self.tmp.name, 'full.pth'))
+        self.assertTrue(CheckpointStore.is_manifest(os.path.join(self.tmp.name, 'm.json')))
+        self.assertFalse(CheckpointStore.is_manifest(os.path.join(self.tmp.name, 'full.pth')))
+
+
+class TestAgentIncrementalCheckpoint(unittest.TestCase):
+    def test_save_and_load_incremental(self):
+        config = AgentConfig({'state_dim': 4, 'action_dim': 2, 'hidden_dim': 8,
+                              'memory_size': 100, 'batch_size': 8})
+        config.device = torch.device('cpu')
+        agent = OntoraAgent(config)
+        for _ in range(16):
+            agent.store_transition(np.random.randn(4), np.random.randint(2), 1.0, np.random.randn(4), False)
+        agent.optimize_model()
+        agent.frame_idx = 42
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'agent.ckpt.json')
+            agent.save_model(path, incremental=True)
+            restored = OntoraAgent(config)
+            restored.config.device = torch.device('cpu')
+            restored.load_model(path)
+            self.assertEqual(restored.frame_idx, 42)
+            for a, b in zip(agent.policy_net.parameters(), restored.policy_net.parameters()):
+                self.assertTrue(torch.equal(a, b))
+            restored_state = restored.optimizer.state_dict()['state']
+            for param_id, state in agent.optimizer.state_dict()['state'].items():
+                self.assertTrue(torch.equal(state['exp_avg'], restored_state[param_id]['exp_avg']))
+
+
+if __name__ == '__main__':
+    unittest.main()
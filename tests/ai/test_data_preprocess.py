@@ -0,0 +1,412 @@
+import unittest
+from unittest import mock
+import tempfile
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'ai', 'models')))
+import data_preprocess
+from data_preprocess import CategoricalEncoder, DataPreprocessor, RunningColumnStats, estimate_distinct
+from transform_spec import TransformSpec
+
+
+def make_transactions(rows: int = 1000) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'amount': rng.random(rows) * 100,
+        'block': np.arange(rows),
+        'chain': rng.choice(['sol', 'eth', 'btc'], size=rows),
+        'wallet': [f"w{i}" for i in range(rows)]
+    })
+
+
+class TestLoadData(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data = make_transactions()
+        self.preprocessor = DataPreprocessor()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.tmp.name, name)
+
+    def test_csv_projection_and_filters(self):
+        self.data.to_csv(self.path('tx.csv'), index=False)
+        loaded = self.preprocessor.load_data(self.path('tx.csv'), columns=['amount', 'block'],
+                                             filters=[('chain', '==', 'sol'), ('amount', '>', 50)])
+        expected = self.data[(self.data.chain == 'sol') & (self.data.amount > 50)]
+        self.assertEqual(list(loaded.columns), ['amount', 'block'])
+        np.testing.assert_array_equal(loaded['block'], expected['block'])
+
+    def test_jsonl_filters_apply_per_chunk(self):
+        self.data.to_json(self.path('tx.jsonl'), orient='records', lines=True)
+        read_json = pd.read_json
+        with mock.patch.object(data_preprocess.pd, 'read_json', side_effect=read_json) as reader:
+            loaded = self.preprocessor.load_data(self.path('tx.jsonl'), 'jsonl', columns=['amount', 'block'],
+                                                 filters=[('chain', '==', 'sol'), ('amount', '>', 50)])
+        self.assertIn('chunksize', reader.call_args.kwargs)
+        expected = self.data[(self.data.chain == 'sol') & (self.data.amount > 50)]
+        self.assertEqual(list(loaded.columns), ['amount', 'block'])
+        np.testing.assert_array_equal(loaded['block'], expected['block'])
+
+    def test_columnar_formats_match(self):
+        self.data.to_parquet(self.path('tx.parquet'), row_group_size=100)
+        self.data.to_feather(self.path('tx.feather'))
+        filters = [('chain', 'in', ['eth', 'btc']), ('block', '<', 500)]
+        expected = self.data[self.data.chain.isin(['eth', 'btc']) & (self.data.block < 500)]
+        for name, file_type in (('tx.parquet', 'parquet'), ('tx.feather', 'feather')):
+            for memory_map in (True, False):
+                loaded = self.preprocessor.load_data(self.path(name), file_type, columns=['block', 'amount'],
+                                                     filters=filters, memory_map=memory_map)
+                self.assertEqual(list(loaded.columns), ['block', 'amount'])
+                np.testing.assert_array_equal(loaded['block'], expected['block'])
+
+    def test_infer_csv_dtypes(self):
+        self.data.to_csv(self.path('tx.csv'), index=False)
+        dtypes = self.preprocessor.infer_csv_dtypes(self.path('tx.csv'), sample_rows=200)
+        self.assertEqual(dtypes, {'amount': 'float32', 'chain': 'category'})
+
+    def test_iter_chunks_covers_file(self):
+        self.data.to_csv(self.path('tx.csv'), index=False)
+        self.data.to_parquet(self.path('tx.parquet'))
+        self.data.to_feather(self.path('tx.feather'), chunksize=300)
+        self.data.to_json(self.path('tx.jsonl'), orient='records', lines=True)
+        for name, file_type in (('tx.csv', 'csv'), ('tx.parquet', 'parquet'),
+                                ('tx.feather', 'feather'), ('tx.jsonl', 'jsonl')):
+            chunks = list(self.preprocessor.iter_chunks(self.path(name), file_type, chunksize=128,
+                                                        columns=['block'], filters=[('chain', '!=', 'btc')]))
+            self.assertTrue(all(len(chunk) <= 128 for chunk in chunks))
+            blocks = np.concatenate([chunk['block'].to_numpy() for chunk in chunks])
+            np.testing.assert_array_equal(blocks, self.data.block[self.data.chain != 'btc'])
+
+    def test_csv_chunks_share_inferred_dtypes(self):
+        self.data.to_csv(self.path('tx.csv'), index=False)
+        chunks = list(self.preprocessor.iter_chunks(self.path('tx.csv'), chunksize=250))
+        self.assertEqual(len(chunks), 4)
+        for chunk in chunks:
+            self.assertEqual(chunk['amount'].dtype, np.float32)
+            self.assertIsInstance(chunk['chain'].dtype, pd.CategoricalDtype)
+
+    def test_csv_chunk_categories_are_consistent(self):
+        data = self.data.sort_values('chain', key=lambda chain: chain.map({'sol': 0, 'eth': 1, 'btc': 2}))
+        data.to_csv(self.path('tx.csv'), index=False)
+        chunks = list(self.preprocessor.iter_chunks(self.path('tx.csv'), chunksize=250,
+                                                    dtype={'chain': 'category'}))
+        final = list(chunks[-1]['chain'].cat.categories)
+        self.assertEqual(final[:1], ['sol'])
+        for chunk in chunks:
+            categories = list(chunk['chain'].cat.categories)
+            self.assertEqual(categories, final[:len(categories)])
+            np.testing.assert_array_equal(np.asarray(final)[chunk['chain'].cat.codes], chunk['chain'].astype(str))
+        loaded = self.preprocessor.load_data(self.path('tx.csv'), filters=[('amount', '>', 10)],
+                                             dtype={'chain': 'category'})
+        self.assertIsInstance(loaded['chain'].dtype, pd.CategoricalDtype)
+        expected = data[data.amount > 10]['chain']
+        np.testing.assert_array_equal(loaded['chain'].astype(str), expected)
+
+
+def make_features(rows: int = 3000) -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    data = pd.DataFrame({
+        'amount': rng.random(rows) * 100,
+        'fee': rng.normal(size=rows),
+        'chain': rng.choice(['sol', 'eth', 'btc'], size=rows),
+        'tier': rng.integers(0, 4, size=rows)
+    })
+    data.loc[rng.random(rows) < 0.1, 'amount'] = np.nan
+    data.loc[rng.random(rows) < 0.1, 'chain'] = None
+    return data
+
+
+def sklearn_pipeline(data: pd.DataFrame) -> pd.DataFrame:
+    """The original fit_transform-per-step pipeline, as the reference."""
+    preprocessor = DataPreprocessor()
+    preprocessor.identify_columns(data)
+    data = preprocessor.handle_missing_values(data)
+    data = preprocessor.encode_categorical(data)
+    return preprocessor.normalize_data(data)
+
+
+class TestPreprocessStream(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data = make_features()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_stream_matches_in_memory_pipeline(self):
+        expected = sklearn_pipeline(self.data.copy())
+        source = os.path.join(self.tmp.name, 'raw.parquet')
+        self.data.to_parquet(source)
+        for output_type, read in (('parquet', pd.read_parquet), ('csv', pd.read_csv),
+                                  ('jsonl', lambda path: pd.read_json(path, lines=True))):
+            output = os.path.join(self.tmp.name, f'out.{output_type}')
+            spec = DataPreprocessor().preprocess_stream(source, output, 'parquet', output_type, chunksize=400)
+            self.assertEqual(spec.columns, list(self.data.columns))
+            streamed = read(output)
+            self.assertEqual(len(streamed), len(self.data))
+            if output_type == 'jsonl':
+                with open(output, 'r') as f:
+                    self.assertNotIn('', [line.strip() for line in f])
+            for col in self.data.columns:
+                np.testing.assert_allclose(streamed[col].to_numpy(float), expected[col].to_numpy(float), atol=1e-12)
+
+    def test_running_stats_merge(self):
+        stats = RunningColumnStats(['amount'], ['chain'])
+        for start in range(0, len(self.data), 256):
+            stats.update(self.data.iloc[start:start + 256])
+        self.assertAlmostEqual(stats.mean[0], self.data['amount'].mean())
+        self.assertEqual(stats.count[0], self.data['amount'].notna().sum())
+        self.assertEqual(stats.category_counts['chain'], self.data['chain'].value_counts().to_dict())
+
+
+class TestTransformSpec(unittest.TestCase):
+    def setUp(self):
+        self.data = make_features()
+        self.preprocessor = DataPreprocessor()
+
+    def test_fit_transform_matches_sklearn_steps(self):
+        expected = sklearn_pipeline(self.data.copy())
+        transformed = self.preprocessor.preprocess_pipeline(self.data.copy())
+        for col in self.data.columns:
+            np.testing.assert_allclose(transformed[col].to_numpy(float), expected[col].to_numpy(float), atol=1e-12)
+        self.assertEqual(transformed['chain'].dtype, np.int64)
+
+    def test_pipeline_keeps_sklearn_objects_fitted(self):
+        reference = DataPreprocessor()
+        reference.identify_columns(self.data)
+        imputed = reference.handle_missing_values(self.data.copy())
+        reference.normalize_data(reference.encode_categorical(imputed.copy()))
+        transformed = self.preprocessor.preprocess_pipeline(self.data.copy())
+        fitted = self.preprocessor
+        np.testing.assert_allclose(fitted.scaler.mean_, reference.scaler.mean_)
+        np.testing.assert_allclose(fitted.scaler.scale_, reference.scaler.scale_)
+        self.assertEqual(fitted.scaler.n_samples_seen_, len(self.data))
+        np.testing.assert_allclose(fitted.imputer_numeric.statistics_, reference.imputer_numeric.statistics_)
+        np.testing.assert_array_equal(fitted.imputer_categorical.statistics_.astype(str),
+                                      reference.imputer_categorical.statistics_.astype(str))
+        for col in fitted.categorical_cols:
+            np.testing.assert_array_equal(fitted.label_encoders[col].classes_, reference.label_encoders[col].classes_)
+        restored = fitted.scaler.inverse_transform(transformed[fitted.numerical_cols])
+        np.testing.assert_allclose(restored, imputed[fitted.numerical_cols].to_numpy(float), atol=1e-9)
+
+    def test_saved_spec_numpy_transform_matches(self):
+        expected = self.preprocessor.fit_transform(self.data)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'transform.json')
+            self.preprocessor.save_transform(path)
+            spec = TransformSpec.load(path)
+        raw = self.data.to_numpy(dtype=object)
+        features = spec.transform(raw, dtype=np.float64)
+        np.testing.assert_allclose(features, expected.to_numpy(float), atol=1e-12)
+        columns = {col: self.data[col].to_numpy() for col in self.data.columns}
+        np.testing.assert_allclose(spec.transform(columns, dtype=np.float64), features)
+
+    def test_missing_and_unseen_categories_use_fill_value(self):
+        spec = self.preprocessor.fit(self.data)
+        codes = spec.encode('chain', np.array(['eth', None, 'doge'], dtype=object))
+        fill = spec.fill_codes['chain']
+        self.assertEqual(spec.vocabularies['chain'][fill], self.data['chain'].mode()[0])
+        self.assertEqual(codes[1], fill)
+        self.assertEqual(codes[2], fill)
+        self.assertEqual(spec.vocabularies['chain'][codes[0]], 'eth')
+
+    def test_encode_factorizes_with_and_without_pandas(self):
+        spec = self.preprocessor.fit(self.data)
+        values = np.array(['eth', None, 'doge', np.nan, 'sol', 'eth'], dtype=object)
+        expected = spec.encode('chain', values)
+        fill = spec.fill_codes['chain']
+        vocabulary = list(spec.vocabularies['chain'])
+        np.testing.assert_array_equal(expected, [vocabulary.index('eth'), fill, fill, fill,
+                                                 vocabulary.index('sol'), vocabulary.index('eth')])
+        np.testing.assert_array_equal(spec.encode('chain', pd.Series(values, dtype='category')), expected)
+        tier_spec = DataPreprocessor().fit(self.data)
+        with mock.patch.dict(sys.modules, {'pandas': None}):
+            np.testing.assert_array_equal(spec.encode('chain', values), expected)
+            tiers = tier_spec.encode('tier', np.array([0, 3, 7]))
+        np.testing.assert_array_equal(tiers, [0, 3, tier_spec.fill_codes['tier']])
+
+    def test_parallel_matches_serial(self):
+        data = self.data.copy()
+        data.loc[::7, 'amount'] = np.nan
+        data.loc[::5, 'chain'] = None
+        data['mixed'] = np.array(['x', 1, 'y', 2.5, None], dtype=object)[np.arange(len(data)) % 5]
+        serial = DataPreprocessor()
+        expected = serial.fit_transform(data.copy())
+        preprocessor = DataPreprocessor(num_workers=2)
+        pd.testing.assert_frame_equal(preprocessor.fit_transform(data.copy()), expected)
+        pd.testing.assert_frame_equal(preprocessor.transform(data.copy()), expected)
+        self.assertEqual(preprocessor.categorical_cols, serial.categorical_cols)
+        self.assertIn('mixed', preprocessor.categorical_cols)
+
+    def test_parallel_matches_serial_for_values_sharing_a_string_form(self):
+        data = self.data.copy()
+        # Raw counts make 'a' the most frequent value, string forms make it '1'.
+        data['ambiguous'] = np.array([1, '1', 'a', 'a', 'a', 1, '1', None], dtype=object)[np.arange(len(data)) % 8]
+        data['object_ints'] = np.array([2, 10, 2, 10, None], dtype=object)[np.arange(len(data)) % 5]
+        expected = DataPreprocessor().fit_transform(data.copy())
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for _ in range(2):
+                preprocessor = DataPreprocessor(num_workers=2, role_cache_dir=cache_dir)
+                pd.testing.assert_frame_equal(preprocessor.fit_transform(data.copy()), expected)
+        self.assertEqual(preprocessor.transform_spec.fill_values['ambiguous'], '1')
+        self.assertEqual(preprocessor.numerical_cols, list(preprocessor.transform_spec.numerical_cols))
+
+    def test_transform_requires_fit(self):
+        with self.assertRaises(ValueError):
+            DataPreprocessor().transform(self.data)
+
+
+class TestCategoricalEncoder(unittest.TestCase):
+    def test_label_codes_match_label_encoder(self):
+        from sklearn.preprocessing import LabelEncoder
+        for values in (np.array(['b', None, 'a', 'b', 'c'], dtype=object),
+                       np.array([3.0, np.nan, 1.5, 3.0]),
+                       np.array([10, 2, 33, 2])):
+            expected = LabelEncoder().fit_transform(pd.Series(values).astype(str))
+            encoder = CategoricalEncoder(dtype=np.int32)
+            codes = encoder.fit_transform(values)
+            self.assertEqual(codes.dtype, np.int32)
+            np.testing.assert_array_equal(codes, expected)
+            np.testing.assert_array_equal(encoder.transform(values), expected)
+
+    def test_unseen_categories(self):
+        encoder = CategoricalEncoder().fit(pd.Series(['sol', 'eth', 'sol']))
+        np.testing.assert_array_equal(encoder.transform(pd.Series(['eth', 'doge'])), [0, -1])
+        frequency = CategoricalEncoder('frequency').fit(pd.Series(['sol', 'eth', 'sol']))
+        np.testing.assert_allclose(frequency.transform(pd.Series(['sol', 'doge'])), [2 / 3, 0.0])
+
+    def test_target_encoding_is_smoothed(self):
+        values = pd.Series(['a', 'a', 'b', 'b'])
+        target = np.array([1.0, 1.0, 0.0, 1.0])
+        encoded = CategoricalEncoder('target', smoothing=2.0).fit_transform(values, target)
+        np.testing.assert_allclose(encoded, [(2 + 1.5) / 4] * 2 + [(1 + 1.5) / 4] * 2)
+
+    def test_hash_encoding_is_stable(self):
+        encoder = CategoricalEncoder('hash', hash_buckets=16)
+        codes = encoder.transform(pd.Series(['sol', 'eth', 'sol']))
+        self.assertTrue(((codes >= 0) & (codes < 16)).all())
+        self.assertEqual(codes[0], codes[2])
+
+    def test_encode_categorical_skips_target_column(self):
+        data = make_transactions(100)
+        data['label'] = (data['amount'] > 50).astype(int)
+        preprocessor = DataPreprocessor()
+        preprocessor.identify_columns(data)
+        encoded = preprocessor.encode_categorical(data, method='target', target='label')
+        self.assertTrue(data['label'].equals(encoded['label']))
+        self.assertNotIn('label', preprocessor.categorical_encoders)
+        self.assertEqual(encoded['chain'].dtype, np.float64)
+
+
+class TestIdentifyColumns(unittest.TestCase):
+    def setUp(self):
+        self.data = make_transactions(2000)
+        self.data['tier'] = np.arange(2000) % 4
+
+    def test_roles_reset_between_calls(self):
+        preprocessor = DataPreprocessor()
+        preprocessor.identify_columns(self.data)
+        preprocessor.identify_columns(self.data)
+        self.assertEqual(preprocessor.numerical_cols, ['amount', 'block'])
+        self.assertEqual(preprocessor.categorical_cols, ['chain', 'wallet', 'tier'])
+
+    def test_hll_estimate_and_roles(self):
+        values = np.random.default_rng(1).integers(0, 50000, size=200000).astype(float)
+        exact = pd.Series(values).nunique()
+        self.assertLess(abs(estimate_distinct(values, error=0.01) - exact) / exact, 0.04)
+        exact_roles, hll_roles = DataPreprocessor(), DataPreprocessor(cardinality='hll')
+        exact_roles.identify_columns(self.data)
+        hll_roles.identify_columns(self.data)
+        self.assertEqual(hll_roles.numerical_cols, exact_roles.numerical_cols)
+        self.assertEqual(hll_roles.categorical_cols, exact_roles.categorical_cols)
+
+    def test_cached_roles_skip_the_scan(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            DataPreprocessor(role_cache_dir=cache_dir).identify_columns(self.data)
+            preprocessor = DataPreprocessor(role_cache_dir=cache_dir)
+            with mock.patch.object(data_preprocess, 'numerical_columns') as scan:
+                preprocessor.identify_columns(self.data)
+                scan.assert_not_called()
+            self.assertEqual(preprocessor.numerical_cols, ['amount', 'block'])
+            self.assertEqual(preprocessor.categorical_cols, ['chain', 'wallet', 'tier'])
+            with mock.patch.object(data_preprocess, 'numerical_columns', return_value=[]) as scan:
+                preprocessor.identify_columns(self.data.assign(extra=1.0))
+                scan.assert_called_once()
+
+    def test_role_cache_is_keyed_by_cardinality_settings(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            DataPreprocessor(role_cache_dir=cache_dir).identify_columns(self.data)
+            for settings in ({'cardinality': 'hll'}, {'cardinality': 'hll', 'cardinality_error': 0.002}):
+                preprocessor = DataPreprocessor(role_cache_dir=cache_dir, **settings)
+                with mock.patch.object(data_preprocess, 'numerical_columns', return_value=[]) as scan:
+                    preprocessor.identify_columns(self.data)
+                    scan.assert_called_once()
+            self.assertEqual(len(os.listdir(cache_dir)), 3)
+
+class TestAugmentBatches(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.data = pd.DataFrame({'x0': rng.normal(size=500), 'x1': rng.normal(size=500),
+                                  'chain': rng.integers(0, 3, size=500), 'label': rng.integers(0, 2, size=500)})
+        self.preprocessor = DataPreprocessor()
+        self.preprocessor.numerical_cols = ['x0', 'x1']
+
+    def batches(self, method: str, **kwargs):
+        return list(self.preprocessor.augment_batches(self.data, batch_size=64, method=method, factor=0.5,
+                                                      target='label', seed=7, **kwargs))
+
+    def test_seeded_batches_are_reproducible(self):
+        for method in ('noise', 'duplicate', 'mixup', 'smote'):
+            first, second = self.batches(method), self.batches(method)
+            self.assertEqual(len(first), len(second))
+            for (x1, y1), (x2, y2) in zip(first, second):
+                np.testing.assert_array_equal(x1, x2)
+                np.testing.assert_array_equal(y1, y2)
+
+    def test_row_counts_and_originals(self):
+        features = np.concatenate([x for x, _ in self.batches('noise', shuffle=False)])
+        self.assertEqual(features.shape, (1000, 3))
+        np.testing.assert_allclose(features[:500], self.data[['x0', 'x1', 'chain']].to_numpy(np.float32))
+        np.testing.assert_array_equal(features[500:, 2], self.data['chain'].to_numpy())
+        synthetic = np.concatenate([x for x, _ in self.batches('duplicate', include_original=False)])
+        self.assertEqual(len(synthetic), 250)
+
+    def test_mixup_and_smote_stay_in_range(self):
+        targets = np.concatenate([y for _, y in self.batches('mixup', include_original=False)])
+        self.assertTrue(((targets >= 0) & (targets <= 1)).all())
+        self.assertTrue(set(np.unique(np.concatenate([x[:, 2] for x, _ in self.batches('mixup')]))) <= {0, 1, 2})
+        features = np.concatenate([x for x, _ in self.batches('smote', include_original=False)])
+        bounds = self.data[['x0', 'x1']].to_numpy(np.float32)
+        self.assertTrue((features[:, :2] >= bounds.min(0) - 1e-6).all())
+        self.assertTrue((features[:, :2] <= bounds.max(0) + 1e-6).all())
+
+    def test_invalid_arguments_raise_on_call(self):
+        with self.assertRaises(ValueError):
+            self.preprocessor.augment_batches(self.data, method='rotate')
+        with self.assertRaises(ValueError):
+            self.preprocessor.augment_batches(self.data, target='missing')
+
+    def test_pipeline_streams_augmented_batches(self):
+        expected_preprocessor = DataPreprocessor()
+        expected = list(expected_preprocessor.augment_batches(expected_preprocessor.fit_transform(self.data.copy()),
+                                                              batch_size=64, factor=0.5, target='label', seed=3))
+        preprocessor = DataPreprocessor()
+        with mock.patch.object(preprocessor, 'augment_data') as augment_data:
+            batches = preprocessor.preprocess_pipeline(self.data.copy(), augment=True, augment_factor=0.5,
+                                                       batch_size=64, target='label', seed=3)
+            streamed = list(batches)
+        augment_data.assert_not_called()
+        self.assertEqual(len(streamed), len(expected))
+        for (x1, y1), (x2, y2) in zip(streamed, expected):
+            np.testing.assert_array_equal(x1, x2)
+            np.testing.assert_array_equal(y1, y2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+from unittest import mock
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+import torch
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'ai', 'models')))
+from dataset_cache import DatasetCache, TensorBatchLoader
+from train import AgentModel, ModelTrainer
+
+
+class TestDatasetCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        self.data = pd.DataFrame(rng.normal(size=(200, 4)), columns=['a', 'b', 'c', 'target'])
+        self.path = os.path.join(self.tmp.name, 'data.csv')
+        self.data.to_csv(self.path, index=False)
+        self.cache_dir = os.path.join(self.tmp.name, 'cache')
+        self.trainer = ModelTrainer(AgentModel, input_size=3, output_size=1)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_store_and_memory_mapped_load(self):
+        cache = DatasetCache(self.cache_dir)
+        self.assertIsNone(cache.load(self.path, 'target'))
+        cache.store(self.path, 'target', self.data)
+        features, targets, meta = cache.load(self.path, 'target')
+        self.assertIsInstance(features, np.memmap)
+        self.assertEqual(features.dtype, np.float32)
+        self.assertTrue(features.flags['C_CONTIGUOUS'])
+        np.testing.assert_array_equal(features, self.data[['a', 'b', 'c']].to_numpy(np.float32))
+        np.testing.assert_array_equal(targets, self.data['target'].to_numpy(np.float32))
+        self.assertEqual(meta['feature_names'], ['a', 'b', 'c'])
+        self.assertIsNone(cache.load(self.path, 'a'))
+
+    def test_cache_hit_skips_parsing_and_matches_uncached_split(self):
+        uncached_train, uncached_val = self.trainer.load_data(self.path, 'target')
+        self.trainer.load_data(self.path, 'target', cache_dir=self.cache_dir)
+        with mock.patch('train.pd.read_csv') as read_csv:
+            train_loader, val_loader = self.trainer.load_data(self.path, 'target', cache_dir=self.cache_dir)
+            read_csv.assert_not_called()
+        for cached, uncached in ((train_loader, uncached_train), (val_loader, uncached_val)):
+            self.assertEqual(len(cached.dataset), len(uncached.dataset))
+            for i in (0, len(cached.dataset) - 1):
+                for left, right in zip(cached.dataset[i], uncached.dataset[i]):
+                    self.assertTrue(torch.equal(left, right))
+
+    def test_cached_loaders_read_from_the_memory_map(self):
+        entry = DatasetCache(self.cache_dir).store(self.path, 'target', self.data)
+        features = entry[0]
+        with mock.patch.object(DatasetCache, 'load', return_value=entry):
+            train_loader, val_loader = self.trainer.load_data(self.path, 'target', cache_dir=self.cache_dir)
+        for loader in (train_loader, val_loader):
+            self.assertEqual(loader.features.data_ptr() - features.ctypes.data, 0)
+        self.assertEqual(len(train_loader.dataset) + len(val_loader.dataset), len(self.data))
+
+    def test_changed_file_invalidates_entry(self):
+        cache = DatasetCache(self.cache_dir)
+        cache.store(self.path, 'target', self.data)
+        self.data.iloc[:100].to_csv(self.path, index=False)
+        self.assertIsNone(cache.load(self.path, 'target'))
+        _, val_loader = self.trainer.load_data(self.path, 'target', cache_dir=self.cache_dir)
+        self.assertEqual(len(val_loader.dataset), 20)
+
+
+class TestTensorBatchLoader(unittest.TestCase):
+    def setUp(self):
+        self.X = torch.arange(100, dtype=torch.float32).repeat(3, 1).T
+        self.y = torch.arange(100, dtype=torch.float32)
+
+    def test_shuffled_epoch_covers_every_row_once(self):
+        loader = TensorBatchLoader(self.X, self.y, batch_size=32, shuffle=True)
+        self.assertEqual(len(loader), 4)
+        batches = list(loader)
+        self.assertEqual([len(batch_y) for _, batch_y in batches], [32, 32, 32, 4])
+        rows = torch.cat([batch_X for batch_X, _ in batches])
+        targets = torch.cat([batch_y for _, batch_y in batches])
+        self.assertTrue(torch.equal(rows[:, 0], targets))
+        self.assertEqual(sorted(targets.tolist()), self.y.tolist())
+        self.assertFalse(torch.equal(targets, self.y))
+
+    def test_prefetch_yields_the_same_batches(self):
+        expected = list(TensorBatchLoader(self.X, self.y, batch_size=16, shuffle=True,
+                                          generator=torch.Generator().manual_seed(1)))
+        prefetched = list(TensorBatchLoader(self.X, self.y, batch_size=16, shuffle=True, prefetch=2,
+                                            generator=torch.Generator().manual_seed(1)))
+        self.assertEqual(len(prefetched), len(expected))
+        for (left_X, left_y), (right_X, right_y) in zip(prefetched, expected):
+            self.assertTrue(torch.equal(left_X, right_X))
+            self.assertTrue(torch.equal(left_y, right_y))
+
+    def test_indices_select_the_split_rows(self):
+        indices = np.arange(0, 100, 3)
+        loader = TensorBatchLoader(self.X.numpy(), self.y.numpy(), batch_size=8, shuffle=True, indices=indices)
+        self.assertEqual(len(loader), 5)
+        self.assertEqual(len(loader.dataset), len(indices))
+        targets = torch.cat([batch_y for _, batch_y in loader])
+        self.assertEqual(sorted(targets.tolist()), indices.tolist())
+        ordered = torch.cat([batch_y for _, batch_y in TensorBatchLoader(self.X, self.y, batch_size=8, indices=indices)])
+        self.assertEqual(ordered.tolist(), indices.tolist())
+
+    def test_prefetch_stops_when_the_loop_breaks(self):
+        loader = TensorBatchLoader(self.X, self.y, batch_size=1, prefetch=1)
+        batches = iter(loader)
+        for i, _ in enumerate(batches):
+            if i == 2:
+                break
+        self.assertIn('batch-prefetch', [thread.name for thread in threading.enumerate()])
+        batches.close()
+        self.assertNotIn('batch-prefetch', [thread.name for thread in threading.enumerate()])
+        self.assertEqual(sum(len(batch_y) for _, batch_y in loader), 100)
+        self.assertNotIn('batch-prefetch', [thread.name for thread in threading.enumerate()])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,203 @@
+import unittest
+from unittest import mock
+import tempfile
+import json
+import torch
+import torch.nn as nn
+from torch.utils.data import DataLoader, TensorDataset
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'ai', 'models')))
+from train import AgentModel, ModelTrainer, _run_trial, sample_configurations
+
+
+class TanhModel(AgentModel):
+    def __init__(self, *args, **kwargs):
+        super(TanhModel, self).__init__(*args, **kwargs)
+        self.network = nn.Sequential(*[nn.Tanh() if isinstance(layer, nn.ReLU) else layer for layer in self.network])
+
+
+class BatchNormModel(AgentModel):
+    def __init__(self, input_size, hidden_sizes, output_size, dropout_rate=0.2):
+        super(BatchNormModel, self).__init__(input_size, hidden_sizes, output_size, dropout_rate)
+        self.network.insert(1, nn.BatchNorm1d(hidden_sizes[0]))
+
+
+PARAM_GRID = {'hidden_sizes': [[16], [32, 16]], 'learning_rate': [0.01, 0.001], 'dropout_rate': [0.0, 0.2]}
+
+
+class TestHyperparameterTuning(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        generator = torch.Generator().manual_seed(0)
+        X = torch.randn(256, 6, generator=generator)
+        y = X.sum(1)
+        self.train_loader = DataLoader(TensorDataset(X[:200], y[:200]), batch_size=32)
+        self.val_loader = DataLoader(TensorDataset(X[200:], y[200:]), batch_size=32)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def tune(self, **kwargs):
+        trainer = ModelTrainer(AgentModel, input_size=6, output_size=1)
+        result = trainer.hyperparameter_tuning(self.train_loader, self.val_loader, PARAM_GRID, num_epochs=2, **kwargs)
+        return trainer, result
+
+    def test_samplers(self):
+        self.assertEqual(len(sample_configurations(PARAM_GRID)), 8)
+        sobol = sample_configurations(PARAM_GRID, 'sobol', num_trials=6, seed=1)
+        self.assertEqual(sobol, sample_configurations(PARAM_GRID, 'sobol', num_trials=6, seed=1))
+        self.assertEqual(len({json.dumps(params) for params in sobol}), len(sobol))
+        ranges = sample_configurations({'learning_rate': {'low': 1e-4, 'high': 1e-1, 'log': True}}, 'random', 20)
+        self.assertTrue(all(1e-4 <= params['learning_rate'] <= 1e-1 for params in ranges))
+        with self.assertRaises(ValueError):
+            sample_configurations(PARAM_GRID, 'random')
+
+    def test_parallel_search_covers_every_trial(self):
+        trainer, result = self.tune(num_workers=2)
+        self.assertEqual([record['trial'] for record in result['results']], list(range(8)))
+        self.assertIsNotNone(trainer.best_model)
+        self.assertEqual(result['best_val_loss'], min(record['val_loss'] for record in result['results']))
+
+    def test_interrupted_search_resumes(self):
+        results_path = os.path.join(self.tmp.name, 'trials.jsonl')
+        _, first = self.tune(sampler='sobol', num_trials=4, results_path=results_path)
+        with open(results_path, 'r') as f:
+            lines = f.readlines()
+        with open(results_path, 'w') as f:
+            f.writelines(lines[:2] + ['{"trial": 3, "par'])
+        trainer, resumed = self.tune(sampler='sobol', num_trials=4, results_path=results_path)
+        self.assertEqual([record['trial'] for record in resumed['results']], [0, 1, 2, 3])
+        self.assertEqual(resumed['results'][:2], first['results'][:2])
+        self.assertIsNotNone(trainer.best_model)
+        with open(results_path, 'r') as f:
+            self.assertEqual(len([json.loads(line) for line in f]), 4)
+
+    def test_best_checkpoint_reproduces_best_val_loss(self):
+        results_path = os.path.join(self.tmp.name, 'trials.jsonl')
+        # A large learning rate makes the validation loss oscillate, so the best epoch is rarely the last.
+        grid = {'hidden_sizes': [[16]], 'learning_rate': [0.2, 0.5], 'dropout_rate': [0.0]}
+        torch.manual_seed(0)
+        trainer = ModelTrainer(AgentModel, input_size=6, output_size=1)
+        result = trainer.hyperparameter_tuning(self.train_loader, self.val_loader, grid, num_epochs=8,
+                                               early_stopping_patience=8, results_path=results_path)
+        checkpoint = torch.load(f"{results_path}.best.pt")
+        record = min(result['results'], key=lambda record: record['best_val_loss'])
+        self.assertEqual(checkpoint['val_loss'], record['best_val_loss'])
+        model, criterion, _ = trainer.build_trial(record['params'])
+        model.load_state_dict(checkpoint['state_dict'])
+        self.assertAlmostEqual(trainer.validate(model, self.val_loader, criterion), checkpoint['val_loss'], places=5)
+
+    def test_successive_halving_promotes_top_trials(self):
+        trainer = ModelTrainer(AgentModel, input_size=6, output_size=1)
+        result = trainer.successive_halving(self.train_loader, self.val_loader, PARAM_GRID, max_epochs=4,
+                                            min_epochs=1, reduction_factor=2)
+        epochs = sorted(record['epochs'] for record in result['results'])
+        self.assertEqual(epochs, [1, 1, 1, 1, 2, 2, 4, 4])
+        self.assertEqual(result['epochs_trained'], sum(epochs))
+        self.assertEqual(result['full_budget_epochs'], 32)
+        finalists = [record for record in result['results'] if record['epochs'] == 4]
+        self.assertEqual(result['best_val_loss'], min(record['val_loss'] for record in finalists))
+        self.assertEqual(trainer.best_val_loss, result['best_val_loss'])
+        self.assertBestModelMatches(trainer, result)
+
+    def assertBestModelMatches(self, trainer, result):
+        model, criterion, _ = trainer.build_trial(result['best_params'])
+        model.load_state_dict(trainer.best_model)
+        self.assertAlmostEqual(trainer.validate(model, self.val_loader, criterion), result['best_val_loss'], places=5)
+
+    def test_hyperband_runs_every_bracket(self):
+        trainer = ModelTrainer(AgentModel, input_size=6, output_size=1)
+        result = trainer.hyperband(self.train_loader, self.val_loader, PARAM_GRID, max_epochs=4, reduction_factor=2,
+                                   sampler='grid')
+        self.assertEqual(len(result['brackets']), 3)
+        self.assertEqual(result['best_val_loss'], min(bracket['best_val_loss'] for bracket in result['brackets']))
+        self.assertBestModelMatches(trainer, result)
+        # Each bracket draws its own subset of the grid instead of the same leading combinations.
+        params = [[record['params'] for record in bracket['results']] for bracket in result['brackets']]
+        self.assertNotEqual(params[1], params[0][:len(params[1])])
+
+    def test_hyperband_logs_errors(self):
+        trainer = ModelTrainer(AgentModel, input_size=6, output_size=1)
+        with mock.patch.object(trainer, 'successive_halving', side_effect=RuntimeError('boom')), \
+                self.assertLogs(trainer.logger, 'ERROR') as logs, self.assertRaises(RuntimeError):
+            trainer.hyperband(self.train_loader, self.val_loader, PARAM_GRID, max_epochs=4, reduction_factor=2)
+        self.assertIn('boom', logs.output[0])
+
+    def test_best_model_comes_from_the_last_rung(self):
+        trainer = ModelTrainer(AgentModel, input_size=6, output_size=1)
+        # The first configuration leads the first rung but falls behind the second on the last one.
+        losses = iter([0.1, 0.2, 0.3, 0.4, 0.5, 0.3])
+        with mock.patch.object(trainer, 'validate', side_effect=lambda *args: next(losses)):
+            result = trainer.successive_halving(self.train_loader, self.val_loader, PARAM_GRID, max_epochs=2,
+                                                min_epochs=1, reduction_factor=2,
+                                                configurations=sample_configurations(PARAM_GRID)[:4])
+        self.assertEqual(result['best_params'], sample_configurations(PARAM_GRID)[1])
+        self.assertEqual(trainer.best_val_loss, 0.3)
+
+    def test_ensemble_matches_sequential_training(self):
+        for model_class in (AgentModel, TanhModel):
+            self.assertEnsembleMatchesSequential(model_class)
+
+    def test_ensemble_rejects_stateful_layers(self):
+        with self.assertRaisesRegex(TypeError, 'BatchNorm1d'):
+            ModelTrainer(BatchNormModel, 6, 1).train_ensemble(self.train_loader, self.val_loader,
+                                                             [{'hidden_sizes': [16], 'learning_rate': 0.01,
+                                                               'dropout_rate': 0.0}], 1)
+
+    def assertEnsembleMatchesSequential(self, model_class):
+        configs = [{'hidden_sizes': [16, 8], 'learning_rate': lr, 'dropout_rate': 0.0} for lr in (0.001, 0.01, 0.05)]
+        default_dtype = torch.get_default_dtype()
+        # Float64 removes the summation-order rounding that batched kernels introduce in float32.
+        torch.set_default_dtype(torch.float64)
+        try:
+            train_loader = DataLoader(TensorDataset(*(t.double() for t in self.train_loader.dataset.tensors)), batch_size=32)
+            val_loader = DataLoader(TensorDataset(*(t.double() for t in self.val_loader.dataset.tensors)), batch_size=32)
+            inits = [model_class(6, [16, 8], 1).state_dict() for _ in configs]
+            build_trial = ModelTrainer.build_trial
+
+            def build_from_inits(trainer, params):
+                model, criterion, optimizer = build_trial(trainer, params)
+                model.load_state_dict(queue.pop(0))
+                return model, criterion, optimizer
+
+            with mock.patch.object(ModelTrainer, 'build_trial', build_from_inits):
+                queue = list(inits)
+                ensemble = ModelTrainer(model_class, 6, 1).train_ensemble(train_loader, val_loader, configs, 4, 2)
+                queue = list(inits)
+                sequential = [ModelTrainer(model_class, 6, 1).train(train_loader, val_loader, config, 4, 2)
+                              for config in configs]
+        finally:
+            torch.set_default_dtype(default_dtype)
+        for batched, single in zip(ensemble, sequential):
+            for key in ('train_loss', 'val_loss'):
+                self.assertEqual(len(batched['history'][key]), len(single['history'][key]))
+                for left, right in zip(batched['history'][key], single['history'][key]):
+                    self.assertAlmostEqual(left, right, places=10)
+
+    def test_serial_trial_uses_empty_loaders(self):
+        empty = DataLoader(TensorDataset(torch.zeros(0, 6), torch.zeros(0)), batch_size=32)
+        self.assertFalse(empty)
+        result = {'final_train_loss': 0.0, 'final_val_loss': 0.0, 'history': {'val_loss': []}}
+        with mock.patch.object(ModelTrainer, 'train', return_value=result) as train:
+            _run_trial(0, PARAM_GRID, 1, 1, {'model_class': AgentModel, 'input_size': 6, 'output_size': 1},
+                       train_loader=self.train_loader, val_loader=empty)
+        self.assertIs(train.call_args.args[1], empty)
+
+    def test_vectorize_rejects_worker_pool(self):
+        with self.assertRaises(ValueError):
+            self.tune(vectorize=True, num_workers=2)
+
+    def test_vectorized_search_records_every_trial(self):
+        trainer, result = self.tune(vectorize=True)
+        self.assertEqual([record['trial'] for record in result['results']], list(range(8)))
+        self.assertIsNotNone(trainer.best_model)
+        with self.assertRaises(ValueError):
+            trainer.train_ensemble(self.train_loader, self.val_loader,
+                                   [dict(PARAM_GRID, hidden_sizes=[16], learning_rate=0.01, dropout_rate=0.0),
+                                    dict(PARAM_GRID, hidden_sizes=[32, 16], learning_rate=0.01, dropout_rate=0.0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from unittest import mock
+import numpy as np
+import torch
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'ai', 'models')))
+from agent_model import AgentConfig, OntoraAgent
+from vector_env import MockWeb3Env, RolloutRunner, VectorEnv
+
+
+def make_env(seed):
+    return lambda: MockWeb3Env(state_dim=4, done_prob=0.5, seed=seed)
+
+
+class TestVectorEnv(unittest.TestCase):
+    def setUp(self):
+        self.vec_env = VectorEnv([make_env(i) for i in range(5)], state_dim=4, num_workers=2)
+
+    def tearDown(self):
+        self.vec_env.close()
+
+    def test_reset_and_step_shapes(self):
+        obs = self.vec_env.reset()
+        self.assertEqual(obs.shape, (5, 4))
+        next_obs, rewards, dones = self.vec_env.step(np.zeros(5, dtype=np.int64))
+        self.assertEqual(next_obs.shape, (5, 4))
+        self.assertEqual(rewards.shape, (5,))
+        self.assertTrue(np.all((rewards >= -1) & (rewards <= 1)))
+        self.assertTrue(set(np.unique(dones)).issubset({0.0, 1.0}))
+
+    def test_auto_reset_keeps_unfinished_states(self):
+        self.vec_env.reset()
+        next_obs, _, dones = self.vec_env.step(np.zeros(5, dtype=np.int64))
+        running = dones == 0
+        np.testing.assert_array_equal(self.vec_env.observations[running], next_obs[running])
+
+    def test_runner_fills_replay_memory(self):
+        config = AgentConfig({'state_dim': 4, 'action_dim': 2, 'hidden_dim': 8,
+                              'memory_size': 100, 'batch_size': 8})
+        config.device = torch.device('cpu')
+        agent = OntoraAgent(config)
+        stats = RolloutRunner(agent, self.vec_env).run(num_steps=4)
+        self.assertEqual(stats['frames'], 20)
+        self.assertEqual(len(agent.memory), 20)
+        self.assertEqual(agent.frame_idx, 20)
+
+    def test_runs_do_not_carry_returns_across_resets(self):
+        config = AgentConfig({'state_dim': 4, 'action_dim': 2, 'hidden_dim': 8,
+                              'memory_size': 100, 'batch_size': 8})
+        config.device = torch.device('cpu')
+        runner = RolloutRunner(OntoraAgent(config), self.vec_env)
+        runner.run(num_steps=3)
+        step_wait, rewards = self.vec_env.step_wait, []
+
+        def recording_step_wait():
+            result = step_wait()
+            rewards.append(result[1].copy())
+            return result
+
+        finished = len(runner.episode_rewards)
+        with mock.patch.object(self.vec_env, 'step_wait', recording_step_wait):
+            runner.run(num_steps=3)
+        self.assertAlmostEqual(sum(runner.episode_rewards[finished:]) + runner.running_rewards.sum(),
+                               np.sum(rewards, dtype=np.float64), places=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+import unittest
+from unittest import mock
+import tempfile
+import json
+import logging
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'examples')))
+from custom_agent import CustomAgent, QTable, StateInterner
+
+BEHAVIORS = {'stake_tokens': 0.5, 'claim_rewards': 0.3, 'analyze_data': 0.2, 'idle': 0.1}
+
+
+class AgentTestCase(unittest.TestCase):
+    def setUp(self):
+        logging.getLogger('custom_agent').setLevel(logging.WARNING)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.tmp.name, 'agent.json')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_agent(self, **kwargs):
+        return CustomAgent('agent_test', dict(BEHAVIORS), config_path=self.config_path, **kwargs)
+
+
+class TestStateInterner(unittest.TestCase):
+    def test_ids_follow_first_seen_order_of_str_keys(self):
+        interner = StateInterner()
+        self.assertEqual(interner.intern('a'), 0)
+        np.testing.assert_array_equal(interner.intern_many(['b', 'a', 3, 'b']), [1, 0, 2, 1])
+        self.assertEqual(interner.intern('3'), 2)
+        self.assertEqual(len(interner), 3)
+
+
+class TestQTable(unittest.TestCase):
+    def test_ensure_grows_geometrically_and_keeps_values(self):
+        table = QTable(2, initial_capacity=4)
+        table.values[3] = [1.0, 2.0]
+        table.ensure(5)
+        self.assertEqual(table.values.shape, (8, 2))
+        np.testing.assert_array_equal(table.values[3], [1.0, 2.0])
+        table.ensure(8)
+        self.assertEqual(len(table.values), 8)
+        table.add_action()
+        np.testing.assert_array_equal(table.values[3], [1.0, 2.0, 0.0])
+
+    def test_dirty_mask_grows_with_the_table(self):
+        table = QTable(2, initial_capacity=4)
+        table.dirty[[1, 3]] = True
+        table.ensure(9)
+        self.assertEqual(len(table.dirty), len(table.values))
+        np.testing.assert_array_equal(np.flatnonzero(table.dirty), [1, 3])
+
+
+class TestCustomAgent(AgentTestCase):
+    def test_batch_update_matches_sequential_updates(self):
+        rng = np.random.default_rng(0)
+        states = [f"s{i}" for i in rng.integers(0, 5, size=200)]
+        actions = rng.integers(0, len(BEHAVIORS), size=200)
+        rewards = rng.normal(size=200)
+
+        sequential = self.make_agent()
+        for state, action, reward in zip(states, actions, rewards):
+            sequential.set_state(state)
+            sequential.update_learning(sequential.actions[action], float(reward))
+        batched = self.make_agent()
+        batched.update_learning_batch(batched.intern_states(states), actions, rewards)
+
+        np.testing.assert_allclose(batched.q_table.values[:len(batched.states)],
+                                   sequential.q_table.values[:len(sequential.states)], rtol=1e-12, atol=1e-12)
+        for action in BEHAVIORS:
+            self.assertAlmostEqual(batched.behaviors[action], sequential.behaviors[action], places=10)
+        self.assertAlmostEqual(batched.total_rewards, sequential.total_rewards, places=10)
+
+    def test_experience_view_is_current_and_read_only(self):
+        agent = self.make_agent()
+        agent.set_state('login')
+        agent.update_learning('idle', 1.0)
+        self.assertAlmostEqual(agent.experience['login']['idle'], 0.1)
+        with self.assertRaises(TypeError):
+            agent.experience['login']['idle'] = 5.0
+        with self.assertRaises(TypeError):
+            agent.experience['login'] = {}
+        agent.update_learning('idle', 1.0)
+        self.assertAlmostEqual(agent.experience['login']['idle'], 0.19)
+
+    def test_experience_assignment_and_config_roundtrip(self):
+        agent = self.make_agent()
+        agent.experience = {'a': {'idle': 0.5}, 'b': {'stake_tokens': -1.0}}
+        self.assertEqual(list(agent.experience), ['a', 'b'])
+        self.assertEqual(agent.experience['b']['stake_tokens'], -1.0)
+        agent.save_config()
+        restored = self.make_agent()
+        self.assertEqual(restored.experience.to_dict(), agent.experience.to_dict())
+
+    def test_evolve_defaults_to_step_by_step(self):
+        agent = self.make_agent(exploration_rate=0.0)
+        agent.behaviors = {action: -1.0 for action in BEHAVIORS}
+        history = agent.evolve(state_sequence=['s'] * 3)
+        # Every reward is negative, so each step's greedy choice avoids the actions the
+        # previous steps already learned from; a single batch would repeat the first action.
+        self.assertEqual([entry['action'] for entry in history], list(BEHAVIORS)[:3])
+
+    def test_evolve_single_steps_use_the_scalar_path(self):
+        agent = self.make_agent()
+        with mock.patch.object(agent, '_evolve_batch') as evolve_batch:
+            history = agent.evolve(state_sequence=['a', 'b', 'a'])
+        evolve_batch.assert_not_called()
+        self.assertEqual(len(history), 3)
+        self.assertAlmostEqual(history[-1]['total_rewards'], agent.total_rewards)
+        self.assertEqual(agent.current_state, 'a')
+
+
+class TestJournalCheckpoints(AgentTestCase):
+    def test_journal_roundtrip_includes_single_step_updates(self):
+        agent = self.make_agent()
+        agent.save_config()
+        agent.evolve_batched(state_sequence=[f"s{i % 7}" for i in range(50)], batch_size=16, checkpoint_every=1)
+        agent.set_state('manual')
+        agent.update_learning('idle', 2.0)
+        agent.set_state('visited_only')
+        agent.append_checkpoint()
+
+        restored = self.make_agent()
+        self.assertEqual(restored.experience.to_dict(), agent.experience.to_dict())
+        self.assertAlmostEqual(restored.experience['manual']['idle'], 0.2)
+        self.assertIn('visited_only', restored.experience)
+        self.assertEqual(restored.behaviors, agent.behaviors)
+        self.assertEqual(restored.total_rewards, agent.total_rewards)
+
+    def test_checkpoint_clears_dirty_rows(self):
+        agent = self.make_agent()
+        for i in range(2000):
+            agent.set_state(f"s{i % 5}")
+            agent.update_learning('idle', 1.0)
+        np.testing.assert_array_equal(np.flatnonzero(agent.q_table.dirty), range(5))
+        agent.append_checkpoint()
+        self.assertFalse(agent.q_table.dirty.any())
+        agent.set_state('s2')
+        agent.update_learning('idle', 1.0)
+        agent.append_checkpoint()
+        with open(agent.journal_path, 'r') as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(list(records[-1]['experience']), ['s2'])
+
+    def test_torn_trailing_record_is_ignored(self):
+        agent = self.make_agent()
+        agent.set_state('a')
+        agent.update_learning('idle', 1.0)
+        agent.append_checkpoint()
+        expected = agent.experience.to_dict()
+        agent.set_state('b')
+        agent.update_learning('idle', 1.0)
+        agent.append_checkpoint()
+        with open(agent.journal_path, 'r+') as f:
+            lines = f.readlines()
+            f.seek(0)
+            f.truncate()
+            f.write(lines[0] + lines[1][:len(lines[1]) // 2])
+
+        restored = self.make_agent()
+        self.assertEqual(restored.experience.to_dict(), expected)
+        self.assertAlmostEqual(restored.total_rewards, 1.0)
+
+    def test_history_to_records(self):
+        agent = self.make_agent()
+        states = ['x', 'y', 'x', 'z']
+        history = agent.evolve_batched(state_sequence=states, batch_size=3, persist=False)
+        records = history.to_records(agent)
+        columns = history.columns()
+        self.assertEqual([record['state'] for record in records], states)
+        self.assertEqual([record['action'] for record in records],
+                         [agent.actions[i] for i in columns['action_ids']])
+        self.assertEqual([record['reward'] for record in records], columns['rewards'].tolist())
+        self.assertAlmostEqual(records[-1]['total_rewards'], agent.total_rewards)
+        self.assertEqual(records[0]['timestamp'], records[2]['timestamp'])
+        self.assertFalse(os.path.exists(agent.journal_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import tempfile
+import logging
+import numpy as np
+import sys
+import os
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'examples')))
+from custom_agent import CustomAgent
+from population import Population, agent_seed, shard_of
+
+BEHAVIORS = {'stake_tokens': 0.5, 'claim_rewards': 0.3, 'analyze_data': 0.2, 'idle': 0.1}
+
+
+class TestPopulation(unittest.TestCase):
+    def setUp(self):
+        logging.getLogger('custom_agent').setLevel(logging.WARNING)
+        logging.getLogger('population').setLevel(logging.WARNING)
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_shard_of_is_stable(self):
+        self.assertEqual(shard_of('agent_0', 4), shard_of('agent_0', 4))
+        self.assertTrue(all(0 <= shard_of(f"agent_{i}", 3) < 3 for i in range(20)))
+
+    def test_parallel_run_matches_serial_evolve(self):
+        rng = np.random.default_rng(0)
+        state_sequence = [f"state_{i}" for i in rng.integers(40, size=300).tolist()]
+        agent_ids = [f"agent_{i}" for i in range(6)]
+        results = Population(agent_ids, BEHAVIORS, num_workers=2, seed=7).run(state_sequence=state_sequence,
+                                                                             batch_size=64)
+        self.assertEqual(results['experience_offsets'][-1], len(results['experience_state_ids']))
+        for index, agent_id in enumerate(agent_ids):
+            np.random.seed(agent_seed(agent_id, 7))
+            agent = CustomAgent(agent_id, dict(BEHAVIORS),
+                                config_path=os.path.join(self.tmp.name, f"{agent_id}.json"))
+            agent.evolve(state_sequence=state_sequence, batch_size=64)
+            np.testing.assert_array_equal(results['behaviors'][index], [agent.behaviors[a] for a in BEHAVIORS])
+            self.assertEqual(results['total_rewards'][index], agent.total_rewards)
+            expected = {state: row for state, row in agent.experience.to_dict().items() if any(row.values())}
+            self.assertEqual(Population.experience_of(results, index), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()